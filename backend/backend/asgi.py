@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# WISE_PRELOAD_MODELS: modeller istek kabul edilmeden önce yüklenir
+from core.startup import prepare_server  # noqa: E402
+
+prepare_server()
@@ -2,7 +2,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/food/', include('core.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# WISE_PRELOAD_MODELS: modeller istek kabul edilmeden önce yüklenir
+from core.startup import prepare_server  # noqa: E402
+
+prepare_server()
@@ -0,0 +1,311 @@
+# core/backends.py
+
+"""
+Çıkarım (inference) backend katmanı.
+
+Her backend, model_registry'nin kullandığı loader(path) fonksiyonunu sağlar ve
+dönen nesneler eager YOLOv5 modelleriyle aynı arayüzü taşır:
+
+- Sınıflandırıcılar: model(NCHW tensör) -> (N, sınıf) logit tensörü
+- Plaka dedektörü: model(BGR numpy görsel) -> .xywh[0] ve .names alanları olan sonuç
+
+Böylece processor hangi backend seçilirse seçilsin değişmeden çalışır.
+
+'eager'       : torch.hub YOLOv5 AutoShape (varsayılan, .pt dosyaları)
+'torchscript' : models/export/<isim>.torchscript (torch.jit.load)
+'onnx'        : models/export/<isim>.onnx (onnxruntime, CPU)
+
+TorchScript/ONNX dosyaları 'manage.py export_models' ile bir kez üretilir;
+her dosyanın yanında tür, sınıf isimleri ve giriş boyutunu tutan bir .json
+bulunur.
+"""
+
+import inspect
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from . import config
+
+BACKENDS = ('eager', 'torchscript', 'onnx')
+EXPORT_SUFFIXES = {'torchscript': '.torchscript', 'onnx': '.onnx'}
+QUANTIZED_SUFFIX = '.int8.onnx'
+DETECTOR_MODELS = ('wisePlate',)
+
+# AutoShape varsayılanları
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+MAX_DETECTIONS = 1000
+
+
+class BackendUnavailable(ImportError):
+    """Seçilen backend'in çalışma zamanı paketi kurulu değilse fırlatılır."""
+
+
+def check_runtime(model_paths):
+    """
+    .onnx dosyalarını (ONNX backend'i veya INT8 modeller) yükleyecek bir
+    registry için onnxruntime'ın kurulu olduğunu registry kurulurken doğrular;
+    aksi halde hata ilk istekte load_onnx içinde ortaya çıkardı.
+    """
+    import importlib.util
+
+    onnx_models = sorted(name for name, path in model_paths.items()
+                         if str(path).endswith(EXPORT_SUFFIXES['onnx']))
+    if onnx_models and importlib.util.find_spec('onnxruntime') is None:
+        raise BackendUnavailable(
+            f"onnxruntime is required to load {', '.join(onnx_models)} "
+            f"(WISE_INFERENCE_BACKEND={config.INFERENCE_BACKEND}, "
+            f"WISE_QUANTIZED_MODELS={','.join(config.QUANTIZED_MODELS) or 'none'}); "
+            f"install it with 'pip install onnxruntime'"
+        )
+
+
+def export_path(export_dir, name, backend):
+    return Path(export_dir) / f"{name}{EXPORT_SUFFIXES[backend]}"
+
+
+def quantized_path(export_dir, name):
+    return Path(export_dir) / f"{name}{QUANTIZED_SUFFIX}"
+
+
+def read_metadata(model_path):
+    with open(Path(model_path).with_suffix('.json'), encoding='utf-8') as f:
+        metadata = json.load(f)
+    # JSON anahtarları string olur; sınıf indeksleri int olmalı
+    if metadata.get('kind') == 'multihead':
+        metadata['names'] = {head: {int(k): v for k, v in names.items()}
+                             for head, names in metadata.get('names', {}).items()}
+    else:
+        metadata['names'] = {int(k): v for k, v in metadata.get('names', {}).items()}
+    return metadata
+
+
+def letterbox(img, size, color=(114, 114, 114)):
+    """
+    En-boy oranını koruyarak size x size kareye sığdırır ve kenarları doldurur.
+    (1x3xHxW float RGB tensör, oran, (pad_x, pad_y)) döner.
+    """
+    import cv2
+    import numpy as np
+    import torch
+
+    height, width = img.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+    if (new_w, new_h) != (width, height):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+
+    tensor = torch.from_numpy(np.ascontiguousarray(img[:, :, ::-1].transpose(2, 0, 1)))
+    return tensor.unsqueeze(0).float().div_(255.0), ratio, (left, top)
+
+
+def non_max_suppression(prediction, conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD,
+                        max_det=MAX_DETECTIONS):
+    """
+    YOLOv5 ham çıktısı (N, 5 + sınıf: xywh, obj, skorlar) için sınıf bazlı NMS.
+    (M, 6) xyxy, güven, sınıf tensörü döner; güvene göre azalan sıradadır.
+    """
+    import torch
+    import torchvision
+
+    candidates = prediction[prediction[:, 4] > conf_threshold]
+    if not candidates.shape[0]:
+        return torch.zeros((0, 6))
+
+    scores = candidates[:, 5:] * candidates[:, 4:5]
+    confidence, classes = scores.max(1, keepdim=True)
+    xywh = candidates[:, :4]
+    xyxy = torch.cat((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2), 1)
+    boxes = torch.cat((xyxy, confidence, classes.float()), 1)[confidence.view(-1) > conf_threshold]
+    if not boxes.shape[0]:
+        return boxes
+
+    # Sınıflar birbirini bastırmasın diye kutular sınıfa göre kaydırılır
+    offsets = boxes[:, 5:6] * 7680
+    keep = torchvision.ops.nms(boxes[:, :4] + offsets, boxes[:, 4], iou_threshold)[:max_det]
+    return boxes[keep]
+
+
+class DetectorRunner:
+    """
+    Ham YOLOv5 dedektör çıktısını AutoShape sonucuna benzeyen bir nesneye
+    çevirir: letterbox -> model -> NMS -> kutuları orijinal görsele geri ölçekle.
+    Export edilmiş modeller sabit kare girişle (imgsz) çalışır; eager AutoShape
+    ise dikdörtgen giriş kullandığından kutular piksel düzeyinde farklılık
+    gösterebilir.
+    """
+
+    def __init__(self, run, names, imgsz, memory_bytes=None):
+        self.run = run
+        self.names = names
+        self.imgsz = imgsz
+        self._memory_bytes = memory_bytes
+
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    def __call__(self, img):
+        import torch
+
+        tensor, ratio, (pad_x, pad_y) = letterbox(img, self.imgsz)
+        prediction = self.run(tensor)
+        boxes = non_max_suppression(prediction[0])
+
+        height, width = img.shape[:2]
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / ratio).clamp(0, width)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / ratio).clamp(0, height)
+        xywh = torch.cat((
+            (boxes[:, 0:2] + boxes[:, 2:4]) / 2,
+            boxes[:, 2:4] - boxes[:, 0:2],
+            boxes[:, 4:6],
+        ), 1)
+        return SimpleNamespace(xywh=[xywh], xyxy=[boxes], names=self.names)
+
+
+class ClassifierRunner:
+    def __init__(self, run, names, memory_bytes=None):
+        self.run = run
+        self.names = names
+        self._memory_bytes = memory_bytes
+
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    def __call__(self, tensor):
+        return self.run(tensor)
+
+
+class MultiHeadRunner(ClassifierRunner):
+    """Ortak omurgalı model: model(tensör) -> (israf logitleri, tür logitleri)."""
+
+
+def _first_output(output):
+    # Detect katmanı export modunda (pred,) döner
+    return output[0] if isinstance(output, (tuple, list)) else output
+
+
+def _runner(metadata, run, memory):
+    if metadata['kind'] == 'detector':
+        return DetectorRunner(run, metadata['names'], metadata['imgsz'], memory_bytes=memory)
+    if metadata['kind'] == 'multihead':
+        return MultiHeadRunner(run, metadata['names'], memory_bytes=memory)
+    return ClassifierRunner(run, metadata['names'], memory_bytes=memory)
+
+
+def load_torchscript(model_path):
+    import torch
+
+    metadata = read_metadata(model_path)
+    module = torch.jit.load(str(model_path), map_location='cpu')
+    module.eval()
+    memory = sum(t.numel() * t.element_size() for t in list(module.parameters()) + list(module.buffers()))
+
+    def run(tensor):
+        with torch.no_grad():
+            output = module(tensor)
+        return tuple(output) if metadata['kind'] == 'multihead' else _first_output(output)
+
+    return _runner(metadata, run, memory)
+
+
+def load_onnx(model_path):
+    import onnxruntime
+    import torch
+
+    metadata = read_metadata(model_path)
+    options = onnxruntime.SessionOptions()
+    if config.ONNX_INTRA_OP_THREADS:
+        options.intra_op_num_threads = config.ONNX_INTRA_OP_THREADS
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(str(model_path), options, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+
+    def run(tensor):
+        outputs = session.run(None, {input_name: tensor.detach().cpu().numpy()})
+        if metadata['kind'] == 'multihead':
+            return tuple(torch.from_numpy(output) for output in outputs)
+        return torch.from_numpy(outputs[0])
+
+    return _runner(metadata, run, Path(model_path).stat().st_size)
+
+
+def load_model_file(model_path):
+    """Dosya uzantısına göre uygun loader'ı seçer (.pt, .torchscript, .onnx / .int8.onnx)."""
+    from .model_loader import load_model
+
+    suffix = Path(model_path).suffix
+    if suffix == EXPORT_SUFFIXES['torchscript']:
+        return load_torchscript(model_path)
+    if suffix == EXPORT_SUFFIXES['onnx']:
+        return load_onnx(model_path)
+    return load_model(model_path)
+
+
+# --- Export ---------------------------------------------------------------
+
+def unwrap_module(model):
+    """AutoShape / DetectMultiBackend sarmalayıcılarını açıp asıl nn.Module'ü döner."""
+    module = model
+    while type(module).__name__ in ('AutoShape', 'DetectMultiBackend'):
+        module = module.model
+    return module
+
+
+def model_names(model):
+    names = getattr(model, 'names', None) or getattr(unwrap_module(model), 'names', None) or {}
+    if isinstance(names, (list, tuple)):
+        names = dict(enumerate(names))
+    return {int(k): str(v) for k, v in names.items()}
+
+
+def export_module(module, name, kind, names, export_dir, formats=('torchscript', 'onnx'), imgsz=None):
+    """
+    nn.Module'ü istenen formatlarda export_dir altına yazar, yazılan yolları döner.
+    Sınıflandırıcılar dinamik batch boyutuyla export edilir.
+    """
+    import torch
+
+    imgsz = imgsz or (config.DETECTOR_IMGSZ if kind == 'detector' else 224)
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    module = module.float().eval()
+    for m in module.modules():
+        # YOLOv5 Detect katmanı: export modunda yalnızca birleşik tahmini döner
+        if hasattr(m, 'export'):
+            m.export = True
+        if hasattr(m, 'inplace'):
+            m.inplace = False
+    dummy = torch.zeros(1, 3, imgsz, imgsz)
+
+    written = []
+    for backend in formats:
+        path = export_path(export_dir, name, backend)
+        if backend == 'torchscript':
+            with torch.no_grad():
+                traced = torch.jit.trace(module, dummy, strict=False)
+            traced.save(str(path))
+        elif backend == 'onnx':
+            output_names = ['waste', 'type'] if kind == 'multihead' else ['output']
+            dynamic_axes = None
+            if kind != 'detector':
+                dynamic_axes = {axis: {0: 'batch'} for axis in ['images'] + output_names}
+            # torch >= 2.9 varsayılan olarak dynamo exporter'ını (onnxscript)
+            # kullanır; dynamic_axes'ı anlayan TorchScript exporter'ı seçilir
+            legacy = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+            torch.onnx.export(module, dummy, str(path), opset_version=config.ONNX_OPSET,
+                              input_names=['images'], output_names=output_names,
+                              dynamic_axes=dynamic_axes, do_constant_folding=True, **legacy)
+        else:
+            raise ValueError(f"Unknown export format '{backend}'")
+
+        with open(path.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump({'name': name, 'kind': kind, 'names': names, 'imgsz': imgsz}, f,
+                      ensure_ascii=False, indent=2)
+        written.append(path)
+    return written
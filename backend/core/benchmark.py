@@ -0,0 +1,334 @@
+# core/benchmark.py
+
+"""
+Gerçek model ağırlıkları olmadan tekrarlanabilir uçtan uca benchmark.
+
+Sabit tohumla (seed) sentetik tabla görselleri üretilir: gri tepsi üzerinde
+her yemek kategorisi kendine özgü renkte bir kap olarak çizilir. Modellerin
+yerine aynı arayüzü taşıyan küçük, rastgele ağırlıklı ağlar kullanılır:
+
+- Plaka dedektörü: backends.DetectorRunner (letterbox -> model -> NMS ->
+  geri ölçekleme). Ham çıktı, küçük bir evrişim omurgası çalıştırıldıktan
+  sonra kapların renginden bulunan kutulardan üretilir; böylece kırpım
+  sayıları ve kutular görselden görsele tutarlıdır.
+- Sınıflandırıcılar: model(NCHW) -> (N, sınıf) logitleri veren küçük CNN'ler;
+  sınıf sayıları FOOD_TYPES ve israf (2 sınıf) ile aynıdır.
+
+Ölçülen değerler mutlak üretim performansı değil, işlem hattının (okuma,
+tespit, ön işleme, toplu sınıflandırma, kayıt) kendi maliyeti ve batch /
+worker ayarlarına göre ölçeklenmesidir.
+"""
+
+import os
+import platform
+import resource
+import statistics
+import time
+from datetime import date
+
+from . import config, metrics
+from .config import FOOD_TYPES, TYPE_MODEL_MAPPING, WASTE_MODEL_MAPPING
+
+DETECTOR_NAMES = {0: 'corba', 1: 'ana-yemek', 2: 'yan-yemek', 3: 'ek-yemek'}
+# BGR; tepsi (gri) ve letterbox dolgusu (114) ile karışmayan doygun renkler
+CATEGORY_COLORS = {
+    'corba': (0, 140, 255),
+    'ana-yemek': (40, 40, 200),
+    'yan-yemek': (60, 180, 60),
+    'ek-yemek': (200, 120, 40),
+}
+TRAY_COLOR = (190, 190, 190)
+COLOR_TOLERANCE = 45
+# Görsel boyutuna oranla kapların (x, y, yarıçap) yerleşimi
+PLATE_LAYOUT = {
+    'corba': (0.25, 0.3, 0.17),
+    'ana-yemek': (0.68, 0.35, 0.22),
+    'yan-yemek': (0.28, 0.75, 0.15),
+    'ek-yemek': (0.72, 0.78, 0.12),
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+# --- Sentetik veri ---------------------------------------------------------------
+
+def make_plate_image(rng, width=1280, height=960):
+    """
+    Tek bir tabla görseli (BGR uint8) ve üzerindeki kategoriler. Her kap
+    %85 olasılıkla bulunur; konum ve boyutu hafifçe kaydırılır.
+    """
+    import cv2
+    import numpy as np
+
+    noise = rng.normal(0, 6, size=(height, width, 3))
+    img = np.clip(np.array(TRAY_COLOR, dtype=np.float64) + noise, 0, 255).astype(np.uint8)
+
+    present = [category for category in PLATE_LAYOUT if rng.random() < 0.85] or ['ana-yemek']
+    scale = min(width, height)
+    for category in present:
+        cx, cy, radius = PLATE_LAYOUT[category]
+        center = (int(width * (cx + rng.uniform(-0.03, 0.03))), int(height * (cy + rng.uniform(-0.03, 0.03))))
+        axes = (int(scale * radius * rng.uniform(0.9, 1.1)), int(scale * radius * rng.uniform(0.8, 1.0)))
+        cv2.ellipse(img, center, axes, 0, 0, 360, CATEGORY_COLORS[category], -1)
+        # Kap içinde doku: renk toleransının altında kalan lekeler
+        for _ in range(int(rng.integers(3, 8))):
+            spot = (center[0] + int(rng.uniform(-0.5, 0.5) * axes[0]),
+                    center[1] + int(rng.uniform(-0.5, 0.5) * axes[1]))
+            shade = tuple(int(np.clip(c + rng.integers(-20, 21), 0, 255)) for c in CATEGORY_COLORS[category])
+            cv2.circle(img, spot, max(2, axes[1] // 6), shade, -1)
+    return img, present
+
+
+def generate_dataset(directory, count, width=1280, height=960, seed=0, quality=90):
+    """
+    directory altına count adet sentetik JPEG yazar; aynı tohum byte düzeyinde
+    aynı dosyaları üretir. Görsel yollarını sıralı döner.
+    """
+    import cv2
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        img, _ = make_plate_image(rng, width=width, height=height)
+        path = os.path.join(directory, f"plate_{i:05d}.jpg")
+        cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        paths.append(path)
+    return paths
+
+
+# --- Yerine geçen (stub) modeller ----------------------------------------------
+
+def _color_boxes(img):
+    """Her kategori renginin en büyük bölgesi için (cx, cy, w, h, sınıf)."""
+    import cv2
+    import numpy as np
+
+    boxes = []
+    for cls, category in DETECTOR_NAMES.items():
+        color = np.array(CATEGORY_COLORS[category], dtype=np.int16)
+        lower = np.clip(color - COLOR_TOLERANCE, 0, 255).astype(np.uint8)
+        upper = np.clip(color + COLOR_TOLERANCE, 0, 255).astype(np.uint8)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(cv2.inRange(img, lower, upper))
+        if count < 2:
+            continue
+        largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        x, y, w, h, area = stats[largest]
+        if area < 50:
+            continue
+        boxes.append((x + w / 2, y + h / 2, w, h, cls))
+    return boxes
+
+
+def stub_detector(imgsz=320, width=16, seed=0):
+    """
+    wisePlate yerine geçen dedektör. Omurga yalnızca hesaplama maliyeti için
+    çalışır; kutular letterbox'lanmış girişteki kap renklerinden bulunur ve
+    YOLOv5 ham çıktı biçiminde (1, N, 5 + sınıf) NMS'e verilir.
+    """
+    import numpy as np
+    import torch
+
+    from .backends import DetectorRunner
+
+    with torch.random.fork_rng():
+        torch.manual_seed(seed)
+        backbone = torch.nn.Sequential(
+            torch.nn.Conv2d(3, width, 3, stride=2, padding=1), torch.nn.SiLU(),
+            torch.nn.Conv2d(width, width * 2, 3, stride=2, padding=1), torch.nn.SiLU(),
+            torch.nn.Conv2d(width * 2, width * 4, 3, stride=2, padding=1), torch.nn.SiLU(),
+            torch.nn.Conv2d(width * 4, 5 + len(DETECTOR_NAMES), 1),
+        ).eval()
+
+    def run(tensor):
+        with torch.no_grad():
+            backbone(tensor)
+        # 1x3xHxW RGB [0, 1] -> HxWx3 BGR uint8
+        img = (tensor[0].permute(1, 2, 0).flip(-1) * 255.0).round().byte().numpy()
+        rows = []
+        for cx, cy, w, h, cls in _color_boxes(np.ascontiguousarray(img)):
+            scores = [0.02] * len(DETECTOR_NAMES)
+            scores[cls] = 0.95
+            rows.append([cx, cy, w, h, 0.9] + scores)
+        prediction = torch.tensor(rows, dtype=torch.float32).reshape(1, -1, 5 + len(DETECTOR_NAMES))
+        return prediction
+
+    memory = sum(p.numel() * p.element_size() for p in backbone.parameters())
+    return DetectorRunner(run, dict(DETECTOR_NAMES), imgsz, memory_bytes=memory)
+
+
+def stub_classifier(num_classes, width=16, seed=0):
+    """model(NCHW) -> (N, num_classes) logit veren rastgele ağırlıklı küçük CNN."""
+    import torch
+
+    with torch.random.fork_rng():
+        torch.manual_seed(seed)
+        return torch.nn.Sequential(
+            torch.nn.Conv2d(3, width, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(width, width * 2, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(width * 2, width * 4, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(),
+            torch.nn.Linear(width * 4, num_classes),
+        ).eval()
+
+
+def stub_models(width=16, imgsz=320, seed=0):
+    """ModelRegistry.models() ile aynı isimlerde stub modeller."""
+    models = {'wisePlate': stub_detector(imgsz=imgsz, width=width, seed=seed)}
+    for offset, (category, name) in enumerate(sorted(WASTE_MODEL_MAPPING.items()), start=1):
+        models[name] = stub_classifier(2, width=width, seed=seed + offset)
+    for offset, (category, name) in enumerate(sorted(TYPE_MODEL_MAPPING.items()), start=101):
+        models[name] = stub_classifier(len(FOOD_TYPES[category]), width=width, seed=seed + offset)
+    return models
+
+
+# --- Ölçüm ------------------------------------------------------------------------
+
+def reset_peak_rss():
+    """Linux'ta sürecin tepe RSS (VmHWM) değerini sıfırlar; desteklenmiyorsa False."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """Sürecin tepe RSS değeri; /proc yoksa getrusage (süreç ömrü boyunca tepe)."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS byte, Linux KiB döner
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+def percentiles(values, points=PERCENTILES):
+    """Doğrusal aradeğerli yüzdelikler; boş listede None."""
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        position = (len(ordered) - 1) * p / 100
+        low = int(position)
+        high = min(low + 1, len(ordered) - 1)
+        result[f"p{p}"] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return result
+
+
+def _stage_totals():
+    totals = {}
+    for (stage, _model), (_counts, total, count) in metrics.STAGE_SECONDS.merge(metrics.STAGE_SECONDS.snapshot()).items():
+        seconds, calls = totals.get(stage, (0.0, 0))
+        totals[stage] = (seconds + total, calls + count)
+    return totals
+
+
+def _stage_delta(before, after):
+    """İki _stage_totals arasında aşama başına toplam ve çağrı başına ortalama (ms)."""
+    delta = {}
+    for stage, (seconds, calls) in after.items():
+        seconds -= before.get(stage, (0.0, 0))[0]
+        calls -= before.get(stage, (0.0, 0))[1]
+        if calls:
+            delta[stage] = {'calls': calls, 'total_ms': seconds * 1000, 'mean_ms': seconds / calls * 1000}
+    return delta
+
+
+def measure_latency(image_paths, models, user=None, analysis_date=None):
+    """process_detection ile görsel başına uçtan uca gecikme (ms)."""
+    from .processor import process_detection
+
+    analysis_date = analysis_date or date.today()
+    latencies = []
+    for image_path in image_paths:
+        started = time.perf_counter()
+        process_detection(image_path, models, analysis_date=analysis_date, user=user)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        'images': len(latencies),
+        'mean_ms': statistics.fmean(latencies) if latencies else None,
+        'max_ms': max(latencies, default=None),
+        **{f"{name}_ms": value for name, value in percentiles(latencies).items()},
+    }
+
+
+def measure_throughput(image_dir, models, batch_size, workers, user=None, analysis_date=None,
+                       repeats=3, mode='thread'):
+    """
+    process_directory'yi (önbelleksiz, çıktı görseli yazmadan) repeats kez
+    çalıştırır. Medyan img/s, tepe RSS ve sonuç gecikmesi yüzdelikleri döner.
+    Sonuç gecikmesi, çalışmanın başından görselin sonucunun bildirildiği
+    (result_callback) ana kadar geçen süredir; büyük sınıflandırma turları
+    verimi artırırken ilk sonuçları geciktirir.
+    """
+    from .processor import process_directory
+
+    analysis_date = analysis_date or date.today()
+    runs = []
+    latencies = []
+    stages_before = _stage_totals()
+    for _ in range(repeats):
+        rss_reset = reset_peak_rss()
+        started = time.perf_counter()
+        reported = []
+
+        def on_result(image_path, detections):
+            reported.append((time.perf_counter() - started) * 1000)
+
+        analyses = process_directory(image_dir, models, analysis_date=analysis_date, user=user,
+                                     save_images=False, workers=workers, mode=mode,
+                                     batch_size=batch_size, use_cache=False, result_callback=on_result)
+        elapsed = time.perf_counter() - started
+        latencies.extend(reported)
+        runs.append({
+            'seconds': elapsed,
+            'images': len(reported),
+            'images_per_second': len(reported) / elapsed if elapsed else None,
+            'crops_per_second': len(analyses) / elapsed if elapsed else None,
+            'analyses': len(analyses),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'peak_rss_reset': rss_reset,
+        })
+    rates = [run['images_per_second'] for run in runs if run['images_per_second']]
+    return {
+        'batch_size': batch_size,
+        'workers': workers,
+        'mode': mode,
+        'images': runs[0]['images'] if runs else 0,
+        'images_per_second': statistics.median(rates) if rates else None,
+        'result_latency_ms': percentiles(latencies),
+        'peak_rss_bytes': max((run['peak_rss_bytes'] for run in runs), default=None),
+        'stages': _stage_delta(stages_before, _stage_totals()),
+        'runs': runs,
+    }
+
+
+def environment():
+    import numpy
+    import torch
+
+    try:
+        import cv2
+        cv2_version = cv2.__version__
+    except ImportError:
+        cv2_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'numpy': numpy.__version__,
+        'opencv': cv2_version,
+        'cuda': torch.cuda.is_available(),
+        'metrics_enabled': config.METRICS_ENABLED,
+        'detection_records': config.DETECTION_RECORDS_ENABLED,
+    }
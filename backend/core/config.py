@@ -1,5 +1,7 @@
 # core/config.py
 
+import os
+
 FOOD_TYPES = {
     'corba': {
         0: 'mercimek-corbasi', 
@@ -26,3 +28,197 @@ FOOD_TYPES = {
         1: 'mor-yogurt', 
         2: 'yogurt'}
 }
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Model registry ayarları
+# WISE_PRELOAD_MODELS=1 ise modeller sunucu açılışında (wsgi.py / asgi.py) yüklenir,
+# aksi halde ilk kullanımda yüklenir.
+PRELOAD_MODELS = _env_bool('WISE_PRELOAD_MODELS')
+# .pt dosyası değiştiğinde modeli yeniden yükle (hot reload)
+MODEL_HOT_RELOAD = _env_bool('WISE_MODEL_HOT_RELOAD', True)
+# Dosya değişikliği kontrolleri arasındaki en kısa süre (saniye)
+MODEL_RELOAD_CHECK_INTERVAL = float(os.environ.get('WISE_MODEL_RELOAD_CHECK_INTERVAL', 30))
+# Modeller ilk gerektiklerinde yüklenir: registry.models() tembel bir sözlük
+# döner ve sınıflandırıcı, kategorisi bir görselde ilk kez tespit edildiğinde
+# yüklenir. Kapalıysa models() tüm modelleri hemen yükler.
+MODEL_LAZY_LOADING = _env_bool('WISE_MODEL_LAZY_LOADING', True)
+# Yüklü modellerin toplam bellek bütçesi (MB, 0: sınırsız). Aşılınca en uzun
+# süredir kullanılmayan sınıflandırıcı bellekten çıkarılır (LRU); plaka
+# dedektörü hiçbir zaman çıkarılmaz.
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('WISE_MODEL_MEMORY_BUDGET_MB', 0))
+# preload(): 0 ise tüm modeller, aksi halde dedektör ve son MODEL_USAGE_DAYS
+# günde en çok tespit edilen kategorilerin en fazla bu kadar modeli yüklenir.
+MODEL_PRELOAD_TOP = int(os.environ.get('WISE_MODEL_PRELOAD_TOP', 0))
+MODEL_USAGE_DAYS = int(os.environ.get('WISE_MODEL_USAGE_DAYS', 7))
+
+# Kategori -> israf (waste) / tür (type) sınıflandırıcı eşlemesi
+WASTE_MODEL_MAPPING = {
+    'corba': 'wiseSoup',
+    'ana-yemek': 'wiseMainCls',
+    'yan-yemek': 'wiseSideCls',
+    'ek-yemek': 'wiseExtraCls'
+}
+
+TYPE_MODEL_MAPPING = {
+    'corba': 'wiseTypeSoup',
+    'ana-yemek': 'wiseMainTypeCls',
+    'yan-yemek': 'wiseSideTypeCls',
+    'ek-yemek': 'wiseExtraTypeCls'
+}
+
+# Toplu (batched) sınıflandırma ayarları
+# Bir forward pass'e girecek en fazla kırpım sayısı
+CLS_BATCH_SIZE = int(os.environ.get('WISE_CLS_BATCH_SIZE', 32))
+# Bu kadar kırpım biriktiğinde sınıflandırma çalıştırılır (bellek sınırı)
+CLS_FLUSH_SIZE = int(os.environ.get('WISE_CLS_FLUSH_SIZE', 256))
+
+# Kırpımlar içerik adresli kırpım deposuna (bkz. crop_store.py) yazılsın mı?
+SAVE_OUTPUT_IMAGES = _env_bool('WISE_SAVE_OUTPUT_IMAGES', True)
+# Kırpımları arka planda yazan thread sayısı
+OUTPUT_WRITER_THREADS = int(os.environ.get('WISE_OUTPUT_WRITER_THREADS', 2))
+# Kırpım deposunun kökü; yüklemeler arasında korunur
+CROP_STORE_DIR = os.environ.get('WISE_CROP_STORE_DIR', 'crop_store')
+CROP_JPEG_QUALITY = int(os.environ.get('WISE_CROP_JPEG_QUALITY', 90))
+# > 0 ise kırpımın uzun kenarı bu kadar piksel olan küçük kopyası da yazılır
+CROP_THUMBNAIL_SIZE = int(os.environ.get('WISE_CROP_THUMBNAIL_SIZE', 0))
+# Tek yazma görevinde kodlanıp yazılan kırpım sayısı
+CROP_WRITE_BATCH_SIZE = int(os.environ.get('WISE_CROP_WRITE_BATCH_SIZE', 32))
+
+# Asenkron yükleme / iş kuyruğu ayarları
+# Açıksa upload_images 202 {job_id} döner ve işi run_job_workers süreçleri
+# işler (istemci jobs/<id>/ ile durumu izler). Kapalıyken (varsayılan)
+# yükleme eskisi gibi isteğin içinde işlenir ve 200 ile istatistik döner.
+ASYNC_UPLOADS = _env_bool('WISE_ASYNC_UPLOADS', False)
+JOB_WORKERS = int(os.environ.get('WISE_JOB_WORKERS', 2))
+# Kuyruk boşken yoklama aralığı (saniye)
+JOB_POLL_INTERVAL = float(os.environ.get('WISE_JOB_POLL_INTERVAL', 1.0))
+# Bu süreden uzun 'running' kalan işler (ölen worker) yeniden kuyruğa alınır
+JOB_STALE_SECONDS = int(os.environ.get('WISE_JOB_STALE_SECONDS', 3600))
+# Worker'ların ölü worker'lardan kalan işleri arama aralığı (saniye)
+JOB_REQUEUE_INTERVAL = float(os.environ.get('WISE_JOB_REQUEUE_INTERVAL', 300))
+
+# İstek/iş başına izole çalışma alanları: WORKSPACE_ROOT/<id>/images
+WORKSPACE_ROOT = os.environ.get('WISE_WORKSPACE_ROOT', 'workspaces')
+# Bu süreden eski çalışma alanları silinir (saniye)
+WORKSPACE_TTL_SECONDS = int(os.environ.get('WISE_WORKSPACE_TTL_SECONDS', 24 * 3600))
+# Worker'ların süresi dolmuş alanları temizleme aralığı (saniye)
+WORKSPACE_CLEANUP_INTERVAL = int(os.environ.get('WISE_WORKSPACE_CLEANUP_INTERVAL', 600))
+
+# Görsel seviyesinde paralellik (okuma + plaka tespiti)
+# 1: seri; >1: DETECTION_MODE'a göre thread veya süreç havuzu
+DETECTION_WORKERS = int(os.environ.get('WISE_DETECTION_WORKERS', 1))
+DETECTION_MODE = os.environ.get('WISE_DETECTION_MODE', 'thread')
+
+# Görsel okuma (bkz. image_io.py). JPEG'ler uzun kenarı DECODE_MAX_SIDE'ın
+# altına düşmeyen en küçük ölçekte (1/2, 1/4, 1/8) çözülür; 0: tam boyut.
+# Bilinçli bir doğruluk ödünleşimidir: DETECTION_MAX_SIDE'tan farklı olarak
+# kırpımlar, dolayısıyla sınıflandırıcı girdileri ve kırpım deposundaki
+# görseller de bu küçültülmüş çözünürlükten kesilir. Sınıflandırıcı girdisi
+# 224 piksel olduğundan bu boyutun üstünde kalan kırpımlarda etkisi azdır;
+# küçük yan yemekler ayrıntı kaybeder. Tam çözünürlüklü kırpım gerekiyorsa
+# 0 bırakılıp yalnızca DETECTION_MAX_SIDE kullanılmalıdır. Kayıtlı kutular
+# her durumda orijinal koordinatlardadır.
+DECODE_MAX_SIDE = int(os.environ.get('WISE_DECODE_MAX_SIDE', 0))
+# Seri tespitte görselleri önden çözen thread sayısı ve tespitin önünde
+# bekleyebilecek en fazla çözülmüş görsel (0: önden çözme yok)
+DECODE_THREADS = int(os.environ.get('WISE_DECODE_THREADS', 2))
+DECODE_PREFETCH = int(os.environ.get('WISE_DECODE_PREFETCH', 4))
+
+# Plaka tespiti çözünürlüğü (bkz. tiling.py). Görselin uzun kenarı
+# DETECTION_MAX_SIDE'ı aşıyorsa tespit küçültülmüş kopyada yapılır, kutular
+# tam çözünürlüğe geri ölçeklenir. 0: görsel dedektöre olduğu gibi verilir.
+DETECTION_MAX_SIDE = int(os.environ.get('WISE_DETECTION_MAX_SIDE', 0))
+# Uzun kenarı bu eşiği aşan görseller ayrıca DETECTION_TILE_SIZE'lık,
+# DETECTION_TILE_OVERLAP oranında örtüşen karolarla taranır (0: kapalı).
+# Karolardaki kutular DETECTION_MERGE_IOU ile birleştirilir.
+DETECTION_TILE_THRESHOLD = int(os.environ.get('WISE_DETECTION_TILE_THRESHOLD', 0))
+DETECTION_TILE_SIZE = int(os.environ.get('WISE_DETECTION_TILE_SIZE', 2048))
+DETECTION_TILE_OVERLAP = float(os.environ.get('WISE_DETECTION_TILE_OVERLAP', 0.2))
+DETECTION_MERGE_IOU = float(os.environ.get('WISE_DETECTION_MERGE_IOU', 0.5))
+
+# FoodAnalysis kayıtları yükleme sonunda tek transaction içinde,
+# bu büyüklükteki bulk_create parçalarıyla yazılır
+ANALYSIS_BULK_BATCH_SIZE = int(os.environ.get('WISE_ANALYSIS_BULK_BATCH_SIZE', 500))
+
+# Çıkarım backend'i: 'eager' (torch.hub .pt), 'torchscript' veya 'onnx'
+# TorchScript/ONNX dosyaları 'manage.py export_models' ile MODEL_EXPORT_DIR'e yazılır
+INFERENCE_BACKEND = os.environ.get('WISE_INFERENCE_BACKEND', 'eager')
+MODEL_EXPORT_DIR = os.environ.get('WISE_MODEL_EXPORT_DIR', '')
+ONNX_OPSET = int(os.environ.get('WISE_ONNX_OPSET', 12))
+# 0: onnxruntime varsayılanı
+ONNX_INTRA_OP_THREADS = int(os.environ.get('WISE_ONNX_INTRA_OP_THREADS', 0))
+# Export edilen plaka dedektörünün kare giriş boyutu
+DETECTOR_IMGSZ = int(os.environ.get('WISE_DETECTOR_IMGSZ', 640))
+
+# YOLOv5 yükleme kodu (eager backend). WISE_YOLOV5_DIR (varsayılan:
+# backend/third_party/yolov5, varsa) yerel bir YOLOv5 kopyasıdır; torch.hub
+# ağa ve hub önbelleğine gitmeden oradan yükler. Kopya 'manage.py fetch_yolov5'
+# ile bir kez (imaj build'inde) indirilir. Yoksa sabitlenmiş YOLOV5_HUB_REPO
+# sürümü hub önbelleğinden, doğrulama isteği atılmadan kullanılır.
+YOLOV5_DIR = os.environ.get('WISE_YOLOV5_DIR', '')
+YOLOV5_REF = os.environ.get('WISE_YOLOV5_REF', 'v7.0')
+YOLOV5_HUB_REPO = f"ultralytics/yolov5:{YOLOV5_REF}"
+# Açılışta yüklenen her modelle bir kez sahte çıkarım yapılır; ilk isteğin
+# ilklendirme maliyeti (çekirdek seçimi, bellek ayırma) açılışa kayar
+MODEL_WARMUP = _env_bool('WISE_MODEL_WARMUP', True)
+
+# INT8 sınıflandırıcılar: 'manage.py quantize_models' ile üretilen
+# <isim>.int8.onnx dosyaları bu listedeki modeller için kullanılır.
+# Örn. WISE_QUANTIZED_MODELS=wiseSoup,wiseMainCls veya 'all' (tüm sınıflandırıcılar)
+QUANTIZED_MODELS = tuple(
+    name.strip() for name in os.environ.get('WISE_QUANTIZED_MODELS', '').split(',') if name.strip()
+)
+
+# Ortak omurgalı (israf + tür tek forward pass) modeller. 'manage.py build_multihead'
+# ile export dizinine yazılır; dosya varsa processor ayrı modeller yerine bunu kullanır.
+MULTIHEAD_MODEL_MAPPING = {
+    'corba': 'wiseSoupMultiHead',
+    'ana-yemek': 'wiseMainMultiHead',
+    'yan-yemek': 'wiseSideMultiHead',
+    'ek-yemek': 'wiseExtraMultiHead'
+}
+MULTIHEAD_ENABLED = _env_bool('WISE_MULTIHEAD_ENABLED', True)
+
+# İçerik özetli sonuç önbelleği: byte düzeyinde aynı görsel aynı model
+# sürümleriyle yeniden yüklenirse tespit ve sınıflandırma tekrar çalışmaz.
+# '' (kapalı), 'memory' (süreç içi LRU), 'disk' veya 'django' (settings.CACHES)
+RESULT_CACHE_BACKEND = os.environ.get('WISE_RESULT_CACHE_BACKEND', 'memory')
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('WISE_RESULT_CACHE_MAX_ENTRIES', 10000))
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get('WISE_RESULT_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+RESULT_CACHE_DIR = os.environ.get('WISE_RESULT_CACHE_DIR', 'result_cache')
+RESULT_CACHE_ALIAS = os.environ.get('WISE_RESULT_CACHE_ALIAS', 'default')
+
+# Akış (streaming) yükleme oturumları: görseller geldikçe işlenir
+# Worker'ın bir turda işlediği en fazla görsel
+STREAM_BATCH_SIZE = int(os.environ.get('WISE_STREAM_BATCH_SIZE', 16))
+# Olay akışının yeni sonuç yoklama aralığı (saniye)
+STREAM_POLL_INTERVAL = float(os.environ.get('WISE_STREAM_POLL_INTERVAL', 0.5))
+# Bu süre yeni görsel gelmeyen açık oturum kendiliğinden kapatılır (saniye)
+STREAM_IDLE_TIMEOUT = int(os.environ.get('WISE_STREAM_IDLE_TIMEOUT', 600))
+# Worker'ların boşta kalan oturumları kapatma kontrolü aralığı (saniye)
+STREAM_EXPIRE_INTERVAL = float(os.environ.get('WISE_STREAM_EXPIRE_INTERVAL', 60))
+# Tek bir olay akışı isteğinin en uzun süresi; istemci 'after' (SSE'de
+# Last-Event-ID ile otomatik) ile devam eder. Senkron WSGI sunucusunda açık
+# her akış bir worker'ı tuttuğundan kısa tutulur.
+STREAM_EVENTS_TIMEOUT = int(os.environ.get('WISE_STREAM_EVENTS_TIMEOUT', 30))
+STREAM_HEARTBEAT_INTERVAL = int(os.environ.get('WISE_STREAM_HEARTBEAT_INTERVAL', 15))
+
+# Görsel (AnalyzedImage) ve tespit (DetectionRecord) kayıtları: kutular,
+# güvenler, model sürümleri ve süreler analizlerle aynı transaction'da yazılır
+DETECTION_RECORDS_ENABLED = _env_bool('WISE_DETECTION_RECORDS', True)
+
+# Aşama süreleri ve sayaçlar (/metrics, Prometheus metin formatı)
+METRICS_ENABLED = _env_bool('WISE_METRICS_ENABLED', True)
+# Çok süreçli kurulumda (job worker'ları) süreçlerin anlık görüntülerini
+# yazdığı ortak dizin; boşsa /metrics yalnızca web sürecinin metriklerini gösterir
+METRICS_DIR = os.environ.get('WISE_METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('WISE_METRICS_FLUSH_INTERVAL', 10))
+# Verilirse /metrics 'Authorization: Bearer <token>' ister
+METRICS_TOKEN = os.environ.get('WISE_METRICS_TOKEN', '')
@@ -0,0 +1,104 @@
+# core/crop_store.py
+
+"""
+İçerik adresli kırpım deposu.
+
+Kırpımlar piksel içeriklerinin (boyut + BGR byte'ları) SHA-256 özetiyle
+adreslenir ve CROP_STORE_DIR altında iki seviyeli parçalı (sharded) dizinlere
+bir kez yazılır:
+
+    <kök>/crops/ab/cd/abcd....jpg
+    <kök>/thumbs/ab/cd/abcd....jpg   (CROP_THUMBNAIL_SIZE > 0 ise)
+
+Aynı kırpım (örneğin aynı fotoğrafın tekrar yüklenmesi) ikinci kez
+yazılmaz. Özet JPEG kodlamasından önce hesaplandığı için anahtar yazma
+bitmeden bilinir; FoodAnalysis.crop bu anahtarla StoredCrop satırına bağlanır
+ve kodlama / yazma arka planda yapılır (bkz. output_sink.ImageSink). Depo
+yüklemeler arasında silinmez.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from . import config
+
+
+class CropStore:
+    def __init__(self, root=None, thumbnail_size=None, quality=None):
+        self.root = Path(root or config.CROP_STORE_DIR)
+        self.thumbnail_size = config.CROP_THUMBNAIL_SIZE if thumbnail_size is None else thumbnail_size
+        self.quality = quality or config.CROP_JPEG_QUALITY
+
+    @staticmethod
+    def key(crop):
+        """Kırpımın içerik adresi: boyutları ve pikselleri üzerinden SHA-256."""
+        import numpy as np
+
+        digest = hashlib.sha256(repr(crop.shape).encode('ascii'))
+        digest.update(np.ascontiguousarray(crop).data)
+        return digest.hexdigest()
+
+    def path(self, key, thumbnail=False):
+        return self.root / ('thumbs' if thumbnail else 'crops') / key[:2] / key[2:4] / f"{key}.jpg"
+
+    def exists(self, key, thumbnail=False):
+        return self.path(key, thumbnail).exists()
+
+    def _write_jpeg(self, path, image):
+        import cv2
+
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise IOError(f"JPEG encoding failed for {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Geçici dosya + os.replace: okuyucular yarım dosya görmez, aynı
+        # kırpımı eşzamanlı yazan süreçler birbirini bozmaz
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.replace(tmp_path, path)
+
+    def _thumbnail(self, crop):
+        import cv2
+
+        height, width = crop.shape[:2]
+        scale = self.thumbnail_size / max(height, width)
+        if scale >= 1:
+            return crop
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+
+    def write(self, key, crop):
+        """Kırpımı (ve küçük kopyasını) yoksa yazar; yazıldıysa True, zaten varsa False."""
+        written = False
+        path = self.path(key)
+        if not path.exists():
+            self._write_jpeg(path, crop)
+            written = True
+        if self.thumbnail_size:
+            thumb_path = self.path(key, thumbnail=True)
+            if not thumb_path.exists():
+                self._write_jpeg(thumb_path, self._thumbnail(crop))
+        return written
+
+    def open(self, key, thumbnail=False):
+        """Kırpım dosyasının yolu; yoksa (veya anahtar geçersizse) None."""
+        if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+            return None
+        path = self.path(key, thumbnail)
+        return path if path.exists() else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_crop_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CropStore()
+    return _store
@@ -0,0 +1,174 @@
+# core/image_io.py
+
+"""
+Görsel okuma katmanı.
+
+- Küçültülmüş JPEG çözme: DECODE_MAX_SIDE verilirse JPEG'ler libjpeg'in DCT
+  ölçeklemesiyle (cv2.IMREAD_REDUCED_COLOR_2/4/8) uzun kenarı bu değerin
+  altına düşmeyen en küçük ölçekte çözülür. 12MP bir görseli 1/2 ölçekte
+  çözmek tam çözüp küçültmekten birkaç kat hızlıdır. Dosya boyutu JPEG
+  başlığından okunur; JPEG olmayan dosyalar tam boyutta çözülür.
+- Tampon yeniden kullanımı: dosya byte'ları thread başına bir kez ayrılan ve
+  gerektikçe büyüyen tampona okunur (cv2.imdecode sonucu ayrı bellektedir).
+- Önden çözme: Prefetcher görselleri sınırlı bir thread havuzunda, tüketici
+  (plaka tespiti) önünde en fazla DECODE_PREFETCH görsel olacak şekilde çözer.
+
+Çözülen görselin koordinatları DecodedImage.scale ile orijinale çevrilir.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from . import config
+
+REDUCTION_FACTORS = (8, 4, 2)
+# Boyut bilgisi taşıyan SOF işaretleri (DHT, JPG ve DAC hariç)
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+_local = threading.local()
+_decode_pool = None
+_decode_pool_lock = threading.Lock()
+
+
+@dataclass
+class DecodedImage:
+    """Çözülmüş BGR görsel ve orijinal boyutları; scale = çözülen / orijinal."""
+    image: Any
+    width: int
+    height: int
+    scale: float = 1.0
+    seconds: float = 0.0
+
+
+def read_file(path):
+    """Dosyayı thread'in yeniden kullanılan tamponuna okur; uint8 görünüm döner."""
+    import numpy as np
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            buffer = _local.buffer = np.empty(size, dtype=np.uint8)
+        read = f.readinto(memoryview(buffer)[:size])
+    return buffer[:read]
+
+
+def jpeg_size(data):
+    """JPEG başlığındaki (genişlik, yükseklik); JPEG değilse veya bulunamazsa None."""
+    view = memoryview(data)
+    length = len(view)
+    if length < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < length:
+        if view[i] != 0xFF:
+            i += 1
+            continue
+        marker = view[i + 1]
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Dolgu byte'ı ve uzunluksuz işaretler
+            i += 1 if marker == 0xFF else 2
+            continue
+        if marker in SOF_MARKERS:
+            height = (view[i + 5] << 8) | view[i + 6]
+            width = (view[i + 7] << 8) | view[i + 8]
+            return width, height
+        i += 2 + ((view[i + 2] << 8) | view[i + 3])
+    return None
+
+
+def reduction_factor(width, height, max_side):
+    """Uzun kenarı max_side'ın altına düşürmeyen en büyük JPEG ölçek böleni."""
+    if not max_side:
+        return 1
+    for factor in REDUCTION_FACTORS:
+        if max(width, height) / factor >= max_side:
+            return factor
+    return 1
+
+
+def decode_image(path, max_side=None):
+    """
+    Görseli BGR olarak çözer; okunamazsa None döner. max_side (varsayılan
+    DECODE_MAX_SIDE) JPEG'lerde küçültülmüş çözmeyi açar.
+    """
+    import cv2
+
+    max_side = config.DECODE_MAX_SIDE if max_side is None else max_side
+    started = time.perf_counter()
+    try:
+        data = read_file(path)
+    except OSError as e:
+        print(f"Could not read {path}: {e}")
+        return None
+
+    size = jpeg_size(data) if max_side else None
+    factor = reduction_factor(*size, max_side) if size else 1
+    flags = getattr(cv2, f"IMREAD_REDUCED_COLOR_{factor}") if factor > 1 else cv2.IMREAD_COLOR
+    image = cv2.imdecode(data, flags)
+    if image is None:
+        return None
+
+    decoded_height, decoded_width = image.shape[:2]
+    if factor == 1:
+        width, height = decoded_width, decoded_height
+    else:
+        width, height = size
+        # EXIF yönü uygulandıysa başlıktaki boyutlar yer değiştirir
+        if (decoded_width > decoded_height) != (width > height):
+            width, height = height, width
+    return DecodedImage(image=image, width=width, height=height, scale=decoded_width / width,
+                        seconds=time.perf_counter() - started)
+
+
+def get_decode_pool():
+    """Süreç boyunca paylaşılan, DECODE_THREADS thread'lik çözme havuzu."""
+    global _decode_pool
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _decode_pool_lock:
+        if _decode_pool is None:
+            _decode_pool = ThreadPoolExecutor(max_workers=max(1, config.DECODE_THREADS),
+                                              thread_name_prefix='wise-decode')
+        return _decode_pool
+
+
+def prefetch(image_paths, depth=None, max_side=None):
+    """
+    (image_path, DecodedImage veya None) çiftlerini girdi sırasıyla döner.
+    Görseller havuzda önden çözülür; bellekte en fazla depth çözülmüş görsel
+    bekler. depth 0 ise görseller çağıran thread'de sırayla çözülür.
+    """
+    depth = config.DECODE_PREFETCH if depth is None else depth
+    if depth <= 0:
+        for image_path in image_paths:
+            yield image_path, decode_image(image_path, max_side=max_side)
+        return
+
+    pool = get_decode_pool()
+    paths = iter(image_paths)
+    in_flight = deque()
+    try:
+        for image_path in paths:
+            in_flight.append((image_path, pool.submit(decode_image, image_path, max_side)))
+            if len(in_flight) >= depth:
+                break
+        while in_flight:
+            image_path, future = in_flight.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                in_flight.append((next_path, pool.submit(decode_image, next_path, max_side)))
+            try:
+                decoded = future.result()
+            except Exception as e:
+                print(f"Error decoding {image_path}: {e}")
+                decoded = None
+            yield image_path, decoded
+    finally:
+        # Tüketici erken bıraktıysa bekleyen çözmeler iptal edilir
+        for _, future in in_flight:
+            future.cancel()
@@ -0,0 +1,176 @@
+# core/jobs.py
+
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import config, metrics
+from .models import ProcessingJob
+from .workspace import Workspace, cleanup_expired_workspaces
+
+
+def enqueue_job(job_id, user, analysis_date, workspace, image_paths):
+    """Görselleri çalışma alanına kaydedilmiş bir yüklemeyi kuyruğa ekler."""
+    return ProcessingJob.objects.create(
+        id=job_id,
+        user=user,
+        analysis_date=analysis_date,
+        workspace=workspace.root,
+        image_paths=list(image_paths),
+        total_images=len(image_paths),
+    )
+
+
+def claim_next_job(worker_id):
+    """
+    Sıradaki bekleyen işi bu worker'a atar. Koşullu UPDATE kullanıldığı için
+    aynı iş iki worker tarafından alınamaz (PostgreSQL ve SQLite'ta çalışır).
+    """
+    candidates = (ProcessingJob.objects
+                  .filter(status=ProcessingJob.STATUS_PENDING)
+                  .order_by('created_at')
+                  .values_list('id', flat=True)[:5])
+    for job_id in candidates:
+        claimed = ProcessingJob.objects.filter(id=job_id, status=ProcessingJob.STATUS_PENDING).update(
+            status=ProcessingJob.STATUS_RUNNING,
+            worker=worker_id,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return ProcessingJob.objects.select_related('user').get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs(max_age_seconds=None):
+    """Worker'ı ölmüş (uzun süredir 'running') işleri tekrar kuyruğa alır."""
+    max_age_seconds = config.JOB_STALE_SECONDS if max_age_seconds is None else max_age_seconds
+    cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+    return ProcessingJob.objects.filter(
+        status=ProcessingJob.STATUS_RUNNING, started_at__lt=cutoff,
+    ).update(status=ProcessingJob.STATUS_PENDING, worker='', processed_images=0)
+
+
+def run_job(job):
+    from .main import main as process_images
+
+    if job.streaming:
+        return _run_streaming_job(job)
+
+    def report_progress(done, total):
+        ProcessingJob.objects.filter(id=job.id).update(processed_images=done, total_images=total)
+
+    workspace = Workspace(job.workspace)
+    try:
+        statistics = process_images(job.image_paths, job.analysis_date, job.user,
+                                    workspace=workspace,
+                                    progress_callback=report_progress)
+    except Exception:
+        error = traceback.format_exc()
+        print(f"Job {job.id} failed:\n{error}")
+        ProcessingJob.objects.filter(id=job.id).update(
+            status=ProcessingJob.STATUS_FAILED, error=error, finished_at=timezone.now())
+        workspace.remove_images()
+        return False
+
+    ProcessingJob.objects.filter(id=job.id).update(
+        status=ProcessingJob.STATUS_DONE, statistics=statistics, finished_at=timezone.now())
+    return True
+
+
+def _run_streaming_job(job):
+    from .model_registry import get_registry
+    from .streaming import run_streaming_job
+
+    try:
+        run_streaming_job(job, get_registry().models())
+    except Exception:
+        error = traceback.format_exc()
+        print(f"Streaming job {job.id} failed:\n{error}")
+        ProcessingJob.objects.filter(id=job.id).update(
+            status=ProcessingJob.STATUS_FAILED, error=error, finished_at=timezone.now(),
+            accepting_images=False)
+        Workspace(job.workspace).remove_images()
+        return False
+    return True
+
+
+def worker_loop(poll_interval=None, stop_after=None):
+    """
+    Kuyruktan iş çekip işleyen döngü. Modeller döngü başlamadan bir kez
+    yüklenir ve tüm işler boyunca bellekte kalır.
+    stop_after: bu kadar iş işlendikten sonra döner (None: sonsuz).
+    """
+    from .startup import prepare_worker
+
+    from .streaming import expire_idle_sessions
+
+    poll_interval = config.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    prepare_worker()
+    print(f"Worker {worker_id} ready.")
+
+    processed = 0
+    last_cleanup = last_expiry = last_requeue = 0.0
+    while stop_after is None or processed < stop_after:
+        # Çöken bir worker'ın işi bir sonraki yeniden başlatmayı beklemez
+        if time.monotonic() - last_requeue >= config.JOB_REQUEUE_INTERVAL:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                print(f"Requeued {requeued} stale job(s).")
+            last_requeue = time.monotonic()
+        if time.monotonic() - last_cleanup >= config.WORKSPACE_CLEANUP_INTERVAL:
+            cleanup_expired_workspaces()
+            last_cleanup = time.monotonic()
+        if time.monotonic() - last_expiry >= config.STREAM_EXPIRE_INTERVAL:
+            expire_idle_sessions()
+            last_expiry = time.monotonic()
+
+        close_old_connections()
+        job = claim_next_job(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        print(f"Worker {worker_id} processing job {job.id} ({job.total_images} images)")
+        run_job(job)
+        processed += 1
+        # İş sonu metrikleri bir sonraki periyodik yazmayı beklemeden görünür olsun
+        try:
+            metrics.flush()
+        except OSError as e:
+            print(f"Could not write metrics snapshot: {e}")
+    return processed
+
+
+def _worker_process(poll_interval):
+    # spawn ile açılan süreçte Django'yu yeniden kur
+    import django
+    django.setup()
+    worker_loop(poll_interval=poll_interval)
+
+
+def start_workers(processes=None, poll_interval=None):
+    """Yerel worker süreçlerini başlatır ve bitmelerini bekler."""
+    import multiprocessing
+    from django.db import connections
+
+    processes = processes or config.JOB_WORKERS
+    connections.close_all()
+
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(target=_worker_process, args=(poll_interval,), name=f"wise-worker-{i}", daemon=True)
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
@@ -1,39 +1,45 @@
-import os
-import shutil
+class ModelsUnavailable(RuntimeError):
+    """Hiçbir model yüklenemediğinde main() tarafından fırlatılır."""
 
-def main(image_paths, analysis_date, user):
-    # importları fonksiyon içine aldık
-    from .model_loader import load_models  # Aynı dizindeki model_loader'ı import et
-    from .processor import process_directory
-    from .stats_utils import collect_and_print_statistics
-
-    output_base_dir = 'outputs'
-    image_directory = 'images'
 
-    if os.path.exists(output_base_dir):
-        shutil.rmtree(output_base_dir)
-    os.makedirs(output_base_dir, exist_ok=True)
+def main(image_paths, analysis_date, user, workspace=None, progress_callback=None):
+    """
+    Yalnızca image_paths listesindeki görselleri işler. Kırpımlar paylaşılan
+    kırpım deposuna (CROP_STORE_DIR) yazılır; paylaşılan dizinler silinmez.
+    Bu yüklemenin israf istatistiklerini döner (stats_utils.build_statistics).
+    """
+    # importları fonksiyon içine aldık
+    from .model_registry import get_registry  # Modeller süreç başına bir kez yüklenir
+    from .processor import process_images
+    from .stats_utils import build_statistics, print_statistics
+    from .workspace import create_workspace
 
+    if workspace is None:
+        workspace = create_workspace()
     print("Loading models...")
-    models = load_models()
+    models = get_registry().models()
     if not models:
-        print("No models were loaded successfully. Exiting...")
-        return
+        # İş / istek başarısız sayılır; yüklenen görseller çalışma alanında kalmaz
+        workspace.remove_images()
+        raise ModelsUnavailable("No models were loaded successfully.")
 
-    if not os.path.exists(image_directory):
-        print(f"Image directory not found: {image_directory}")
+    if not image_paths:
+        print("No images to process.")
         return
 
     print("Starting image processing...")
-    process_directory(image_directory, models, output_base_dir, analysis_date=analysis_date, user=user)
+    analyses = process_images(image_paths, models, analysis_date=analysis_date, user=user,
+                              progress_callback=progress_callback)
 
-    collect_and_print_statistics(output_base_dir, analysis_date=analysis_date)
+    # İstatistikler dizin taranmadan bu çalıştırmanın sonuçlarından hesaplanır
+    statistics = build_statistics(analyses)
+    print_statistics(statistics, analysis_date=analysis_date)
 
-    if os.path.exists(image_directory):
-        shutil.rmtree(image_directory)
-        print(f"Image directory '{image_directory}' removed.")
+    workspace.remove_images()
+    print(f"Image directory '{workspace.images_dir}' removed.")
 
     print("Tüm işlemler tamamlandı.")
+    return statistics
 
 if __name__ == "__main__":
     main([], None, None)
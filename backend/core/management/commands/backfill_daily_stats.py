@@ -0,0 +1,36 @@
+# core/management/commands/backfill_daily_stats.py
+
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = "Mevcut FoodAnalysis kayıtlarından DailyWasteStat günlük özetlerini yeniden oluşturur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Yalnızca bu kullanıcı (username)')
+        parser.add_argument('--start', help='Başlangıç tarihi, YYYY-MM-DD')
+        parser.add_argument('--end', help='Bitiş tarihi, YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        from core.rollups import backfill_daily_stats
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User not found: {options['user']}")
+        start = _parse_date(options['start']) if options['start'] else None
+        end = _parse_date(options['end']) if options['end'] else None
+
+        deleted, created = backfill_daily_stats(user=user, start=start, end=end)
+        self.stdout.write(f"Replaced {deleted} daily stat row(s) with {created} recomputed row(s).")
@@ -0,0 +1,110 @@
+# core/management/commands/bench_backends.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Çıkarım backend'lerini eager modellere karşı karşılaştırır: sınıflandırıcı "
+            "çıktılarının uyumu (parity) ve throughput.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=['torchscript', 'onnx'],
+                            choices=['torchscript', 'onnx'])
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--images', default=None,
+                            help='Plaka dedektörü için örnek görsel dizini (opsiyonel)')
+        parser.add_argument('--atol', type=float, default=1e-3,
+                            help='Softmax olasılıkları için izin verilen en büyük fark')
+
+    def handle(self, *args, **options):
+        import torch
+
+        from core.backends import DETECTOR_MODELS
+        from core.model_registry import ModelRegistry
+
+        eager = ModelRegistry(backend='eager', hot_reload=False).models()
+        if not eager:
+            raise CommandError("No eager models could be loaded.")
+        others = {b: ModelRegistry(backend=b, hot_reload=False).models() for b in options['backends']}
+
+        torch.manual_seed(0)
+        batch = torch.randn(options['batch_size'], 3, 224, 224)
+        failures = 0
+
+        for name, model in eager.items():
+            if name in DETECTOR_MODELS:
+                continue
+            with torch.no_grad():
+                reference = torch.softmax(model(batch), dim=1)
+            eager_ms = self._time(lambda: model(batch), options['iterations'])
+            self.stdout.write(f"\n{name}: eager {eager_ms:.1f} ms/batch")
+
+            for backend, models in others.items():
+                if name not in models:
+                    self.stdout.write(f"  {backend:<12} missing (run export_models)")
+                    continue
+                candidate = models[name]
+                with torch.no_grad():
+                    probs = torch.softmax(candidate(batch), dim=1)
+                max_diff = (probs - reference).abs().max().item()
+                agreement = (probs.argmax(1) == reference.argmax(1)).float().mean().item()
+                ok = max_diff <= options['atol'] and agreement == 1.0
+                failures += not ok
+                ms = self._time(lambda: candidate(batch), options['iterations'])
+                self.stdout.write(
+                    f"  {backend:<12} {ms:8.1f} ms/batch  x{eager_ms / ms:.2f}  "
+                    f"max|Δp|={max_diff:.2e}  argmax={agreement * 100:.1f}%  {'OK' if ok else 'MISMATCH'}"
+                )
+
+        if options['images']:
+            failures += self._compare_detectors(eager, others, options['images'])
+
+        if failures:
+            raise CommandError(f"{failures} parity check(s) failed.")
+
+    def _time(self, fn, iterations):
+        import torch
+
+        with torch.no_grad():
+            fn()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+        return (time.perf_counter() - started) / iterations * 1000
+
+    def _compare_detectors(self, eager, others, image_dir):
+        import cv2
+
+        paths = sorted(os.path.join(image_dir, f) for f in os.listdir(image_dir)
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        images = [img for img in (cv2.imread(p) for p in paths) if img is not None]
+        if not images or 'wisePlate' not in eager:
+            return 0
+
+        def categories(model, img):
+            result = model(img)
+            return sorted(result.names[int(c)] for c in result.xywh[0][:, 5].tolist())
+
+        reference = [categories(eager['wisePlate'], img) for img in images]
+        started = time.perf_counter()
+        for img in images:
+            eager['wisePlate'](img)
+        eager_ms = (time.perf_counter() - started) / len(images) * 1000
+        self.stdout.write(f"\nwisePlate: eager {eager_ms:.1f} ms/image ({len(images)} images)")
+
+        failures = 0
+        for backend, models in others.items():
+            if 'wisePlate' not in models:
+                continue
+            started = time.perf_counter()
+            found = [categories(models['wisePlate'], img) for img in images]
+            ms = (time.perf_counter() - started) / len(images) * 1000
+            matching = sum(a == b for a, b in zip(found, reference))
+            failures += matching != len(images)
+            self.stdout.write(f"  {backend:<12} {ms:8.1f} ms/image  x{eager_ms / ms:.2f}  "
+                              f"same categories on {matching}/{len(images)} images")
+        return failures
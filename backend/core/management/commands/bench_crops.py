@@ -0,0 +1,63 @@
+# core/management/commands/bench_crops.py
+
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Kırpım başına ön işleme maliyetini ölçer: eski geçici JPEG dosyası yolu "
+            "ile bellek içi (numpy -> tensör) yolu karşılaştırır.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--crops', type=int, default=200, help='Sentetik kırpım sayısı')
+        parser.add_argument('--width', type=int, default=320)
+        parser.add_argument('--height', type=int, default=240)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        import cv2
+        import numpy as np
+
+        from core.utils_image import preprocess_image, preprocess_array
+
+        rng = np.random.default_rng(options['seed'])
+        crops = [
+            rng.integers(0, 256, size=(options['height'], options['width'], 3), dtype=np.uint8)
+            for _ in range(options['crops'])
+        ]
+        output_dir = tempfile.mkdtemp(prefix='wise-bench-')
+
+        def temp_file_path(crop, i):
+            # Eski yol: imwrite -> PIL ile tekrar oku -> copy2 ile çıktıya kopyala
+            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
+                temp_path = temp_file.name
+                cv2.imwrite(temp_path, crop)
+            tensor = preprocess_image(temp_path)
+            shutil.copy2(temp_path, os.path.join(output_dir, f"{i}.jpg"))
+            os.remove(temp_path)
+            return tensor
+
+        def in_memory_path(crop, i):
+            return preprocess_array(crop)
+
+        try:
+            # Dönüşüm önbelleği ve import maliyeti ölçüme girmesin
+            in_memory_path(crops[0], 0)
+            results = {}
+            for name, fn in (('temp-file', temp_file_path), ('in-memory', in_memory_path)):
+                started = time.perf_counter()
+                for i, crop in enumerate(crops):
+                    fn(crop, i)
+                elapsed = time.perf_counter() - started
+                results[name] = elapsed / len(crops) * 1000
+                self.stdout.write(f"{name:>10}: {results[name]:.3f} ms/crop")
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        saved = results['temp-file'] - results['in-memory']
+        self.stdout.write(f"Saving: {saved:.3f} ms/crop "
+                          f"({saved / results['temp-file'] * 100:.1f}%)")
@@ -0,0 +1,68 @@
+# core/management/commands/bench_parallel.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Görsel seviyesinde paralelliğin (okuma + plaka tespiti) 1..N worker "
+            "arasındaki ölçeklenmesini ölçer. Veritabanına yazmaz. process modunda "
+            "süreçler registry'nin yüklediği plaka modeli dosyasını yükler; tüm "
+            "worker sayıları aynı modeli ölçer.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('image_dir', help='Test görsellerinin bulunduğu dizin')
+        parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Görsel listesini bu kadar kez tekrarla')
+
+    def handle(self, *args, **options):
+        from core.model_registry import get_registry
+        from core.parallel import iter_detections, shutdown_process_pool
+
+        image_dir = options['image_dir']
+        if not os.path.isdir(image_dir):
+            raise CommandError(f"Image directory not found: {image_dir}")
+        image_paths = sorted(
+            os.path.join(image_dir, f) for f in os.listdir(image_dir)
+            if f.lower().endswith(('.png', '.jpg', '.jpeg'))
+        ) * options['repeat']
+        if not image_paths:
+            raise CommandError(f"No images in {image_dir}")
+
+        models = {'wisePlate': get_registry().get('wisePlate')}
+        if models['wisePlate'] is None:
+            raise CommandError("wisePlate model could not be loaded.")
+
+        worker_counts = sorted({1, *[w for w in (2, 4, 8, 16, 32, 64) if w < options['max_workers']],
+                                options['max_workers']})
+        baseline = None
+        reference = None
+        self.stdout.write(f"{len(image_paths)} images, mode={options['mode']}")
+        for workers in worker_counts:
+            if options['mode'] == 'process' and workers > 1:
+                # Havuzun açılışı ve model yüklemesi ölçüme girmesin
+                list(iter_detections(image_paths[:workers], models, workers=workers, mode='process'))
+
+            started = time.perf_counter()
+            results = [
+                (path, [(d.category, d.index) for d in detections])
+                for path, detections, _ in iter_detections(image_paths, models, workers=workers,
+                                                         mode=options['mode'])
+            ]
+            elapsed = time.perf_counter() - started
+
+            if reference is None:
+                reference = results
+            elif results != reference:
+                self.stderr.write(f"workers={workers}: detections differ from the serial run!")
+
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"workers={workers:>3}  {elapsed:8.2f}s  "
+                f"{len(image_paths) / elapsed:8.2f} img/s  speedup x{baseline / elapsed:.2f}"
+            )
+        shutdown_process_pool()
@@ -0,0 +1,110 @@
+# core/management/commands/bench_pipeline.py
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _int_list(value):
+    try:
+        values = sorted({int(v) for v in value.split(',') if v.strip()})
+    except ValueError:
+        raise CommandError(f"Expected a comma separated list of integers: {value}")
+    if not values or min(values) < 1:
+        raise CommandError(f"Values must be positive integers: {value}")
+    return values
+
+
+class Command(BaseCommand):
+    help = ("Gerçek model ağırlıkları olmadan tekrarlanabilir uçtan uca benchmark: sentetik tabla "
+            "görselleri ve aynı arayüzlü rastgele ağırlıklı küçük modellerle process_detection "
+            "gecikmesini, process_directory verimini ve tepe RSS'i batch / worker ayarlarına göre "
+            "ölçer, sonuçları JSON olarak yazar. Veritabanı yazmaları geri alınır.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=64, help='Sentetik görsel sayısı')
+        parser.add_argument('--width', type=int, default=1280)
+        parser.add_argument('--height', type=int, default=960)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-sizes', type=_int_list, default=[1, 8, 32],
+                            help='Sınıflandırma batch boyutları, virgülle ayrılmış')
+        parser.add_argument('--workers', type=_int_list, default=[1, 2, 4],
+                            help='Paralel tespit worker sayıları, virgülle ayrılmış')
+        parser.add_argument('--repeats', type=int, default=3, help='Her ayar için tekrar sayısı')
+        parser.add_argument('--latency-images', type=int, default=32,
+                            help='process_detection gecikmesi için görsel sayısı')
+        parser.add_argument('--model-width', type=int, default=16, help='Stub modellerin kanal genişliği')
+        parser.add_argument('--imgsz', type=int, default=320, help='Stub dedektörün giriş boyutu')
+        parser.add_argument('--torch-threads', type=int, default=None)
+        parser.add_argument('--image-dir', help='Sentetik görsellerin yazılacağı dizin (varsayılan: geçici)')
+        parser.add_argument('--output', default='bench_pipeline.json', help='Sonuç JSON dosyası')
+
+    def handle(self, *args, **options):
+        import torch
+        from django.contrib.auth.models import User
+        from django.db import transaction
+
+        from core.benchmark import (
+            environment, generate_dataset, measure_latency, measure_throughput, stub_models,
+        )
+
+        if options['torch_threads']:
+            torch.set_num_threads(options['torch_threads'])
+
+        temp_dir = tempfile.mkdtemp(prefix='wise-bench-pipeline-')
+        image_dir = options['image_dir'] or os.path.join(temp_dir, 'images')
+        try:
+            started = time.perf_counter()
+            image_paths = generate_dataset(image_dir, options['images'], width=options['width'],
+                                           height=options['height'], seed=options['seed'])
+            self.stdout.write(f"Generated {len(image_paths)} synthetic images in "
+                              f"{time.perf_counter() - started:.1f}s ({image_dir})")
+
+            models = stub_models(width=options['model_width'], imgsz=options['imgsz'], seed=options['seed'])
+            result = {
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'environment': environment(),
+                'parameters': {name: options[name] for name in (
+                    'images', 'width', 'height', 'seed', 'batch_sizes', 'workers', 'repeats',
+                    'latency_images', 'model_width', 'imgsz')},
+                'latency': None,
+                'throughput': [],
+            }
+
+            # Yazılan analizler ve geçici kullanıcı benchmark sonunda geri alınır
+            with transaction.atomic():
+                user = User.objects.create(username=f"wise-bench-{os.getpid()}")
+                analysis_date = date.today()
+
+                # İlk çağrıdaki tembel ilklendirmeler ölçüme girmesin
+                measure_latency(image_paths[:2], models, user=user, analysis_date=analysis_date)
+
+                result['latency'] = measure_latency(image_paths[:options['latency_images']], models,
+                                                    user=user, analysis_date=analysis_date)
+                latency = result['latency']
+                self.stdout.write(f"process_detection: p50 {latency['p50_ms']:.1f} ms  "
+                                  f"p95 {latency['p95_ms']:.1f} ms  p99 {latency['p99_ms']:.1f} ms")
+
+                for workers in options['workers']:
+                    for batch_size in options['batch_sizes']:
+                        run = measure_throughput(image_dir, models, batch_size, workers, user=user,
+                                                 analysis_date=analysis_date, repeats=options['repeats'])
+                        result['throughput'].append(run)
+                        latency = run['result_latency_ms']
+                        self.stdout.write(
+                            f"workers={workers:>2} batch={batch_size:>3}  "
+                            f"{run['images_per_second']:8.2f} img/s  "
+                            f"result p50 {latency['p50']:.0f} ms  p95 {latency['p95']:.0f} ms  "
+                            f"peak RSS {run['peak_rss_bytes'] / 2**20:.0f} MiB")
+                transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, default=str)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
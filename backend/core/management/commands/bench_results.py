@@ -0,0 +1,103 @@
+# core/management/commands/bench_results.py
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Sonuç API'sinin büyük veri üzerindeki gecikmesini ölçer. Verilen kullanıcı için "
+            "sentetik FoodAnalysis satırları oluşturur ve farklı sorguları zamanlar.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--username', default='bench-results')
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--skip-seed', action='store_true', help='Mevcut veriyi kullan')
+        parser.add_argument('--cleanup', action='store_true', help='Bitince kullanıcıyı ve verisini sil')
+
+    def seed(self, user, rows, days):
+        from core.config import FOOD_TYPES
+        from core.models import FoodAnalysis
+
+        rng = random.Random(0)
+        today = date.today()
+        categories = list(FOOD_TYPES)
+        batch = []
+        for i in range(rows):
+            category = rng.choice(categories)
+            wasted = rng.random() < 0.4
+            batch.append(FoodAnalysis(
+                user=user,
+                category=category,
+                food_type=rng.choice(list(FOOD_TYPES[category].values())),
+                waste_count=int(wasted),
+                no_waste_count=int(not wasted),
+                waste_ratio=rng.random(),
+                analysis_date=today - timedelta(days=rng.randrange(days)),
+            ))
+            if len(batch) >= 10_000:
+                FoodAnalysis.objects.bulk_create(batch)
+                batch = []
+                self.stdout.write(f"  seeded {i + 1}/{rows}", ending='\r')
+        if batch:
+            FoodAnalysis.objects.bulk_create(batch)
+        self.stdout.write(f"  seeded {rows} rows")
+
+    def call(self, view, user, params):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        request = APIRequestFactory().get('/api/food/results/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        return response
+
+    def timed(self, label, view, user, params, repeat):
+        samples = []
+        response = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = self.call(view, user, params)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        self.stdout.write(f"{label:<32} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+        return response
+
+    def handle(self, *args, **options):
+        from core.views import get_analysis_results
+
+        user, _ = User.objects.get_or_create(username=options['username'])
+        if not options['skip_seed']:
+            self.stdout.write(f"Seeding {options['rows']} rows for '{user.username}'...")
+            self.seed(user, options['rows'], options['days'])
+
+        repeat = options['repeat']
+        start = (date.today() - timedelta(days=30)).isoformat()
+        response = self.timed('first page (limit=100)', get_analysis_results, user, {'limit': 100}, repeat)
+
+        # 50 sayfa ileri git, derin sayfa maliyetini ölç
+        cursor = response.data['next_cursor']
+        for _ in range(50):
+            if not cursor:
+                break
+            response = self.call(get_analysis_results, user, {'limit': 100, 'cursor': cursor})
+            cursor = response.data['next_cursor']
+        if cursor:
+            self.timed('page 51 (cursor)', get_analysis_results, user, {'limit': 100, 'cursor': cursor}, repeat)
+
+        self.timed('last 30 days, limit=100', get_analysis_results, user,
+                   {'limit': 100, 'start': start}, repeat)
+        self.timed('category filter, limit=100', get_analysis_results, user,
+                   {'limit': 100, 'category': 'corba'}, repeat)
+        self.timed('sparse fields, limit=1000', get_analysis_results, user,
+                   {'limit': 1000, 'fields': 'category,waste_count,analysis_date'}, repeat)
+
+        if options['cleanup']:
+            user.delete()
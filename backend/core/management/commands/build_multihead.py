@@ -0,0 +1,48 @@
+# core/management/commands/build_multihead.py
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Her kategori için israf ve tür sınıflandırıcılarını ortak omurgalı iki başlı "
+            "bir modelde birleştirir ve export dizinine yazar (omurgalar aynıysa).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['torchscript', 'onnx', 'all'], default='all')
+        parser.add_argument('--atol', type=float, default=0.0,
+                            help='Omurga ağırlıkları arasında izin verilen en büyük fark')
+
+    def handle(self, *args, **options):
+        from core.backends import export_module, model_names, unwrap_module
+        from core.config import MULTIHEAD_MODEL_MAPPING, TYPE_MODEL_MAPPING, WASTE_MODEL_MAPPING
+        from core.model_loader import get_export_dir, get_model_paths, load_model
+        from core.multihead import backbone_difference, build_multihead
+
+        formats = ('torchscript', 'onnx') if options['format'] == 'all' else (options['format'],)
+        model_paths = get_model_paths(quantized=())
+
+        for category, name in MULTIHEAD_MODEL_MAPPING.items():
+            waste_path = model_paths[WASTE_MODEL_MAPPING[category]]
+            type_path = model_paths[TYPE_MODEL_MAPPING[category]]
+            if not waste_path.exists() or not type_path.exists():
+                self.stderr.write(f"{category}: model files missing, skipping")
+                continue
+
+            waste_model, type_model = load_model(waste_path), load_model(type_path)
+            waste_module, type_module = unwrap_module(waste_model), unwrap_module(type_model)
+            combined = build_multihead(waste_module, type_module, atol=options['atol'])
+            if combined is None:
+                difference = backbone_difference(waste_module, type_module)
+                reason = ("different architectures" if difference is None
+                          else f"backbone weights differ (max |Δw| = {difference:.3g})")
+                self.stdout.write(f"{category}: cannot share a backbone, {reason}; "
+                                  f"keeping separate models")
+                continue
+
+            written = export_module(
+                combined, name, 'multihead',
+                {'waste': model_names(waste_model), 'type': model_names(type_model)},
+                get_export_dir(), formats=formats,
+            )
+            for path in written:
+                self.stdout.write(f"{category}: {name} -> {path}")
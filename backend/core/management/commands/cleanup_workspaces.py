@@ -0,0 +1,17 @@
+# core/management/commands/cleanup_workspaces.py
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Süresi dolmuş istek/iş çalışma alanlarını (WISE_WORKSPACE_ROOT) siler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=None,
+                            help='Saniye cinsinden yaşam süresi (varsayılan: WISE_WORKSPACE_TTL_SECONDS)')
+
+    def handle(self, *args, **options):
+        from core.workspace import cleanup_expired_workspaces
+
+        removed = cleanup_expired_workspaces(ttl_seconds=options['ttl'])
+        self.stdout.write(f"Removed {removed} expired workspace(s).")
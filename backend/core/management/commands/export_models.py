@@ -0,0 +1,51 @@
+# core/management/commands/export_models.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Dokuz .pt modelini TorchScript ve/veya ONNX formatına bir kez dönüştürür "
+            "(WISE_INFERENCE_BACKEND=torchscript|onnx ile kullanılır).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['torchscript', 'onnx', 'all'], default='all')
+        parser.add_argument('--output', default=None, help='Hedef dizin (varsayılan: models/export)')
+        parser.add_argument('--models', nargs='*', default=None, help='Yalnızca bu modeller')
+
+    def handle(self, *args, **options):
+        from core.backends import DETECTOR_MODELS, export_module, model_names, unwrap_module
+        from core.model_loader import get_export_dir, get_model_paths, load_model
+
+        formats = ('torchscript', 'onnx') if options['format'] == 'all' else (options['format'],)
+        export_dir = options['output'] or get_export_dir()
+        model_paths = get_model_paths()
+        selected = options['models'] or list(model_paths)
+        unknown = [name for name in selected if name not in model_paths]
+        if unknown:
+            raise CommandError(f"Unknown model(s): {', '.join(unknown)}")
+
+        failures = 0
+        for name in selected:
+            path = model_paths[name]
+            if not path.exists():
+                self.stderr.write(f"Model dosyası bulunamadı: {path}")
+                failures += 1
+                continue
+            try:
+                model = load_model(path)
+                written = export_module(
+                    unwrap_module(model), name,
+                    kind='detector' if name in DETECTOR_MODELS else 'classifier',
+                    names=model_names(model),
+                    export_dir=export_dir,
+                    formats=formats,
+                )
+            except Exception as e:
+                self.stderr.write(f"Export failed for {name}: {e}")
+                failures += 1
+                continue
+            for output in written:
+                self.stdout.write(f"{name} -> {output}")
+
+        if failures:
+            raise CommandError(f"{failures} model(s) could not be exported.")
@@ -0,0 +1,77 @@
+# core/management/commands/fetch_yolov5.py
+
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+ARCHIVE_URL = "https://github.com/ultralytics/yolov5/archive/refs/tags/{ref}.zip"
+
+
+class Command(BaseCommand):
+    help = ("YOLOv5 yükleme kodunun sabit bir sürümünü yerel dizine (varsayılan: third_party/yolov5) "
+            "kopyalar. Kopya varsa eager modeller torch.hub ağına ve önbelleğine gitmeden yüklenir; "
+            "imaj build'inde bir kez çalıştırılır.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ref', default=None, help='YOLOv5 sürüm etiketi (varsayılan: WISE_YOLOV5_REF)')
+        parser.add_argument('--dest', default=None,
+                            help='Hedef dizin (varsayılan: WISE_YOLOV5_DIR veya third_party/yolov5)')
+        parser.add_argument('--from-cache', action='store_true',
+                            help='İndirmek yerine torch.hub önbelleğindeki kopyayı kullan')
+        parser.add_argument('--force', action='store_true', help='Var olan kopyanın üzerine yaz')
+
+    def handle(self, *args, **options):
+        from core import config
+        from core.model_loader import VENDOR_YOLOV5_DIR
+
+        ref = options['ref'] or config.YOLOV5_REF
+        dest = Path(options['dest'] or config.YOLOV5_DIR or VENDOR_YOLOV5_DIR)
+        if (dest / 'hubconf.py').exists() and not options['force']:
+            self.stdout.write(f"YOLOv5 already present at {dest} (use --force to replace it).")
+            return
+
+        with tempfile.TemporaryDirectory(prefix='wise-yolov5-') as tmp:
+            if options['from_cache']:
+                source = self._from_hub_cache(ref)
+            else:
+                source = self._download(ref, Path(tmp))
+            if not (source / 'hubconf.py').exists():
+                raise CommandError(f"{source} does not look like a YOLOv5 checkout (hubconf.py missing)")
+
+            if dest.exists():
+                shutil.rmtree(dest)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copytree(source, dest, ignore=shutil.ignore_patterns('.git', '.github', '__pycache__'))
+        (dest / 'WISE_YOLOV5_REF').write_text(f"{ref}\n", encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f"YOLOv5 {ref} copied to {dest}"))
+
+    def _from_hub_cache(self, ref):
+        import torch
+
+        # torch.hub önbellek dizini: <hub>/<sahip>_<repo>_<ref>
+        source = Path(torch.hub.get_dir()) / f"ultralytics_yolov5_{ref.replace('/', '_')}"
+        if not source.is_dir():
+            raise CommandError(f"YOLOv5 {ref} is not in the torch.hub cache ({source})")
+        return source
+
+    def _download(self, ref, tmp):
+        import torch
+
+        url = ARCHIVE_URL.format(ref=ref)
+        archive = tmp / 'yolov5.zip'
+        self.stdout.write(f"Downloading {url}")
+        try:
+            torch.hub.download_url_to_file(url, str(archive), progress=False)
+        except Exception as e:
+            raise CommandError(f"Could not download {url}: {e}")
+        with zipfile.ZipFile(archive) as zf:
+            zf.extractall(tmp)
+        # Arşiv tek bir yolov5-<ref> dizini içerir
+        roots = [tmp / name for name in os.listdir(tmp) if (tmp / name).is_dir()]
+        if len(roots) != 1:
+            raise CommandError(f"Unexpected archive layout in {url}")
+        return roots[0]
@@ -0,0 +1,100 @@
+# core/management/commands/quantize_models.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Sınıflandırıcıların INT8 sürümlerini üretir ve FP32 modellere karşı doğruluk "
+            "raporu çıkarır. Önce 'export_models --format onnx' çalıştırılmalıdır. "
+            "Üretilen modeller WISE_QUANTIZED_MODELS ile model bazında seçilir.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('calibration_dir',
+                            help='Kategori alt dizinleri (corba/, ana-yemek/, ...) olan kırpım klasörü')
+        parser.add_argument('--mode', choices=['static', 'dynamic'], default='static')
+        parser.add_argument('--models', nargs='*', default=None, help='Yalnızca bu sınıflandırıcılar')
+        parser.add_argument('--limit', type=int, default=200,
+                            help='Kategori başına kullanılacak en fazla kırpım')
+        parser.add_argument('--holdout', type=float, default=0.25,
+                            help='Kalibrasyona girmeyen ve uyumun ölçüldüğü kırpım oranı (static)')
+        parser.add_argument('--report', default=None, help='Doğruluk raporunun yazılacağı JSON dosyası')
+        parser.add_argument('--min-agreement', type=float, default=0.98,
+                            help='Bu oranın altındaki uyum regresyon sayılır')
+
+    def handle(self, *args, **options):
+        from core.config import WASTE_MODEL_MAPPING
+        from core.backends import export_path, load_onnx, quantized_path
+        from core.model_loader import get_export_dir
+        from core.quantization import (
+            classifier_categories, compare_classifiers, load_category_crops, quantize_classifier,
+            split_crops,
+        )
+
+        categories = classifier_categories()
+        selected = options['models'] or sorted(categories)
+        unknown = [name for name in selected if name not in categories]
+        if unknown:
+            raise CommandError(f"Not a classifier: {', '.join(unknown)}")
+
+        if not 0 < options['holdout'] < 1:
+            raise CommandError("--holdout must be between 0 and 1")
+
+        export_dir = get_export_dir()
+        crops_by_category = {}
+        report = {}
+        regressions = []
+        for name in selected:
+            category = categories[name]
+            fp32_path = export_path(export_dir, name, 'onnx')
+            if not fp32_path.exists():
+                self.stderr.write(f"{name}: FP32 ONNX model not found ({fp32_path}), skipping")
+                continue
+            if category not in crops_by_category:
+                crops_by_category[category] = load_category_crops(
+                    options['calibration_dir'], category, limit=options['limit'])
+            if options['mode'] == 'static':
+                calibration, held_out = split_crops(crops_by_category[category], options['holdout'])
+            else:
+                # Dinamik kuantizasyon kalibrasyon verisi kullanmaz
+                calibration, held_out = [], crops_by_category[category]
+            if not calibration and options['mode'] == 'static':
+                self.stderr.write(f"{name}: no calibration crops under {category}/, skipping")
+                continue
+
+            int8_path = quantize_classifier(fp32_path, quantized_path(export_dir, name),
+                                            crops=calibration, mode=options['mode'])
+            result = {
+                'category': category,
+                'task': 'waste' if name in WASTE_MODEL_MAPPING.values() else 'type',
+                'mode': options['mode'],
+                'path': str(int8_path),
+                'calibration_crops': len(calibration),
+            }
+            if held_out:
+                result.update(compare_classifiers(load_onnx(fp32_path), load_onnx(int8_path), held_out))
+                if result['agreement'] < options['min_agreement']:
+                    regressions.append(name)
+            report[name] = result
+
+            if held_out:
+                self.stdout.write(
+                    f"{name:<18} {category:<10} {result['task']:<5} agreement {result['agreement'] * 100:6.2f}%  "
+                    f"max|Δp| {result['max_prob_diff']:.3f}  "
+                    f"{result['fp32_ms_per_crop']:.2f} -> {result['int8_ms_per_crop']:.2f} ms/crop "
+                    f"(x{result['speedup']:.2f})"
+                )
+            else:
+                self.stdout.write(f"{name:<18} {category:<10} quantized (no held-out crops to compare)")
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Report written to {options['report']}")
+
+        if regressions:
+            raise CommandError(
+                f"Prediction agreement below {options['min_agreement']:.0%} for: {', '.join(regressions)}. "
+                f"Do not enable these in WISE_QUANTIZED_MODELS."
+            )
@@ -0,0 +1,103 @@
+# core/management/commands/reanalyze_images.py
+
+import os
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = ("Arşivlenmiş görselleri (dizin ağacı veya manifest) toplu olarak yeniden analiz eder. "
+            "Paralel tespit ve toplu sınıflandırma kullanır, her parçadan sonra checkpoint yazar "
+            "ve yarıda kalırsa kaldığı yerden devam eder.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Görsel dizini veya manifest dosyası (.txt / .csv)')
+        parser.add_argument('--user', required=True, help='Analizlerin yazılacağı kullanıcı (username)')
+        parser.add_argument('--date', help='Tüm görseller için analiz tarihi, YYYY-MM-DD '
+                                           '(varsayılan: manifest, YYYY-MM-DD dizini veya dosya tarihi)')
+        parser.add_argument('--checkpoint', help='Checkpoint dosyası (varsayılan: <kaynak>.reanalysis.json)')
+        parser.add_argument('--restart', action='store_true', help='Var olan checkpoint yok sayılır')
+        parser.add_argument('--chunk-size', type=int, default=256,
+                            help='Tek transaction ile yazılan görsel parçası')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Paralel tespit worker sayısı (varsayılan: WISE_DETECTION_WORKERS)')
+        parser.add_argument('--mode', choices=['thread', 'process'], default=None)
+        parser.add_argument('--save-images', action='store_true',
+                            help='Kırpımları kırpım deposuna (WISE_CROP_STORE_DIR) yaz')
+        parser.add_argument('--dry-run', action='store_true', help='Yalnızca görsel listesini ve tarihleri göster')
+
+    def handle(self, *args, **options):
+        from core.reanalysis import Checkpoint, CheckpointMismatch, read_manifest, reanalyze, scan_directory
+
+        source = options['source']
+        default_date = _parse_date(options['date']) if options['date'] else None
+        if os.path.isdir(source):
+            images = scan_directory(source, default_date)
+        elif os.path.isfile(source):
+            images = read_manifest(source, default_date)
+        else:
+            raise CommandError(f"Source not found: {source}")
+        if not images:
+            raise CommandError(f"No images in {source}")
+
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"User not found: {options['user']}")
+
+        checkpoint_path = options['checkpoint'] or f"{os.path.abspath(source).rstrip(os.sep)}.reanalysis.json"
+        if options['restart'] and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        try:
+            checkpoint = Checkpoint(checkpoint_path, source).load(images)
+        except CheckpointMismatch as e:
+            raise CommandError(f"{e}. Use --restart to start over.")
+
+        dates = sorted({image.analysis_date for image in images})
+        self.stdout.write(f"{len(images)} images over {len(dates)} day(s) ({dates[0]} .. {dates[-1]}); "
+                          f"{checkpoint.completed} already done, checkpoint: {checkpoint_path}")
+        if options['dry_run']:
+            for image in images[checkpoint.completed:]:
+                self.stdout.write(f"{image.analysis_date}  {image.path}")
+            return
+        if checkpoint.completed >= len(images):
+            self.stdout.write("Nothing left to do.")
+            return
+
+        from core.model_registry import get_registry
+
+        models = get_registry().models()
+        if 'wisePlate' not in models:
+            raise CommandError("wisePlate model could not be loaded.")
+
+        def report(progress):
+            eta = progress['eta_seconds']
+            self.stdout.write(
+                f"[{progress['completed']}/{progress['total']}] {progress['analysis_date']}  "
+                f"{progress['chunk_images_per_second']:.2f} img/s (chunk)  "
+                f"{progress['images_per_second']:.2f} img/s (run)  "
+                f"{progress['analyses']} analyses  "
+                + (f"ETA {eta / 60:.1f} min" if eta is not None else ""))
+
+        try:
+            processed, analyses = reanalyze(
+                images, models, user, checkpoint,
+                chunk_size=options['chunk_size'], workers=options['workers'], mode=options['mode'],
+                save_images=options['save_images'], progress=report)
+        finally:
+            if options['mode'] == 'process':
+                from core.parallel import shutdown_process_pool
+                shutdown_process_pool()
+
+        rate = checkpoint.completed / checkpoint.elapsed if checkpoint.elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} images ({analyses} analyses) in this run; "
+            f"{checkpoint.completed}/{len(images)} total at {rate:.2f} img/s overall."))
@@ -0,0 +1,23 @@
+# core/management/commands/run_job_workers.py
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Yükleme işlerini (ProcessingJob) kuyruktan alıp işleyen yerel worker süreçlerini başlatır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Worker süreç sayısı (varsayılan: WISE_JOB_WORKERS)')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Kuyruk boşken yoklama aralığı, saniye')
+        parser.add_argument('--inline', action='store_true',
+                            help='Ayrı süreç açmadan bu süreçte tek worker çalıştır')
+
+    def handle(self, *args, **options):
+        from core.jobs import start_workers, worker_loop
+
+        if options['inline']:
+            worker_loop(poll_interval=options['poll_interval'])
+        else:
+            start_workers(options['processes'], poll_interval=options['poll_interval'])
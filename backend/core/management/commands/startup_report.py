@@ -0,0 +1,42 @@
+# core/management/commands/startup_report.py
+
+import json
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Worker açılışını bu süreçte ölçer: ağır import'lar, model ön yüklemesi ve her "
+            "modelle ısınma çıkarımı. Otomatik ölçeklenen worker'ların trafiğe hazır olma süresini "
+            "görmek için yeni bir süreçte çalıştırılmalıdır.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=None,
+                            help='Yalnızca dedektör + en çok kullanılan N model (varsayılan: WISE_MODEL_PRELOAD_TOP)')
+        parser.add_argument('--no-warmup', action='store_true', help='Isınma çıkarımını atla')
+        parser.add_argument('--output', default=None, help='Raporu JSON olarak bu dosyaya yaz')
+
+    def handle(self, *args, **options):
+        from core.model_loader import get_yolov5_dir
+        from core.startup import prepare_worker
+
+        repo_dir = get_yolov5_dir()
+        self.stdout.write(f"YOLOv5 code: {repo_dir or 'torch.hub cache'}")
+        report = prepare_worker(warmup=not options['no_warmup'], top=options['top'])
+        report['yolov5_dir'] = str(repo_dir) if repo_dir else None
+
+        for module, seconds in report['imports'].items():
+            self.stdout.write(f"import {module:<12} " + (f"{seconds * 1000:8.0f} ms" if seconds is not None
+                                                          else "     not installed"))
+        for name, model in report['models'].items():
+            warmup = model['warmup_seconds']
+            self.stdout.write(
+                f"{name:<20} load {model['load_seconds'] * 1000:8.0f} ms  "
+                + (f"warm-up {warmup * 1000:8.0f} ms" if warmup is not None else "warm-up -"))
+        for name, error in report['errors'].items():
+            self.stderr.write(f"{name}: warm-up failed: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Ready in {report['total_seconds']:.2f}s"))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,53 @@
+# core/management/commands/sweep_detection_thresholds.py
+
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = ("Kayıtlı DetectionRecord'lar üzerinden tespit güveni eşiği taraması yapar; "
+            "modeller çalıştırılmaz.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--thresholds', type=float, nargs='+',
+                            default=[0.25, 0.4, 0.5, 0.6, 0.75, 0.9])
+        parser.add_argument('--start', help='Başlangıç tarihi, YYYY-MM-DD')
+        parser.add_argument('--end', help='Bitiş tarihi, YYYY-MM-DD')
+        parser.add_argument('--fingerprint', help='Yalnızca bu model sürümüyle üretilen kayıtlar')
+        parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yaz')
+
+    def handle(self, *args, **options):
+        from core.models import DetectionRecord
+        from core.stats_utils import threshold_sweep
+
+        records = DetectionRecord.objects.all()
+        if options['start']:
+            records = records.filter(image__analysis_date__gte=_parse_date(options['start']))
+        if options['end']:
+            records = records.filter(image__analysis_date__lte=_parse_date(options['end']))
+        if options['fingerprint']:
+            records = records.filter(image__model_fingerprint=options['fingerprint'])
+
+        thresholds = sorted(options['thresholds'])
+        sweep = threshold_sweep(records, thresholds)
+        if options['json']:
+            self.stdout.write(json.dumps({str(t): v for t, v in sweep.items()}, indent=2, ensure_ascii=False))
+            return
+
+        for threshold in thresholds:
+            self.stdout.write(f"\nconfidence >= {threshold:.2f}")
+            for category, counts in sweep[threshold].items():
+                judged = counts['israf-var'] + counts['israf-yok']
+                ratio = counts['israf-var'] / judged * 100 if judged else 0.0
+                self.stdout.write(f"  {category:<10} {counts['detections']:>7} detections  "
+                                  f"israf-var {counts['israf-var']:>6} ({ratio:5.1f}%)  "
+                                  f"israf-yok {counts['israf-yok']:>6}")
@@ -0,0 +1,262 @@
+# core/metrics.py
+
+"""
+Süreç içi metrikler ve Prometheus metin formatı (text exposition 0.0.4).
+
+İşlem hattının aşamaları (model yükleme, okuma, plaka tespiti, ön işleme,
+her sınıflandırıcı çağrısı, veritabanı yazma, dosya kaydı) wise_stage_seconds
+histogramına, görsel / kırpım / hata sayıları ve sonuç önbelleği isabet /
+ıskaları sayaçlara yazılır. /metrics uç noktası bunları ve kuyruk
+derinliklerini render() ile döner.
+
+METRICS_ENABLED kapalıyken observe / inc / stage çağrıları hemen döner.
+
+Job worker'ları ayrı süreçler olduğundan METRICS_DIR verilirse her süreç
+kendi anlık görüntüsünü METRICS_FLUSH_INTERVAL aralıklarla
+METRICS_DIR/<pid>.json dosyasına yazar; render() bunları toplayarak
+birleştirir (sayaç ve histogramlar toplanır).
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from . import config
+
+# Saniye; tek kırpım sınıflandırmasından 12MP görsel okumasına kadar
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(series):
+        merged = {}
+        for key, value in series:
+            merged[tuple(key)] = merged.get(tuple(key), 0) + value
+        return merged
+
+    def render(self, series):
+        lines = []
+        for key, value in sorted(self.merge(series).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # {etiketler: [kova sayıları (kümülatif değil), toplam, adet]}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            data[0][index] += 1
+            data[1] += value
+            data[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), [list(counts), total, count]] for key, (counts, total, count) in self._values.items()]
+
+    def merge(self, series):
+        merged = {}
+        for key, (counts, total, count) in series:
+            data = merged.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0, 0])
+            for i, value in enumerate(counts):
+                data[0][i] += value
+            data[1] += total
+            data[2] += count
+        return merged
+
+    def render(self, series):
+        lines = []
+        for key, (counts, total, count) in sorted(self.merge(series).items()):
+            cumulative = 0
+            for bound, value in zip(self.buckets + (float('inf'),), counts):
+                cumulative += value
+                labels = _format_labels(self.labelnames, key, extra=[('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    'wise_stage_seconds', 'Time spent per pipeline stage (seconds).', labelnames=('stage', 'model'))
+IMAGES = Counter('wise_images_total', 'Images processed, by result source.', labelnames=('source',))
+CROPS = Counter('wise_crops_total', 'Food crops classified, by category.', labelnames=('category',))
+ERRORS = Counter('wise_errors_total', 'Pipeline errors, by stage.', labelnames=('stage',))
+ANALYSES = Counter('wise_analyses_written_total', 'FoodAnalysis rows written to the database.')
+MODEL_LOADS = Counter('wise_model_loads_total', 'Model loads, including reloads and loads after eviction.',
+                      labelnames=('model',))
+MODEL_EVICTIONS = Counter('wise_model_evictions_total', 'Models evicted to stay within the memory budget.',
+                          labelnames=('model',))
+RESULT_CACHE_LOOKUPS = Counter('wise_result_cache_lookups_total', 'Result cache lookups, by result (hit / miss).',
+                               labelnames=('result',))
+RESULT_CACHE_STORES = Counter('wise_result_cache_stores_total', 'Image results written to the result cache.')
+
+_METRICS = (STAGE_SECONDS, IMAGES, CROPS, ERRORS, ANALYSES, MODEL_LOADS, MODEL_EVICTIONS,
+            RESULT_CACHE_LOOKUPS, RESULT_CACHE_STORES)
+
+
+def enabled():
+    return config.METRICS_ENABLED
+
+
+def observe_stage(stage, seconds, model=''):
+    if not config.METRICS_ENABLED:
+        return
+    STAGE_SECONDS.observe(seconds, stage=stage, model=model)
+    _maybe_start_flusher()
+
+
+def inc(counter, amount=1, **labels):
+    if not config.METRICS_ENABLED:
+        return
+    counter.inc(amount, **labels)
+    _maybe_start_flusher()
+
+
+@contextmanager
+def stage(name, model=''):
+    """with stage('db_write'): ... bloğun süresini histograma yazar."""
+    if not config.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started, model=model)
+
+
+# --- Çok süreçli toplama ------------------------------------------------------
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def snapshot():
+    return {metric.name: metric.snapshot() for metric in _METRICS}
+
+
+def flush(directory=None):
+    """Bu sürecin anlık görüntüsünü <dizin>/<pid>.json dosyasına yazar."""
+    directory = directory or config.METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except OSError as e:
+            print(f"Could not write metrics snapshot: {e}")
+
+
+def _maybe_start_flusher():
+    global _flusher
+    if _flusher is not None or not config.METRICS_DIR:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, args=(config.METRICS_FLUSH_INTERVAL,),
+                                        name='wise-metrics', daemon=True)
+            _flusher.start()
+
+
+def _collect_series():
+    series = {metric.name: metric.snapshot() for metric in _METRICS}
+    directory = config.METRICS_DIR
+    if not directory or not os.path.isdir(directory):
+        return series
+    own = f"{os.getpid()}.json"
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json') or entry.name == own:
+            continue
+        try:
+            with open(entry.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, values in data.items():
+            series.setdefault(name, []).extend(values)
+    return series
+
+
+def render(gauges=()):
+    """
+    Tüm metrikleri Prometheus metin formatında döner.
+    gauges: [(isim, açıklama, [(etiketler sözlüğü, değer), ...]), ...]
+    """
+    series = _collect_series()
+    lines = []
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render(series.get(metric.name, [])))
+    for name, documentation, samples in gauges:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
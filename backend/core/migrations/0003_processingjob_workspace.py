@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_processingjob'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='processingjob',
+            old_name='image_directory',
+            new_name='workspace',
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='image_paths',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
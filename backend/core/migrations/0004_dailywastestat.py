@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_processingjob_workspace'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWasteStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(max_length=100)),
+                ('food_type', models.CharField(max_length=100)),
+                ('waste_count', models.IntegerField(default=0)),
+                ('no_waste_count', models.IntegerField(default=0)),
+                ('sample_count', models.IntegerField(default=0)),
+                ('confidence_sum', models.FloatField(default=0.0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_waste_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'category', 'food_type'), name='unique_daily_waste_stat')],
+            },
+        ),
+    ]
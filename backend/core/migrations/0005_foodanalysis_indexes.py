@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_dailywastestat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodanalysis',
+            index=models.Index(fields=['user', 'analysis_date', 'id'], name='core_fa_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodanalysis',
+            index=models.Index(fields=['user', 'category', 'food_type'], name='core_fa_user_cat_idx'),
+        ),
+    ]
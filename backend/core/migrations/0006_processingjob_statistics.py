@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_foodanalysis_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingjob',
+            name='statistics',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_processingjob_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingjob',
+            name='accepting_images',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='streaming',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='UploadedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('path', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('foods', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='core.processingjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'status', 'id'], name='core_ui_job_status_idx')],
+            },
+        ),
+    ]
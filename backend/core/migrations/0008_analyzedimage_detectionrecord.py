@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-18 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0007_uploadedimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyzedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('analysis_date', models.DateField(blank=True, null=True)),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('width', models.IntegerField(blank=True, null=True)),
+                ('height', models.IntegerField(blank=True, null=True)),
+                ('model_fingerprint', models.CharField(blank=True, default='', max_length=16)),
+                ('model_versions', models.JSONField(blank=True, default=dict)),
+                ('cached', models.BooleanField(default=False)),
+                ('decode_ms', models.FloatField(blank=True, null=True)),
+                ('detect_ms', models.FloatField(blank=True, null=True)),
+                ('classify_ms', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analyzed_images', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['user', 'analysis_date', 'id'], name='core_ai_user_date_idx'),
+                    models.Index(fields=['content_hash'], name='core_ai_hash_idx'),
+                    models.Index(fields=['model_fingerprint'], name='core_ai_fingerprint_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='DetectionRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField()),
+                ('category', models.CharField(max_length=100)),
+                ('x_min', models.IntegerField()),
+                ('y_min', models.IntegerField()),
+                ('x_max', models.IntegerField()),
+                ('y_max', models.IntegerField()),
+                ('detection_confidence', models.FloatField()),
+                ('waste_status', models.CharField(max_length=16)),
+                ('waste_confidence', models.FloatField(default=0.0)),
+                ('food_type', models.CharField(max_length=100)),
+                ('type_confidence', models.FloatField(blank=True, null=True)),
+                ('analysis', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='detections', to='core.foodanalysis')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='core.analyzedimage')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['category', 'food_type'], name='core_dr_cat_type_idx'),
+                    models.Index(fields=['category', 'detection_confidence'], name='core_dr_cat_conf_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_analyzedimage_detectionrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredCrop',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('width', models.IntegerField()),
+                ('height', models.IntegerField()),
+                ('thumbnail', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='foodanalysis',
+            name='crop',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='analyses', to='core.storedcrop'),
+        ),
+    ]
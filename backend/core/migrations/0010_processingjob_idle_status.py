@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_storedcrop_foodanalysis_crop'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('idle', 'Idle')], default='pending', max_length=16),
+        ),
+    ]
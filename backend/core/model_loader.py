@@ -2,33 +2,109 @@
 
 from pathlib import Path
 
-def load_models():
+MODEL_DIR = Path(__file__).resolve().parent.parent / "models"
+VENDOR_YOLOV5_DIR = Path(__file__).resolve().parent.parent / "third_party" / "yolov5"
+
+MODEL_FILES = {
+    'wisePlate': 'wisePlate.pt',
+    'wiseSoup': 'wiseSoup.pt',
+    'wiseTypeSoup': 'wiseTypeSoup.pt',
+    'wiseExtraCls': 'wiseExtraCls-yolo5.pt',
+    'wiseExtraTypeCls': 'wiseExtraTypeCls-yolo5.pt',
+    'wiseMainCls': 'wiseMainCls-yolo5.pt',
+    'wiseMainTypeCls': 'wiseMainTypeCls-yolo5.pt',
+    'wiseSideCls': 'wiseSideCls-yolo5.pt',
+    'wiseSideTypeCls': 'wiseSideTypeCls-yolo5.pt'
+}
+
+
+def get_export_dir():
+    from .config import MODEL_EXPORT_DIR
+    return Path(MODEL_EXPORT_DIR) if MODEL_EXPORT_DIR else MODEL_DIR / "export"
+
+
+def get_model_paths(base_path=MODEL_DIR, backend='eager', quantized=None):
+    """
+    Backend'e göre model dosyalarının yolları (eager: .pt, diğerleri: export
+    dizini). quantized (varsayılan: config.QUANTIZED_MODELS) içindeki
+    sınıflandırıcılar için INT8 dosyası varsa o kullanılır. Export edilmiş
+    ortak omurgalı modeller de listeye eklenir.
+    """
+    from .backends import BACKENDS, DETECTOR_MODELS, export_path, quantized_path
+    from .config import MULTIHEAD_ENABLED, MULTIHEAD_MODEL_MAPPING, QUANTIZED_MODELS
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+    if backend == 'eager':
+        base_path = Path(base_path)
+        paths = {name: base_path / filename for name, filename in MODEL_FILES.items()}
+    else:
+        paths = {name: export_path(get_export_dir(), name, backend) for name in MODEL_FILES}
+
+    # Ortak omurgalı modeller yalnızca üretilmişlerse eklenir; eager backend
+    # TorchScript sürümünü kullanır
+    if MULTIHEAD_ENABLED:
+        multihead_format = 'torchscript' if backend == 'eager' else backend
+        for name in MULTIHEAD_MODEL_MAPPING.values():
+            path = export_path(get_export_dir(), name, multihead_format)
+            if path.exists():
+                paths[name] = path
+
+    quantized = QUANTIZED_MODELS if quantized is None else quantized
+    for name in MODEL_FILES:
+        if name in DETECTOR_MODELS or not (name in quantized or 'all' in quantized):
+            continue
+        int8_path = quantized_path(get_export_dir(), name)
+        if int8_path.exists():
+            paths[name] = int8_path
+        else:
+            print(f"Quantized model not found, using FP32: {int8_path}")
+    return paths
+
+
+def get_yolov5_dir():
+    """Yerel YOLOv5 kopyası (WISE_YOLOV5_DIR veya third_party/yolov5); yoksa None."""
+    from .config import YOLOV5_DIR
+
+    path = Path(YOLOV5_DIR) if YOLOV5_DIR else VENDOR_YOLOV5_DIR
+    return path if (path / 'hubconf.py').exists() else None
+
+
+def load_model(model_path):
+    import inspect
+
     import torch
 
-    base_path = Path(__file__).resolve().parent.parent / "models"
-    model_paths = {
-        'wisePlate': base_path / 'wisePlate.pt',
-        'wiseSoup': base_path / 'wiseSoup.pt',
-        'wiseTypeSoup': base_path / 'wiseTypeSoup.pt',
-        'wiseExtraCls': base_path / 'wiseExtraCls-yolo5.pt',
-        'wiseExtraTypeCls': base_path / 'wiseExtraTypeCls-yolo5.pt',
-        'wiseMainCls': base_path / 'wiseMainCls-yolo5.pt',
-        'wiseMainTypeCls': base_path / 'wiseMainTypeCls-yolo5.pt',
-        'wiseSideCls': base_path / 'wiseSideCls-yolo5.pt',
-        'wiseSideTypeCls': base_path / 'wiseSideTypeCls-yolo5.pt'
-    }
+    # Tüm modeller YOLOv5, hepsini torch.hub.load ile yükle
+    repo_dir = get_yolov5_dir()
+    if repo_dir is not None:
+        # Yerel kopya: ağ ve hub önbelleği kullanılmaz
+        model = torch.hub.load(str(repo_dir), 'custom', path=str(model_path), source='local', _verbose=False)
+    else:
+        from .config import YOLOV5_HUB_REPO
+
+        # Sabit sürüm; önbellekteyse GitHub'a doğrulama isteği atılmaz
+        options = {'force_reload': False, 'skip_validation': True, '_verbose': False}
+        if 'trust_repo' in inspect.signature(torch.hub.load).parameters:
+            options['trust_repo'] = True
+        model = torch.hub.load(YOLOV5_HUB_REPO, 'custom', path=str(model_path), **options)
+    model.eval()
+    return model
+
 
+def load_models():
+    """
+    Tüm modelleri diskten yükler ve yeni bir sözlük döner.
+    İstek yolunda bunun yerine model_registry.get_registry() kullanılmalı;
+    bu fonksiyon her çağrıda ağırlıkları yeniden okur.
+    """
     models = {}
 
-    for model_name, model_path in model_paths.items():
+    for model_name, model_path in get_model_paths().items():
         if not model_path.exists():
             print(f"Model dosyası bulunamadı: {model_path}")
             continue
         print(f"Loading model: {model_name}")
-
-        # Tüm modeller YOLOv5, hepsini torch.hub.load ile yükle
-        model = torch.hub.load('ultralytics/yolov5', 'custom', path=str(model_path), force_reload=False)
-        model.eval()
-        models[model_name] = model
+        models[model_name] = load_model(model_path)
 
     return models
@@ -0,0 +1,335 @@
+# core/model_registry.py
+
+import threading
+import time
+from collections.abc import Mapping
+
+from . import config, metrics
+from .backends import DETECTOR_MODELS, check_runtime, load_model_file
+from .model_loader import get_model_paths
+
+
+def model_memory_bytes(model):
+    """Modelin parametre ve buffer'larının kapladığı bellek (byte)."""
+    # Export edilmiş backend sarmalayıcıları kendi değerini bildirir
+    if callable(getattr(model, 'memory_bytes', None)):
+        return model.memory_bytes()
+    total = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    except Exception:
+        return None
+    return total
+
+
+class LazyModels(Mapping):
+    """
+    registry.get ile ilk erişimde yüklenen {isim: model} görünümü. 'in'
+    kontrolü yalnızca model dosyasının varlığına bakar, modeli yüklemez;
+    böylece processor görselde hiç çıkmayan kategorilerin modellerine
+    dokunmaz.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def __getitem__(self, name):
+        model = self.registry.get(name)
+        if model is None:
+            raise KeyError(name)
+        return model
+
+    def __contains__(self, name):
+        return self.registry.available(name)
+
+    def __iter__(self):
+        return (name for name in self.registry.model_paths if self.registry.available(name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class ModelRegistry:
+    """
+    Süreç boyunca yaşayan model deposu.
+
+    Modeller worker başına bir kez (açılışta veya ilk kullanımda) yüklenir ve
+    istekler arasında salt-okunur olarak paylaşılır. Hot reload açıksa
+    check_interval dolduktan sonraki ilk get() / models() çağrısı model
+    dosyalarının mtime değerine bakar ve değişenleri o çağrının thread'inde,
+    registry kilidi tutularak eşzamanlı (senkron) yeniden yükler; bu istek
+    yükleme süresi kadar gecikir. Yüklü modelleri isteyen diğer istekler
+    beklemez, eski modeli kullanan istekler kendi referanslarıyla işlerini
+    bitirir.
+
+    memory_budget (byte) verilirse yüklü modellerin toplamı bütçeyi aştığında
+    en uzun süredir kullanılmayan sınıflandırıcılar bellekten çıkarılır ve
+    tekrar gerektiklerinde yeniden yüklenir. Çıkarılan modeli o anda kullanan
+    istekler, hot reload'daki gibi kendi referanslarıyla devam eder.
+    """
+
+    def __init__(self, model_paths=None, loader=None,
+                 hot_reload=None, check_interval=None, backend=None,
+                 lazy=None, memory_budget=None):
+        self.backend = backend or config.INFERENCE_BACKEND
+        self.model_paths = (dict(model_paths) if model_paths is not None
+                            else get_model_paths(backend=self.backend))
+        if loader is None:
+            check_runtime(self.model_paths)
+        self.loader = loader or load_model_file
+        self.hot_reload = config.MODEL_HOT_RELOAD if hot_reload is None else hot_reload
+        self.check_interval = (config.MODEL_RELOAD_CHECK_INTERVAL
+                               if check_interval is None else check_interval)
+        self.lazy = config.MODEL_LAZY_LOADING if lazy is None else lazy
+        self.memory_budget = (int(config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024)
+                              if memory_budget is None else memory_budget)
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._last_check = 0.0
+        self.loads = 0
+        self.evictions = 0
+
+    def _mtime(self, name):
+        path = self.model_paths[name]
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _load(self, name):
+        path = self.model_paths[name]
+        mtime = self._mtime(name)
+        if mtime is None:
+            print(f"Model dosyası bulunamadı: {path}")
+            return None
+
+        print(f"Loading model: {name}")
+        started = time.perf_counter()
+        model = self.loader(path)
+        previous = self._entries.get(name, {})
+        entry = {
+            'model': model,
+            'path': str(path),
+            'mtime': mtime,
+            'loaded_at': time.time(),
+            'load_seconds': time.perf_counter() - started,
+            'memory_bytes': model_memory_bytes(model),
+            'last_used': time.monotonic(),
+            'uses': previous.get('uses', 0),
+        }
+        metrics.observe_stage('model_load', entry['load_seconds'], model=name)
+        metrics.inc(metrics.MODEL_LOADS, model=name)
+        self.loads += 1
+        self._entries[name] = entry
+        self._enforce_budget(keep=name)
+        return entry
+
+    def loaded_bytes(self):
+        return sum(entry['memory_bytes'] or 0 for entry in self._entries.values())
+
+    def _enforce_budget(self, keep):
+        """Bütçe aşıldıysa keep ve dedektör dışındaki modelleri LRU sırasıyla çıkarır."""
+        if not self.memory_budget:
+            return
+        total = self.loaded_bytes()
+        if total <= self.memory_budget:
+            return
+        candidates = sorted(
+            (entry['last_used'], name) for name, entry in self._entries.items()
+            if name != keep and name not in DETECTOR_MODELS
+        )
+        for _, name in candidates:
+            if total <= self.memory_budget:
+                break
+            entry = self._entries.pop(name)
+            total -= entry['memory_bytes'] or 0
+            self.evictions += 1
+            metrics.inc(metrics.MODEL_EVICTIONS, model=name)
+            print(f"Model evicted to stay within memory budget: {name}")
+        if total > self.memory_budget:
+            print(f"Loaded models ({total} bytes) exceed the memory budget ({self.memory_budget} bytes)")
+
+    def available(self, name):
+        """Model yüklü ya da dosyası mevcut mu (yüklemeden)."""
+        if name in self._entries:
+            return True
+        return name in self.model_paths and self._mtime(name) is not None
+
+    def get(self, name):
+        """Modeli döner; gerekiyorsa yükler. Dosya yoksa None döner."""
+        if name not in self.model_paths:
+            return None
+        self._maybe_reload()
+        entry = self._entries.get(name)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(name) or self._load(name)
+            if entry is None:
+                return None
+        # Kilitsiz güncellenir; LRU sırası ve kullanım sayısı yaklaşık olabilir
+        entry['last_used'] = time.monotonic()
+        entry['uses'] += 1
+        return entry['model']
+
+    def models(self):
+        """
+        {isim: model} eşlemesi. Tembel yüklemede modeller ilk erişimde
+        yüklenir (LazyModels); değilse yüklenebilen tüm modellerin anlık
+        görüntüsü döner.
+        """
+        if self.lazy:
+            return LazyModels(self)
+        self._maybe_reload()
+        with self._lock:
+            for name in self.model_paths:
+                if name not in self._entries:
+                    self._load(name)
+            return {name: entry['model'] for name, entry in self._entries.items()}
+
+    def preload(self, top=None):
+        """
+        Açılışta model yükler. top (varsayılan MODEL_PRELOAD_TOP) 0 ise tüm
+        modeller, değilse dedektör ve en çok kullanılan top sınıflandırıcı.
+        """
+        top = config.MODEL_PRELOAD_TOP if top is None else top
+        names = list(self.model_paths) if not top else (
+            [name for name in DETECTOR_MODELS if name in self.model_paths] + self.most_used(top))
+        for name in names:
+            self.get(name)
+        return self.models()
+
+    def most_used(self, limit):
+        """
+        En çok kullanılan sınıflandırıcılar. Sıralama son MODEL_USAGE_DAYS
+        gündeki FoodAnalysis kategori sayılarına göre yapılır; veritabanına
+        ulaşılamazsa bu süreçteki kullanım sayıları kullanılır.
+        """
+        ranked = []
+        for category in _category_ranking():
+            for mapping in (config.MULTIHEAD_MODEL_MAPPING, config.WASTE_MODEL_MAPPING,
+                            config.TYPE_MODEL_MAPPING):
+                name = mapping.get(category)
+                if name in self.model_paths and name not in ranked:
+                    ranked.append(name)
+                    if mapping is config.MULTIHEAD_MODEL_MAPPING:
+                        # Ortak omurgalı model varsa ayrı modellere gerek yok
+                        break
+        if not ranked:
+            ranked = [name for _, name in sorted(
+                ((-entry['uses'], name) for name, entry in self._entries.items()
+                 if name not in DETECTOR_MODELS))]
+        return ranked[:limit]
+
+    def _maybe_reload(self):
+        if not self.hot_reload or not self._entries:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            # Aralık dolduğunda yalnızca bir thread kontrol eder
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            self.reload_changed()
+
+    def reload_changed(self):
+        """mtime değeri değişen modelleri yeniden yükler, isimlerini döner."""
+        reloaded = []
+        with self._lock:
+            for name, entry in list(self._entries.items()):
+                mtime = self._mtime(name)
+                if mtime is None or mtime == entry['mtime']:
+                    continue
+                try:
+                    self._load(name)
+                    reloaded.append(name)
+                    print(f"Model reloaded: {name}")
+                except Exception as e:
+                    # Yeni dosya bozuksa eski model kullanılmaya devam eder
+                    print(f"Error reloading model {name}: {e}")
+        return reloaded
+
+    def is_current(self, name, model):
+        """model, registry'nin name için şu an yüklü modeli mi?"""
+        entry = self._entries.get(name)
+        return model is not None and entry is not None and entry['model'] is model
+
+    def versions(self, names):
+        """
+        {isim: sürüm} eşlemesi. Sürüm dosya adı ve (yüklüyse yüklendiği
+        andaki) mtime değeridir; registry'de olmayan modeller atlanır.
+        """
+        versions = {}
+        with self._lock:
+            for name in names:
+                if name not in self.model_paths:
+                    continue
+                entry = self._entries.get(name)
+                mtime = entry['mtime'] if entry else self._mtime(name)
+                if mtime is not None:
+                    versions[name] = f"{self.model_paths[name].name}@{mtime:.0f}"
+        return versions
+
+    def describe(self):
+        """Yüklü modeller ve bellek kullanımları."""
+        report = []
+        with self._lock:
+            for name, path in self.model_paths.items():
+                entry = self._entries.get(name, {})
+                report.append({
+                    'name': name,
+                    'backend': self.backend,
+                    'loaded': bool(entry),
+                    'path': str(path),
+                    'memory_bytes': entry.get('memory_bytes'),
+                    'load_seconds': entry.get('load_seconds'),
+                    'loaded_at': entry.get('loaded_at'),
+                    'uses': entry.get('uses', 0),
+                })
+        return report
+
+    def stats(self):
+        """Havuz düzeyinde bellek ve yükleme / çıkarma sayaçları."""
+        with self._lock:
+            return {
+                'lazy': self.lazy,
+                'loaded': len(self._entries),
+                'loaded_bytes': self.loaded_bytes(),
+                'memory_budget_bytes': self.memory_budget or None,
+                'loads': self.loads,
+                'evictions': self.evictions,
+            }
+
+
+def _category_ranking():
+    """Son MODEL_USAGE_DAYS günde en çok analiz edilen kategoriler (çoktan aza)."""
+    from datetime import date, timedelta
+
+    from django.db import DatabaseError
+    from django.db.models import Count
+
+    from .models import FoodAnalysis
+
+    since = date.today() - timedelta(days=config.MODEL_USAGE_DAYS)
+    try:
+        rows = (FoodAnalysis.objects.filter(analysis_date__gte=since)
+                .values('category').annotate(count=Count('id')).order_by('-count'))
+        return [row['category'] for row in rows]
+    except DatabaseError as e:
+        print(f"Could not rank model usage: {e}")
+        return []
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
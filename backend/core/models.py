@@ -1,7 +1,25 @@
 # core/models.py
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
+class StoredCrop(models.Model):
+    """
+    Kırpım deposundaki (bkz. crop_store.py) tek kırpım. Birincil anahtar
+    kırpım piksellerinin SHA-256 özetidir; aynı kırpım tekrar yüklense de
+    tek satır ve tek dosya olarak tutulur.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)
+    width = models.IntegerField()
+    height = models.IntegerField()
+    thumbnail = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.width}x{self.height})"
+
+
 class FoodAnalysis(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="food_analyses")
     category = models.CharField(max_length=100)
@@ -10,10 +28,184 @@ class FoodAnalysis(models.Model):
     no_waste_count = models.IntegerField(default=0)
     waste_ratio = models.FloatField(default=0.0)
     analysis_date = models.DateField(null=True, blank=True)
+    crop = models.ForeignKey(StoredCrop, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name="analyses")
+
+    class Meta:
+        indexes = [
+            # Sonuç listesi: kullanıcı + tarih sıralı cursor sayfalama
+            models.Index(fields=['user', 'analysis_date', 'id'], name='core_fa_user_date_idx'),
+            # Kategori / tür filtreleri
+            models.Index(fields=['user', 'category', 'food_type'], name='core_fa_user_cat_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category} - {self.food_type} - Waste Ratio: {self.waste_ratio:.2f}"
-    
 
 
-    
\ No newline at end of file
+class AnalyzedImage(models.Model):
+    """
+    İşlenen her görselin kaydı. Görsel kimliği byte içeriğinin SHA-256
+    özetidir; aynı fotoğrafın farklı yüklemeleri aynı content_hash'i taşır.
+    Süreler milisaniyedir; önbellekten gelen görsellerde boştur.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analyzed_images")
+    analysis_date = models.DateField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    name = models.CharField(max_length=255)
+    width = models.IntegerField(null=True, blank=True)
+    height = models.IntegerField(null=True, blank=True)
+    # Kullanılan model dosyalarının özeti ve {model: sürüm} eşlemesi
+    model_fingerprint = models.CharField(max_length=16, blank=True, default='')
+    model_versions = models.JSONField(default=dict, blank=True)
+    cached = models.BooleanField(default=False)
+    decode_ms = models.FloatField(null=True, blank=True)
+    detect_ms = models.FloatField(null=True, blank=True)
+    classify_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'analysis_date', 'id'], name='core_ai_user_date_idx'),
+            models.Index(fields=['content_hash'], name='core_ai_hash_idx'),
+            models.Index(fields=['model_fingerprint'], name='core_ai_fingerprint_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.content_hash[:12]})"
+
+
+class DetectionRecord(models.Model):
+    """
+    Görseldeki tek tespit: plaka kutusu (orijinal piksel koordinatları) ve
+    tespit / israf / tür güvenleri. Eşik taramaları ve yeniden toplamalar
+    modelleri çalıştırmadan bu tablodan yapılabilir.
+    """
+    image = models.ForeignKey(AnalyzedImage, on_delete=models.CASCADE, related_name="detections")
+    analysis = models.ForeignKey(FoodAnalysis, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name="detections")
+    index = models.IntegerField()
+    category = models.CharField(max_length=100)
+    x_min = models.IntegerField()
+    y_min = models.IntegerField()
+    x_max = models.IntegerField()
+    y_max = models.IntegerField()
+    detection_confidence = models.FloatField()
+    waste_status = models.CharField(max_length=16)
+    waste_confidence = models.FloatField(default=0.0)
+    food_type = models.CharField(max_length=100)
+    type_confidence = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'food_type'], name='core_dr_cat_type_idx'),
+            models.Index(fields=['category', 'detection_confidence'], name='core_dr_cat_conf_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.image_id} #{self.index} - {self.category} - {self.food_type} - {self.waste_status}"
+
+
+class ProcessingJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    # Açık akış oturumu, bekleyen görseli yok: worker'lar almaz; yeni görsel
+    # ya da kapanış işi tekrar 'pending' yapar
+    STATUS_IDLE = 'idle'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_IDLE, 'Idle'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="processing_jobs")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    analysis_date = models.DateField(null=True, blank=True)
+    workspace = models.CharField(max_length=255)
+    image_paths = models.JSONField(default=list, blank=True)
+    total_images = models.IntegerField(default=0)
+    processed_images = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    statistics = models.JSONField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Akış (streaming) oturumu: görseller tek tek eklenir (bkz. streaming.py)
+    streaming = models.BooleanField(default=False)
+    accepting_images = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.id} - {self.status} ({self.processed_images}/{self.total_images})"
+
+
+class UploadedImage(models.Model):
+    """Akış oturumuna eklenen tek görsel ve işlendikten sonraki sonuçları."""
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    job = models.ForeignKey(ProcessingJob, on_delete=models.CASCADE, related_name="images")
+    name = models.CharField(max_length=255)
+    path = models.CharField(max_length=500)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # [{'category', 'food_type', 'waste_status', 'waste_confidence', ...}, ...]
+    foods = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['job', 'status', 'id'], name='core_ui_job_status_idx')]
+
+    def __str__(self):
+        return f"{self.job_id} - {self.name} - {self.status}"
+
+
+class DailyWasteStat(models.Model):
+    """
+    FoodAnalysis kayıtlarının (kullanıcı, gün, kategori, tür) bazında özeti.
+    Analizler yazılırken artımlı güncellenir (bkz. rollups.py); panel tüm
+    geçmişi değil gün sayısı kadar satırı okur. sample_count tüm kırpımları
+    sayar; confidence_sum yalnızca israf sınıflandırması yapılan (bilgi-yok
+    olmayan) kırpımların güvenlerini toplar.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_waste_stats")
+    date = models.DateField()
+    category = models.CharField(max_length=100)
+    food_type = models.CharField(max_length=100)
+    waste_count = models.IntegerField(default=0)
+    no_waste_count = models.IntegerField(default=0)
+    sample_count = models.IntegerField(default=0)
+    confidence_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date', 'category', 'food_type'],
+                                    name='unique_daily_waste_stat'),
+        ]
+
+    @property
+    def classified_count(self):
+        return self.waste_count + self.no_waste_count
+
+    @property
+    def mean_confidence(self):
+        # bilgi-yok kırpımlar ortalamayı aşağı çekmez (istek istatistikleri gibi)
+        return self.confidence_sum / self.classified_count if self.classified_count else 0.0
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date} - {self.category} - {self.food_type}"
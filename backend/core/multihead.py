@@ -0,0 +1,69 @@
+# core/multihead.py
+
+"""
+İsraf ve tür sınıflandırıcılarını tek omurgalı, iki başlı bir modelde birleştirir.
+
+YOLOv5 sınıflandırma modelleri nn.Sequential omurga katmanları ve en sonda bir
+Classify başlığından oluşur. İki modelin omurga ağırlıkları aynıysa (örneğin
+tür modeli israf modelinin dondurulmuş omurgası üzerinde eğitildiyse) omurga
+bir kez hesaplanıp iki başlığa verilebilir; sonuçlar ayrı modellerle birebir
+aynıdır. Omurgalar farklıysa birleştirme yeniden eğitim gerektirir ve
+build_multihead None döner.
+"""
+
+
+def split_classifier(module):
+    """YOLOv5 ClassificationModel -> (omurga katmanları, Classify başlığı)."""
+    layers = module.model
+    return list(layers[:-1]), layers[-1]
+
+
+def backbone_difference(waste_module, type_module):
+    """
+    İki sınıflandırıcının omurga ağırlıkları arasındaki en büyük mutlak fark.
+    Yapılar uyuşmuyorsa None döner.
+    """
+    waste_layers, _ = split_classifier(waste_module)
+    type_layers, _ = split_classifier(type_module)
+    if len(waste_layers) != len(type_layers):
+        return None
+
+    max_diff = 0.0
+    for waste_layer, type_layer in zip(waste_layers, type_layers):
+        waste_state, type_state = waste_layer.state_dict(), type_layer.state_dict()
+        if waste_state.keys() != type_state.keys():
+            return None
+        for key, tensor in waste_state.items():
+            other = type_state[key]
+            if tensor.shape != other.shape:
+                return None
+            if tensor.is_floating_point():
+                max_diff = max(max_diff, (tensor - other).abs().max().item() if tensor.numel() else 0.0)
+            elif not bool((tensor == other).all()):
+                return None
+    return max_diff
+
+
+def build_multihead(waste_module, type_module, atol=0.0):
+    """Omurgalar atol içinde aynıysa iki başlı modeli, değilse None döner."""
+    import torch
+
+    difference = backbone_difference(waste_module, type_module)
+    if difference is None or difference > atol:
+        return None
+
+    backbone_layers, waste_head = split_classifier(waste_module)
+    _, type_head = split_classifier(type_module)
+
+    class MultiHeadClassifier(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.backbone = torch.nn.Sequential(*backbone_layers)
+            self.waste_head = waste_head
+            self.type_head = type_head
+
+        def forward(self, x):
+            features = self.backbone(x)
+            return self.waste_head(features), self.type_head(features)
+
+    return MultiHeadClassifier().eval()
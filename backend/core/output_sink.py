@@ -0,0 +1,113 @@
+# core/output_sink.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config, metrics
+
+
+class ImageSink:
+    """
+    Kırpımları arka plan thread'lerinde kırpım deposuna (crop_store.py) yazar;
+    çıkarım (inference) döngüsü JPEG kodlamayı ve dosya yazmayı beklemez.
+    Kırpımlar CROP_WRITE_BATCH_SIZE'lık gruplar halinde tek görevde yazılır.
+    submit() içerik anahtarını hemen döner; aynı kırpım bir çalıştırmada bir
+    kez kuyruğa girer. close() bekleyen tüm yazmaları bitirir.
+    """
+
+    def __init__(self, store=None, max_workers=None, batch_size=None):
+        from .crop_store import get_crop_store
+
+        self.store = store or get_crop_store()
+        self.batch_size = batch_size or config.CROP_WRITE_BATCH_SIZE
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.OUTPUT_WRITER_THREADS,
+            thread_name_prefix='wise-output',
+        )
+        self._futures = []
+        self._pending = []
+        # {anahtar: (genişlik, yükseklik)}: bu çalıştırmada kuyruğa giren kırpımlar
+        self.crops = {}
+        self.failed_keys = set()
+        self.written = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+    def submit(self, image):
+        key = self.store.key(image)
+        if key in self.crops:
+            self.deduplicated += 1
+            return key
+        self.crops[key] = (image.shape[1], image.shape[0])
+        self._pending.append((key, image))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        return key
+
+    def _flush(self):
+        if self._pending:
+            batch = self._pending
+            self._futures.append((self._executor.submit(self._write_batch, batch), [key for key, _ in batch]))
+            self._pending = []
+
+    def _write_batch(self, batch):
+        written, existing, failed = 0, 0, []
+        with metrics.stage('fs_save'):
+            for key, image in batch:
+                try:
+                    if self.store.write(key, image):
+                        written += 1
+                    else:
+                        existing += 1
+                except Exception as e:
+                    print(f"Error saving crop {key}: {e}")
+                    failed.append(key)
+        return written, existing, failed
+
+    def drain(self):
+        """Kuyruktaki tüm yazmaları bitirir; sink açık kalır, failed_keys güncellenir."""
+        self._flush()
+        for future, keys in self._futures:
+            try:
+                written, existing, failed = future.result()
+            except Exception as e:
+                print(f"Error saving output images: {e}")
+                written, existing, failed = 0, 0, keys
+            self.written += written
+            self.deduplicated += existing
+            self.failed += len(failed)
+            self.failed_keys.update(failed)
+            if failed:
+                metrics.inc(metrics.ERRORS, len(failed), stage='fs_save')
+        self._futures = []
+
+    def close(self):
+        self.drain()
+        self._executor.shutdown(wait=True)
+        if self.crops:
+            print(f"Crop store: {self.written} crops written, {self.deduplicated} deduplicated, "
+                  f"{self.failed} failed ({self.store.root})")
+
+    def stored_crops(self, keys=None):
+        """
+        Başarıyla yazılan (veya zaten var olan) kırpımlar için kaydedilmemiş
+        StoredCrop'lar; keys verilirse yalnızca bu anahtarlar. Yazmaların
+        bitmiş olması gerekir (drain / close).
+        """
+        from .models import StoredCrop
+
+        thumbnail = bool(self.store.thumbnail_size)
+        keys = self.crops if keys is None else dict.fromkeys(key for key in keys if key in self.crops)
+        return [StoredCrop(hash=key, width=self.crops[key][0], height=self.crops[key][1], thumbnail=thumbnail)
+                for key in keys if key not in self.failed_keys]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def create_sink(enabled=None):
+    """Ayar kapalıysa None döner; çağıranlar sink=None ile görsel yazmaz."""
+    enabled = config.SAVE_OUTPUT_IMAGES if enabled is None else enabled
+    return ImageSink() if enabled else None
@@ -0,0 +1,115 @@
+# core/pagination.py
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+RESULT_FIELDS = ('category', 'food_type', 'waste_count', 'no_waste_count', 'waste_ratio', 'analysis_date',
+                 'crop_id')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# limit / cursor verilmeyen (eski, düz liste) isteklerde dönen en fazla satır;
+# fazlası için X-Next-Cursor başlığıyla sayfalamaya devam edilir
+UNPAGINATED_LIMIT = 10000
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise InvalidQuery(f"'{name}' must be in YYYY-MM-DD format.")
+
+
+def encode_cursor(analysis_date, pk):
+    # Tarihsiz satırlarda tarih kısmı boş kalır
+    raw = f"{analysis_date.isoformat() if analysis_date else ''}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(tarih veya None, id) döner."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_str, pk = raw.split('|')
+        return (datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidQuery("Invalid cursor.")
+
+
+def parse_fields(value):
+    if not value:
+        return RESULT_FIELDS
+    fields = tuple(f.strip() for f in value.split(',') if f.strip())
+    unknown = [f for f in fields if f not in RESULT_FIELDS]
+    if unknown:
+        raise InvalidQuery(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidQuery("'limit' must be an integer.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def filter_analyses(queryset, params):
+    """start, end, category, food_type sorgu parametrelerini uygular."""
+    if params.get('start'):
+        queryset = queryset.filter(analysis_date__gte=_parse_date(params['start'], 'start'))
+    if params.get('end'):
+        queryset = queryset.filter(analysis_date__lte=_parse_date(params['end'], 'end'))
+    if params.get('category'):
+        queryset = queryset.filter(category=params['category'])
+    if params.get('food_type'):
+        queryset = queryset.filter(food_type=params['food_type'])
+    return queryset
+
+
+def paginate_analyses(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=RESULT_FIELDS):
+    """
+    (analysis_date, id) üzerinden azalan sırada keyset (cursor) sayfalama.
+    OFFSET kullanılmadığı için derin sayfalar da (user, analysis_date, id)
+    indeksi üzerinden sabit maliyetle okunur. analysis_date'i boş satırlar
+    tarihli satırlardan sonra, id'ye göre azalan sırada ayrı bir aşamada
+    gelir. (satırlar, sonraki_cursor) döner.
+    """
+    columns = ('id', *[f for f in fields if f != 'analysis_date'], 'analysis_date')
+    dated = queryset.filter(analysis_date__isnull=False)
+    undated = queryset.filter(analysis_date__isnull=True)
+    cursor_date = cursor_pk = None
+    if cursor:
+        cursor_date, cursor_pk = decode_cursor(cursor)
+        if cursor_date is None:
+            dated = dated.none()
+            undated = undated.filter(id__lt=cursor_pk)
+        else:
+            dated = dated.filter(
+                Q(analysis_date__lt=cursor_date) | Q(analysis_date=cursor_date, id__lt=cursor_pk))
+
+    rows = list(dated.order_by('-analysis_date', '-id').values(*columns)[:limit + 1])
+    if len(rows) <= limit:
+        rows += list(undated.order_by('-id').values(*columns)[:limit + 1 - len(rows)])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['analysis_date'], rows[-1]['id'])
+    return rows, next_cursor
+
+
+def serialize_row(row, fields=RESULT_FIELDS):
+    data = {}
+    for field in fields:
+        value = row[field]
+        if field == 'analysis_date':
+            value = value.strftime("%Y-%m-%d") if value else None
+        data[field] = value
+    return data
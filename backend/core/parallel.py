@@ -0,0 +1,168 @@
+# core/parallel.py
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+
+_process_pool = None
+_process_pool_key = None
+_process_pool_lock = threading.Lock()
+# Süreç havuzundaki her süreçte bir kez yüklenen plaka dedektörü
+_process_detector = None
+
+
+def _safe_detect(image_path, models, decoded=None):
+    # Bir görseldeki hata diğer görselleri etkilemesin
+    from .processor import detect_foods
+
+    timings = {}
+    try:
+        return detect_foods(image_path, models, timings=timings, decoded=decoded), timings
+    except Exception as e:
+        print(f"Error processing {image_path}: {str(e)}")
+        timings['error'] = 'detect'
+        return [], timings
+
+
+def _init_process_worker(model_path):
+    # spawn ile açılan süreçte Django ve plaka modeli bir kez kurulur,
+    # süreç havuzu yaşadığı sürece bellekte kalır.
+    global _process_detector
+    from pathlib import Path
+
+    import django
+    from django.apps import apps
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    if not apps.ready:
+        django.setup()
+
+    from .backends import load_model_file
+    _process_detector = load_model_file(Path(model_path))
+
+
+def _detect_in_process(image_path):
+    return _safe_detect(image_path, {'wisePlate': _process_detector})
+
+
+def detector_source(models):
+    """
+    Süreç havuzunun yükleyeceği plaka dedektörü: (model dosyası, sürüm).
+    models['wisePlate'] registry'nin yüklü modeli değilse (stub modeller,
+    farklı bir loader / backend ile yüklenmiş ya da hot reload öncesinden
+    kalmış model) süreçler aynı modeli yükleyemez; None döner.
+    """
+    from .backends import load_model_file
+    from .model_registry import LazyModels, get_registry
+
+    if isinstance(models, LazyModels):
+        registry = models.registry
+    else:
+        registry = get_registry()
+        if not registry.is_current('wisePlate', models.get('wisePlate')):
+            return None
+    if registry.loader is not load_model_file or 'wisePlate' not in registry.model_paths:
+        return None
+    return str(registry.model_paths['wisePlate']), registry.versions(['wisePlate']).get('wisePlate')
+
+
+def get_process_pool(workers, model_path, version=None):
+    """
+    Plaka modelini yüklü tutan, çağrılar arasında paylaşılan süreç havuzu.
+    Worker sayısı, model dosyası veya sürümü değişince havuz yeniden kurulur.
+    """
+    global _process_pool, _process_pool_key
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    key = (workers, model_path, version)
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_key != key:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=True)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_process_worker,
+                initargs=(model_path,),
+            )
+            _process_pool_key = key
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool, _process_pool_key
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True)
+        _process_pool = None
+        _process_pool_key = None
+
+
+def iter_detections(image_paths, models, workers=None, mode=None):
+    """
+    Görselleri (okuma + plaka tespiti) paralel işler ve (image_path, detections,
+    timings) üçlülerini girdi sırasıyla döner; çıktı worker sayısından
+    bağımsızdır. timings: detect_foods'un doldurduğu görsel bilgileri ve süreler.
+    Tek worker'da görseller DECODE_THREADS'lik havuzda önden çözülür.
+
+    mode='thread': modeller paylaşılır; cv2 ve torch GIL'i bıraktığı için
+    çekirdekler arasında ölçeklenir. mode='process': her süreç models'taki
+    plaka modelinin dosyasını (bkz. detector_source) kendisi yükler ve havuz
+    açık kaldıkça saklar; dedektör registry'den gelmiyorsa ValueError
+    fırlar. Bellekte en fazla workers * 2 görselin sonucu bekletilir.
+    """
+    workers = workers or config.DETECTION_WORKERS
+    mode = mode or config.DETECTION_MODE
+
+    if workers <= 1:
+        # Seri tespitte okuma ayrı thread'lerde önden yapılır (image_io.prefetch)
+        from .image_io import prefetch
+
+        for image_path, decoded in prefetch(image_paths):
+            if decoded is None:
+                print(f"Image could not be read: {image_path}")
+                yield image_path, [], {'error': 'decode'}
+                continue
+            yield (image_path, *_safe_detect(image_path, models, decoded))
+        return
+
+    if mode == 'process':
+        source = detector_source(models)
+        if source is None:
+            raise ValueError("mode='process' loads the plate detector from the model registry's file in each "
+                             "process; the given 'wisePlate' model is not the registry's. Use mode='thread'.")
+        executor = get_process_pool(workers, *source)
+        submit = lambda path: executor.submit(_detect_in_process, path)  # noqa: E731
+        owned = False
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wise-detect')
+        submit = lambda path: executor.submit(_safe_detect, path, models)  # noqa: E731
+        owned = True
+
+    try:
+        paths = iter(image_paths)
+        in_flight = deque()
+        for image_path in paths:
+            in_flight.append((image_path, submit(image_path)))
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            image_path, future = in_flight.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                in_flight.append((next_path, submit(next_path)))
+            try:
+                detections, timings = future.result()
+            except Exception as e:
+                # Süreç çökmesi vb. havuz hataları da görsel bazında kalır
+                print(f"Error processing {image_path}: {str(e)}")
+                detections, timings = [], {'error': 'detect'}
+            yield image_path, detections, timings
+    finally:
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,155 @@
+# core/persistence.py
+
+from django.db import transaction
+
+from . import config, metrics
+from .models import AnalyzedImage, DetectionRecord, FoodAnalysis, StoredCrop
+from .rollups import update_daily_stats
+
+
+class AnalysisWriteError(Exception):
+    """Analiz sonuçları veritabanına yazılamadığında fırlatılır."""
+
+    def __init__(self, message, batch_index=None, batch_size=None):
+        super().__init__(message)
+        self.batch_index = batch_index
+        self.batch_size = batch_size
+
+
+def build_analysis(detection, analysis_date=None, user=None):
+    """Sınıflandırılmış bir Detection için kaydedilmemiş FoodAnalysis nesnesi."""
+    waste_status = detection.waste_status
+    return FoodAnalysis(
+        user=user,
+        category=detection.category,
+        food_type=detection.food_type,
+        waste_count=1 if waste_status == 'israf-var' else 0,
+        no_waste_count=1 if waste_status == 'israf-yok' else 0,
+        waste_ratio=detection.waste_confidence if waste_status != 'bilgi-yok' else 0.0,
+        analysis_date=analysis_date
+    )
+
+
+def build_analyzed_image(image_path, user=None, analysis_date=None, content_hash='',
+                         model_fingerprint='', model_versions=None, timings=None, cached=False):
+    """Bir görsel için kaydedilmemiş AnalyzedImage. timings: saniye cinsinden süreler."""
+    import os
+
+    timings = timings or {}
+
+    def milliseconds(name):
+        return timings[name] * 1000 if name in timings else None
+
+    return AnalyzedImage(
+        user=user,
+        analysis_date=analysis_date,
+        content_hash=content_hash or '',
+        name=os.path.basename(image_path),
+        width=timings.get('width'),
+        height=timings.get('height'),
+        model_fingerprint=model_fingerprint or '',
+        model_versions=model_versions or {},
+        cached=cached,
+        decode_ms=milliseconds('decode'),
+        detect_ms=milliseconds('detect'),
+        classify_ms=milliseconds('classify'),
+    )
+
+
+def build_detection_record(detection, image, analysis=None):
+    """
+    Sınıflandırılmış Detection için kaydedilmemiş DetectionRecord. image ve
+    analysis kaydedilmemiş olabilir; save_analyses önce onları yazar.
+    """
+    x_min, y_min, x_max, y_max = detection.box
+    return DetectionRecord(
+        image=image,
+        analysis=analysis,
+        index=detection.index,
+        category=detection.category,
+        x_min=x_min,
+        y_min=y_min,
+        x_max=x_max,
+        y_max=y_max,
+        detection_confidence=detection.detection_confidence,
+        waste_status=detection.waste_status,
+        waste_confidence=detection.waste_confidence,
+        food_type=detection.food_type,
+        type_confidence=detection.type_confidence,
+    )
+
+
+def _bulk_create(model, objects, batch_size, ignore_conflicts=False):
+    for batch_index, start in enumerate(range(0, len(objects), batch_size)):
+        batch = objects[start:start + batch_size]
+        try:
+            model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        except Exception as e:
+            raise AnalysisWriteError(
+                f"Failed to write {model.__name__} batch {batch_index} "
+                f"(rows {start}-{start + len(batch) - 1} of {len(objects)}): {e}",
+                batch_index=batch_index,
+                batch_size=len(batch),
+            ) from e
+
+
+def _write_all(analyses, images, records, crops, batch_size):
+    with transaction.atomic():
+        # Kırpımlar içerik adreslidir; daha önceki yüklemelerden kalan aynı
+        # özetli satırlar olduğu gibi bırakılır
+        _bulk_create(StoredCrop, crops, batch_size, ignore_conflicts=True)
+        # Depo var olan kırpımın eksik küçük kopyasını sonradan yazabilir;
+        # satır ignore_conflicts'te güncellenmediği için bayrak ayrıca açılır
+        thumbnailed = [crop.hash for crop in crops if crop.thumbnail]
+        if thumbnailed:
+            StoredCrop.objects.filter(hash__in=thumbnailed, thumbnail=False).update(thumbnail=True)
+        _bulk_create(FoodAnalysis, analyses, batch_size)
+        _bulk_create(AnalyzedImage, images, batch_size)
+        # Tespitler, bulk_create'in birincil anahtar atadığı görsel ve
+        # analizlere bağlanır (PostgreSQL, SQLite >= 3.35)
+        if any(image.pk is None for image in images):
+            print("Database did not return primary keys from bulk_create; detection records skipped.")
+            records = []
+        for record in records:
+            if record.analysis is not None and record.analysis.pk is None:
+                record.analysis = None
+        _bulk_create(DetectionRecord, records, batch_size)
+
+        # Günlük özetler aynı transaction içinde artımlı güncellenir
+        try:
+            update_daily_stats(analyses)
+        except Exception as e:
+            raise AnalysisWriteError(f"Failed to update daily waste statistics: {e}") from e
+    return records
+
+
+def save_analyses(analyses, batch_size=None, images=(), records=(), crops=()):
+    """
+    Kayıtları tek transaction içinde batch_size'lık bulk_create parçalarıyla
+    yazar ve DailyWasteStat özetlerini günceller. Herhangi bir parça
+    başarısız olursa hiçbir kayıt yazılmaz ve hangi parçanın neden başarısız
+    olduğunu anlatan AnalysisWriteError fırlatılır.
+    images / records: aynı transaction'da yazılacak AnalyzedImage ve
+    DetectionRecord nesneleri (bkz. build_analyzed_image, build_detection_record).
+    crops: analizlerin crop_id ile başvurduğu StoredCrop nesneleri (bkz.
+    output_sink.ImageSink.stored_crops); analizlerden önce yazılır.
+    """
+    batch_size = batch_size or config.ANALYSIS_BULK_BATCH_SIZE
+    analyses = list(analyses)
+    images = list(images)
+    records = list(records)
+    crops = list(crops)
+    if not analyses and not images:
+        return 0
+
+    try:
+        with metrics.stage('db_write'):
+            records = _write_all(analyses, images, records, crops, batch_size)
+    except AnalysisWriteError:
+        metrics.inc(metrics.ERRORS, stage='db_write')
+        raise
+    metrics.inc(metrics.ANALYSES, len(analyses))
+
+    print(f"{len(analyses)} analysis records created"
+          + (f", {len(images)} images and {len(records)} detections recorded." if images else "."))
+    return len(analyses)
@@ -0,0 +1,53 @@
+# core/preprocess.py
+
+# Sınıflandırıcıların beklediği ImageNet normalizasyonu ve 224x224 geometri
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+TARGET_SIZE = (224, 224)
+
+_constants = {}
+
+
+def _normalization(device):
+    # mean/std tensörleri cihaz başına bir kez oluşturulur
+    cached = _constants.get(device)
+    if cached is None:
+        import torch
+
+        mean = torch.tensor(MEAN, dtype=torch.float32, device=device).view(1, 3, 1, 1) * 255.0
+        std = torch.tensor(STD, dtype=torch.float32, device=device).view(1, 3, 1, 1) * 255.0
+        cached = _constants[device] = (mean, std)
+    return cached
+
+
+def preprocess_batch(crops, target_size=TARGET_SIZE, device='cpu'):
+    """
+    BGR uint8 numpy kırpımlarını tek bir normalize NCHW float32 tensöre çevirir.
+
+    utils_image.preprocess_image ile aynı işlemleri (Resize -> CenterCrop ->
+    ToTensor -> Normalize) tensör işlemleriyle yapar: kanal sırası BGR'den
+    RGB'ye çevrilir, antialias'lı bilinear ile yeniden boyutlandırılır ve
+    PIL gibi uint8'e yuvarlanır. Resize hedef boyuta tam oturttuğu için
+    CenterCrop ayrıca gerekmez.
+    """
+    import numpy as np
+    import torch
+    import torch.nn.functional as F
+
+    if not crops:
+        return torch.empty((0, 3) + tuple(target_size), dtype=torch.float32, device=device)
+
+    resized = []
+    for crop in crops:
+        # HWC BGR -> 1x3xHxW RGB
+        tensor = torch.from_numpy(np.ascontiguousarray(crop[:, :, ::-1])).to(device)
+        tensor = tensor.permute(2, 0, 1).unsqueeze(0).float()
+        if tuple(tensor.shape[-2:]) != tuple(target_size):
+            tensor = F.interpolate(tensor, size=target_size, mode='bilinear',
+                                   align_corners=False, antialias=True)
+            tensor = tensor.round_().clamp_(0, 255)
+        resized.append(tensor)
+
+    mean, std = _normalization(torch.device(device))
+    batch = torch.cat(resized)
+    return batch.sub_(mean).div_(std)
@@ -1,34 +1,84 @@
 import os
-import shutil
-import tempfile
-from pathlib import Path
-from datetime import datetime
-
-from .config import FOOD_TYPES  # Aynı dizindeki config'i import et
-from .models import FoodAnalysis  # FoodAnalysis modelini import et
-from .utils_image import preprocess_image
-
-def process_detection(image_path, models, output_base_dir, analysis_date=None, user=None):
-    import cv2
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from . import config, metrics
+from .config import (  # Aynı dizindeki config'i import et
+    FOOD_TYPES, WASTE_MODEL_MAPPING, TYPE_MODEL_MAPPING, MULTIHEAD_MODEL_MAPPING,
+    CLS_BATCH_SIZE, CLS_FLUSH_SIZE,
+)
+from .persistence import build_analysis, build_analyzed_image, build_detection_record, save_analyses
+from .output_sink import create_sink
+from .parallel import iter_detections
+from .preprocess import preprocess_batch
+from .result_cache import content_hash, get_result_cache, model_fingerprint
+from .tiling import detect_boxes
+
+
+@dataclass
+class Detection:
+    """Plaka üzerinde tespit edilen tek bir yemek ve sınıflandırma sonuçları."""
+    image_path: str
+    base_filename: str
+    index: int
+    category: str
+    detection_confidence: float
+    crop: Any = None
+    tensor: Any = None
+    waste_status: str = "bilgi-yok"
+    waste_confidence: float = 0.0
+    food_type: str = "bilgi-yok"
+    type_confidence: Optional[float] = None
+    # Kırpımın orijinal görseldeki (x_min, y_min, x_max, y_max) kutusu
+    box: Optional[tuple] = None
+    # Sonuç önbellekten geldiyse sınıflandırma atlanır
+    cached: bool = False
+
+
+def _get_device():
     import torch
-
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    img = cv2.imread(image_path)
-    if img is None:
+    return torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+
+def detect_foods(image_path, models, timings=None, decoded=None):
+    """
+    Görseldeki yemekleri tespit eder, kırpımları hazırlar. Sınıflandırma yapmaz.
+    timings sözlüğü verilirse görsel boyutu ve okuma / tespit süreleri
+    (saniye) yazılır. decoded: önceden çözülmüş görsel (image_io.prefetch);
+    verilmezse görsel burada çözülür. Kırpımlar çözülen görselden kesilir
+    (DECODE_MAX_SIDE açıksa küçültülmüş çözünürlükte, bkz. config),
+    Detection.box ise her zaman orijinal görsel koordinatlarındadır.
+    """
+    from .image_io import decode_image
+
+    timings = {} if timings is None else timings
+    if decoded is None:
+        started = time.perf_counter()
+        decoded = decode_image(image_path)
+        timings['decode'] = time.perf_counter() - started
+    else:
+        timings['decode'] = decoded.seconds
+    if decoded is None:
         print(f"Image could not be read: {image_path}")
-        return
+        timings['error'] = 'decode'
+        return []
+    img = decoded.image
+    timings['height'], timings['width'] = decoded.height, decoded.width
 
-    plate_detection = models['wisePlate'](img)
-    boxes = plate_detection.xywh[0].cpu().numpy()
+    # Kutular her durumda çözülen görselin çözünürlüğünde döner (bkz. tiling.detect_boxes)
+    started = time.perf_counter()
+    boxes, names = detect_boxes(img, models['wisePlate'])
+    timings['detect'] = time.perf_counter() - started
 
     base_filename = os.path.splitext(os.path.basename(image_path))[0]
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
     category_limits = {'corba': 1, 'ana-yemek': 1, 'yan-yemek': 1, 'ek-yemek': 1}
     detected_counts = {'corba': 0, 'ana-yemek': 0, 'yan-yemek': 0, 'ek-yemek': 0}
     processed_food_count = 0
     max_food_per_plate = 4
 
+    detections = []
     for i, box in enumerate(boxes):
         if processed_food_count >= max_food_per_plate:
             print(f"Processing stopped: Max 4 foods per plate reached for {image_path}")
@@ -46,8 +96,11 @@ def process_detection(image_path, models, output_base_dir, analysis_date=None, u
             cropped_img = img[y_min:y_max, x_min:x_max]
             if cropped_img.size == 0:
                 continue
+            # Dilim (view) tüm görseli bellekte tutar; kırpımlar sınıflandırma
+            # turunu ve yazma kuyruğunu beklerken yalnızca kendi pikselleri kalsın
+            cropped_img = cropped_img.copy()
 
-            food_category = plate_detection.names[int(box[5])]
+            food_category = names[int(box[5])]
             detection_confidence = float(box[4])
             print(f"Detected category: {food_category}, Confidence: {detection_confidence}")
 
@@ -58,112 +111,475 @@ def process_detection(image_path, models, output_base_dir, analysis_date=None, u
             detected_counts[food_category] += 1
             processed_food_count += 1
 
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                temp_path = temp_file.name
-                cv2.imwrite(temp_path, cropped_img)
-                print(f"Temporary file created at: {temp_path}")
-
-            waste_model_mapping = {
-                'corba': 'wiseSoup',
-                'ana-yemek': 'wiseMainCls',
-                'yan-yemek': 'wiseSideCls',
-                'ek-yemek': 'wiseExtraCls'
-            }
-
-            waste_status = "bilgi-yok"
-            waste_confidence = torch.tensor(0.0)
-            img_tensor = None
-            if food_category in waste_model_mapping:
-                waste_model_name = waste_model_mapping[food_category]
-                if waste_model_name in models:
-                    img_tensor = preprocess_image(temp_path)
-                    img_tensor = img_tensor.to(device)
-
-                    with torch.no_grad():
-                        waste_prediction = models[waste_model_name](img_tensor)
-
-                    waste_probs = torch.nn.functional.softmax(waste_prediction[0], dim=0)
-                    waste_confidence, waste_class = torch.max(waste_probs, 0)
-                    waste_status = "israf-yok" if waste_class.item() == 1 else "israf-var"
-
-            # Yemek türünü belirle
-            type_model_mapping = {
-                'corba': 'wiseTypeSoup',
-                'ana-yemek': 'wiseMainTypeCls',
-                'yan-yemek': 'wiseSideTypeCls',
-                'ek-yemek': 'wiseExtraTypeCls'
-            }
-
-            type_name = "bilgi-yok"
-            if food_category in type_model_mapping:
-                type_model_name = type_model_mapping[food_category]
-                if type_model_name in models:
-                    if img_tensor is None:
-                        img_tensor = preprocess_image(temp_path)
-                        img_tensor = img_tensor.to(device)
-                    with torch.no_grad():
-                        type_prediction = models[type_model_name](img_tensor)
-
-                    type_probs = torch.nn.functional.softmax(type_prediction[0], dim=0)
-                    type_confidence, food_type_index = torch.max(type_probs, 0)
-
-                    if food_category in FOOD_TYPES and food_type_index.item() in FOOD_TYPES[food_category]:
-                        type_name = FOOD_TYPES[food_category][food_type_index.item()]
+            detections.append(Detection(
+                image_path=image_path,
+                base_filename=base_filename,
+                index=i,
+                category=food_category,
+                detection_confidence=detection_confidence,
+                crop=cropped_img,
+                box=_to_original((x_min, y_min, x_max, y_max), decoded),
+            ))
 
-            try:
-                FoodAnalysis.objects.create(
-                    user=user,
-                    category=food_category,
-                    food_type=type_name,
-                    waste_count=1 if waste_status == 'israf-var' else 0,
-                    no_waste_count=1 if waste_status == 'israf-yok' else 0,
-                    waste_ratio=waste_confidence.item() if waste_status != 'bilgi-yok' else 0.0,
-                    analysis_date=analysis_date
-                )
-                print(f"Analysis record created for {food_category} - {type_name} - {waste_status}")
-            except Exception as e:
-                print(f"Error creating FoodAnalysis record: {e}")
+        except Exception as e:
+            print(f"Error processing detection {i}: {str(e)}")
+            continue
 
-            final_dir = os.path.join(output_base_dir, food_category, type_name, waste_status)
-            Path(final_dir).mkdir(parents=True, exist_ok=True)
+    return detections
 
-            final_filename = (
-                f"{base_filename}_"
-                f"{food_category}_"
-                f"{type_name}_"
-                f"{detection_confidence:.2f}_"
-                f"{waste_status}.jpg"
-            )
-            final_path = os.path.join(final_dir, final_filename)
-            shutil.copy2(temp_path, final_path)
-            print(f"File saved to: {final_path}")
 
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+def _to_original(box, decoded):
+    if decoded.scale == 1.0:
+        return box
+    return tuple(int(round(v / decoded.scale)) for v in box)
 
-        except Exception as e:
-            print(f"Error processing detection {i}: {str(e)}")
-            continue
 
+def _top1(logits):
+    """(N, sınıf) logitlerinden her satır için (olasılık, sınıf)."""
+    import torch
 
-def process_directory(input_directory, models, output_base_dir, analysis_date=None, user=None):
-    import os
-    import shutil
-    # Yukarıdaki modüller tekrar import edilse de sorun olmaz, RAM açısından avantaj sağlar
+    probs = torch.nn.functional.softmax(logits, dim=1)
+    confidences, classes = torch.max(probs, 1)
+    return list(zip(confidences.tolist(), classes.tolist()))
 
-    if os.path.exists(output_base_dir):
-        shutil.rmtree(output_base_dir)
-    os.makedirs(output_base_dir, exist_ok=True)
 
-    image_paths = [
-        os.path.join(input_directory, f)
-        for f in os.listdir(input_directory)
-        if f.lower().endswith(('.png', '.jpg', '.jpeg'))
-    ]
+def _predict(model, batch):
+    """
+    Tek başlı modeller için [(olasılık, sınıf), ...], ortak omurgalı (çok
+    başlı) modeller için [((israf), (tür)), ...] döner.
+    """
+    import torch
 
-    for image_path in image_paths:
+    with torch.no_grad():
+        prediction = model(batch)
+    if isinstance(prediction, (tuple, list)):
+        return list(zip(*(_top1(head) for head in prediction)))
+    return _top1(prediction)
+
+
+def _predict_batched(model, tensors, batch_size, device, model_name=''):
+    """
+    Tensörleri en fazla batch_size'lık gruplar halinde modele verir ve her
+    biri için tahmini döner (bkz. _predict). Bir grup hata verirse o gruptaki
+    kırpımlar tek tek denenir; yine başarısız olanlar için None döner.
+    Her model çağrısının süresi 'classify' aşaması olarak ölçülür.
+    """
+    import torch
+
+    results = []
+    for start in range(0, len(tensors), batch_size):
+        chunk = tensors[start:start + batch_size]
         try:
-            print(f"\nProcessing image: {image_path}")
-            process_detection(image_path, models, output_base_dir, analysis_date=analysis_date, user=user)
+            with metrics.stage('classify', model=model_name):
+                results.extend(_predict(model, torch.cat(chunk).to(device)))
         except Exception as e:
-            print(f"Error processing {image_path}: {str(e)}")
+            print(f"Batched inference failed ({len(chunk)} crops), retrying one by one: {e}")
+            for tensor in chunk:
+                try:
+                    with metrics.stage('classify', model=model_name):
+                        results.append(_predict(model, tensor.to(device))[0])
+                except Exception as e:
+                    print(f"Error classifying crop: {e}")
+                    metrics.inc(metrics.ERRORS, stage='classify')
+                    results.append(None)
+    return results
+
+
+def _apply_waste(detection, confidence, cls):
+    detection.waste_confidence = confidence
+    detection.waste_status = "israf-yok" if cls == 1 else "israf-var"
+
+
+def _apply_type(detection, confidence, cls):
+    detection.type_confidence = confidence
+    if cls in FOOD_TYPES.get(detection.category, {}):
+        detection.food_type = FOOD_TYPES[detection.category][cls]
+
+
+def _group_by_model(detections, mapping, models):
+    groups = {}
+    for detection in detections:
+        model_name = mapping.get(detection.category)
+        if model_name in models:
+            groups.setdefault(model_name, []).append(detection)
+    return groups
+
+
+def classify_detections(detections, models, batch_size=None):
+    """
+    Tüm kırpımları hedef modele göre gruplar, her grubu toplu forward
+    pass'lerle sınıflandırır ve sonuçları ilgili Detection'lara yazar.
+    Kategorinin ortak omurgalı modeli yüklüyse israf ve tür tek forward
+    pass'te hesaplanır. Sınıflandırılamayan tespitleri listeden çıkarıp
+    geri kalanları döner.
+    """
+    batch_size = batch_size or CLS_BATCH_SIZE
+    device = _get_device()
+    mappings = (MULTIHEAD_MODEL_MAPPING, WASTE_MODEL_MAPPING, TYPE_MODEL_MAPPING)
+
+    to_preprocess = [
+        d for d in detections
+        if any(mapping.get(d.category) in models for mapping in mappings)
+    ]
+
+    dropped = set()
+    try:
+        with metrics.stage('preprocess'):
+            batch = preprocess_batch([d.crop for d in to_preprocess])
+        for i, detection in enumerate(to_preprocess):
+            detection.tensor = batch[i:i + 1]
+    except Exception as e:
+        print(f"Batched preprocessing failed, retrying one by one: {e}")
+        for detection in to_preprocess:
+            try:
+                with metrics.stage('preprocess'):
+                    detection.tensor = preprocess_batch([detection.crop])
+            except Exception as e:
+                print(f"Error processing detection {detection.index}: {str(e)}")
+                metrics.inc(metrics.ERRORS, stage='preprocess')
+                dropped.add(id(detection))
+    ready = [d for d in detections if id(d) not in dropped]
+
+    failed = set()
+    combined = set()
+    for model_name, group in _group_by_model(ready, MULTIHEAD_MODEL_MAPPING, models).items():
+        predictions = _predict_batched(models[model_name], [d.tensor for d in group], batch_size, device,
+                                       model_name=model_name)
+        for detection, prediction in zip(group, predictions):
+            combined.add(id(detection))
+            if prediction is None:
+                failed.add(id(detection))
+                continue
+            _apply_waste(detection, *prediction[0])
+            _apply_type(detection, *prediction[1])
+
+    separate = [d for d in ready if id(d) not in combined]
+    for mapping, apply in ((WASTE_MODEL_MAPPING, _apply_waste), (TYPE_MODEL_MAPPING, _apply_type)):
+        for model_name, group in _group_by_model(separate, mapping, models).items():
+            predictions = _predict_batched(models[model_name], [d.tensor for d in group], batch_size, device,
+                                           model_name=model_name)
+            for detection, prediction in zip(group, predictions):
+                if prediction is None:
+                    failed.add(id(detection))
+                    continue
+                apply(detection, *prediction)
+
+    classified = []
+    for detection in ready:
+        detection.tensor = None
+        if id(detection) in failed:
+            continue
+        classified.append(detection)
+        metrics.inc(metrics.CROPS, category=detection.category)
+    return classified
+
+
+def save_output_image(detection, sink):
+    """
+    Kırpımı kırpım deposuna yazılmak üzere sink'e verir, içerik anahtarını
+    döner (sink yoksa ya da kırpım yoksa None).
+    """
+    key = None
+    if sink is not None and detection.crop is not None:
+        # Kırpım tek seferde, orijinal pikselden encode edilir
+        key = sink.submit(detection.crop)
+    detection.crop = None
+    return key
+
+
+def _collect(detections, analysis_date, user, sink):
+    analyses = []
+    for detection in detections:
+        print(f"Analysis result: {detection.category} - {detection.food_type} - {detection.waste_status}")
+        analysis = build_analysis(detection, analysis_date=analysis_date, user=user)
+        analysis.crop_id = save_output_image(detection, sink)
+        analyses.append(analysis)
+    return analyses
+
+
+def _classify_and_collect(detections, models, analysis_date, user, sink):
+    return _collect(classify_detections(detections, models), analysis_date, user, sink)
+
+
+def _cache_entry(detection):
+    """Sınıflandırılmış Detection'ın önbelleğe yazılan (JSON) hali."""
+    return {
+        'index': detection.index,
+        'category': detection.category,
+        'detection_confidence': detection.detection_confidence,
+        'box': list(detection.box) if detection.box is not None else None,
+        'waste_status': detection.waste_status,
+        'waste_confidence': detection.waste_confidence,
+        'food_type': detection.food_type,
+        'type_confidence': detection.type_confidence,
+    }
+
+
+def _from_cache(image_path, entries, with_crops):
+    """
+    Önbellek kayıtlarından sınıflandırılmış Detection'lar. Çıktı görselleri
+    yazılacaksa kırpımlar kayıtlı kutulardan yeniden kesilir (yalnızca okuma,
+    model çalışmaz).
+    """
+    decoded = None
+    if with_crops and entries:
+        from .image_io import decode_image
+        decoded = decode_image(image_path)
+
+    base_filename = os.path.splitext(os.path.basename(image_path))[0]
+    detections = []
+    for entry in entries:
+        box = tuple(entry['box']) if entry.get('box') is not None else None
+        crop = None
+        if decoded is not None and box is not None:
+            # Kayıtlı kutu orijinal koordinatlarda, görsel küçültülmüş çözülmüş olabilir
+            x_min, y_min, x_max, y_max = (int(round(v * decoded.scale)) for v in box)
+            crop = decoded.image[y_min:y_max, x_min:x_max].copy()
+        detections.append(Detection(
+            image_path=image_path,
+            base_filename=base_filename,
+            index=entry['index'],
+            category=entry['category'],
+            detection_confidence=entry['detection_confidence'],
+            crop=crop,
+            waste_status=entry['waste_status'],
+            waste_confidence=entry['waste_confidence'],
+            food_type=entry['food_type'],
+            type_confidence=entry['type_confidence'],
+            box=box,
+            cached=True,
+        ))
+    return detections
+
+
+@dataclass
+class ImageDetections:
+    """Bir görselin tespitleri ile önbellek ve kayıtlar için gereken bilgiler."""
+    image_path: str
+    detections: list
+    timings: dict
+    content_hash: str = ''
+    cache_key: Optional[str] = None
+    cached: bool = False
+
+
+def _iter_images(image_paths, models, cache=None, fingerprint='', hash_images=False,
+                 with_crops=False, workers=None, mode=None):
+    """
+    Görselleri girdi sırasıyla ImageDetections olarak döner. Önbellekte
+    bulunan görseller modele gönderilmez, sınıflandırılmış Detection'ları
+    cached=True ile gelir; diğerleri iter_detections ile tespit edilir ve
+    sonuçları saklanabilsin diye cache_key taşır.
+    """
+    hash_images = hash_images or cache is not None
+    items = []
+    for image_path in image_paths:
+        image_hash = ''
+        if hash_images:
+            try:
+                image_hash = content_hash(image_path)
+            except OSError as e:
+                print(f"Could not hash {image_path}: {e}")
+        key = entries = None
+        if cache is not None and image_hash:
+            key, entries = cache.lookup(image_hash, fingerprint)
+        items.append((image_path, image_hash, key, entries))
+
+    misses = iter_detections([path for path, _, _, entries in items if entries is None],
+                             models, workers=workers, mode=mode)
+    for image_path, image_hash, key, entries in items:
+        if entries is not None:
+            yield ImageDetections(image_path, _from_cache(image_path, entries, with_crops), {},
+                                  content_hash=image_hash, cached=True)
+        else:
+            _, detections, timings = next(misses)
+            yield ImageDetections(image_path, detections, timings, content_hash=image_hash, cache_key=key)
+
+
+def _by_image(detections):
+    by_image = {}
+    for detection in detections:
+        by_image.setdefault(detection.image_path, []).append(detection)
+    return by_image
+
+
+def _store_results(cache, window, classified):
+    """Tespit ve sınıflandırması eksiksiz biten görsellerin sonuçlarını saklar."""
+    by_image = _by_image(classified)
+    for item in window:
+        detections = by_image.get(item.image_path, [])
+        # Okuma / tespit hatası boş sonuç gibi saklanmaz; sınıflandırması
+        # başarısız olan tespit varsa görsel de saklanmaz
+        if item.timings.get('error'):
+            continue
+        if item.cache_key is not None and len(detections) == len(item.detections):
+            cache.store(item.cache_key, [_cache_entry(d) for d in detections])
+
+
+def _share_classify_time(window, classified_count, seconds):
+    """Toplu sınıflandırma süresini görsellere kırpım sayılarına göre dağıtır."""
+    for item in window:
+        if not item.cached and classified_count:
+            item.timings['classify'] = seconds * len(item.detections) / classified_count
+
+
+def _build_records(window, ready, analyses, analysis_date, user, fingerprint, versions):
+    """Penceredeki her görsel için AnalyzedImage, her tespit için DetectionRecord."""
+    analysis_for = {id(d): analysis for d, analysis in zip(ready, analyses)}
+    by_image = _by_image(ready)
+    images, records = [], []
+    for item in window:
+        image = build_analyzed_image(item.image_path, user=user, analysis_date=analysis_date,
+                                     content_hash=item.content_hash, model_fingerprint=fingerprint,
+                                     model_versions=versions, timings=item.timings, cached=item.cached)
+        images.append(image)
+        for detection in by_image.get(item.image_path, []):
+            if detection.box is not None:
+                records.append(build_detection_record(detection, image, analysis_for.get(id(detection))))
+    return images, records
+
+
+def _observe_image(item):
+    """Görselin okuma / tespit sürelerini ve sayaçlarını metriklere yazar."""
+    metrics.inc(metrics.IMAGES, source='cache' if item.cached else 'model')
+    for stage in ('decode', 'detect'):
+        if stage in item.timings:
+            metrics.observe_stage(stage, item.timings[stage], model='wisePlate' if stage == 'detect' else '')
+    if item.timings.get('error'):
+        metrics.inc(metrics.ERRORS, stage=item.timings['error'])
+
+
+def _report_results(result_callback, window, detections):
+    by_image = _by_image(detections)
+    for item in window:
+        result_callback(item.image_path, by_image.get(item.image_path, []))
+
+
+def _stored_crops(sink, analyses, only_analyses=False):
+    """
+    Yazmaları bitmiş sink'in yazdığı kırpımlar; yazılamayan kırpımlara
+    başvuran analizlerin crop_id'si boşaltılır. only_analyses: yalnızca bu
+    analizlerin başvurduğu kırpımlar (sink birden çok çağrıda kullanılıyorsa).
+    """
+    if sink is None:
+        return []
+    for analysis in analyses:
+        if analysis.crop_id in sink.failed_keys:
+            analysis.crop_id = None
+    if only_analyses:
+        return sink.stored_crops(keys=[analysis.crop_id for analysis in analyses if analysis.crop_id])
+    return sink.stored_crops()
+
+
+def process_detection(image_path, models, analysis_date=None, user=None, sink=None):
+    detections = detect_foods(image_path, models)
+    analyses = _classify_and_collect(detections, models, analysis_date, user, sink)
+    # Sink çağıranındır ve açık kalır; satırlar yalnızca bu görselin
+    # kırpımları için, yazmalar bittikten sonra yazılır
+    if sink is not None:
+        sink.drain()
+    save_analyses(analyses, crops=_stored_crops(sink, analyses, only_analyses=True))
+
+
+def process_images(image_paths, models, analysis_date=None, user=None,
+                   save_images=None, progress_callback=None, workers=None, mode=None,
+                   result_callback=None, batch_size=None, use_cache=True):
+    """
+    Yalnızca verilen görselleri işler. Okuma ve plaka tespiti workers/mode
+    ile paralel çalışabilir (bkz. parallel.iter_detections); sonuçlar her
+    durumda girdi sırasıyla kaydedilir.
+    progress_callback(done, total): sınıflandırılan görsel sayısıyla her
+    sınıflandırma turundan sonra çağrılır. result_callback(image_path, detections):
+    her görsel için sınıflandırılmış tespitleriyle (tespit yoksa boş liste)
+    girdi sırasıyla çağrılır. FoodAnalysis kayıtları sonda
+    save_analyses ile toplu yazılır; yazılamazsa AnalysisWriteError fırlar.
+    Yazılan FoodAnalysis nesnelerini döner.
+
+    Sonuç önbelleği açıksa (RESULT_CACHE_BACKEND) daha önce aynı modellerle
+    işlenmiş görsellerin tespit ve sınıflandırmaları yeniden kullanılır.
+    DETECTION_RECORDS_ENABLED açıksa her görsel için AnalyzedImage ve her
+    tespit için DetectionRecord analizlerle birlikte yazılır.
+
+    batch_size verilirse CLS_BATCH_SIZE yerine kullanılır (sınıflandırma
+    turu en az bu kadar kırpım biriktirir); use_cache=False önbelleği atlar.
+
+    save_images açıksa kırpımlar içerik adresli kırpım deposuna yazılır
+    (bkz. crop_store.py) ve FoodAnalysis.crop ile başvurulur.
+    """
+    from .model_registry import get_registry
+
+    sink = create_sink(save_images)
+    cache = get_result_cache() if use_cache else None
+    flush_size = max(CLS_FLUSH_SIZE, batch_size or 0)
+    cache_before = cache.describe() if cache is not None else None
+    record = config.DETECTION_RECORDS_ENABLED
+    versions = get_registry().versions(models) if cache is not None or record else {}
+    fingerprint = model_fingerprint(versions, models)
+    analyses = []
+    images = []
+    records = []
+    try:
+        # Tespitler görseller arasında biriktirilir, CLS_FLUSH_SIZE'a ulaşınca
+        # model bazında gruplanıp toplu sınıflandırılır.
+        pending = []
+        window = []
+        total = len(image_paths)
+        detected = _iter_images(image_paths, models, cache=cache, fingerprint=fingerprint,
+                                hash_images=record, with_crops=sink is not None,
+                                workers=workers, mode=mode)
+        for done, item in enumerate(detected, start=1):
+            source = 'cached' if item.cached else 'foods'
+            print(f"\nProcessed image: {item.image_path} ({len(item.detections)} {source})")
+            _observe_image(item)
+            pending.extend(item.detections)
+            window.append(item)
+
+            if len(pending) >= flush_size or done == total:
+                to_classify = [d for d in pending if not d.cached]
+                started = time.perf_counter()
+                classified = {id(d) for d in classify_detections(to_classify, models, batch_size=batch_size)}
+                _share_classify_time(window, len(to_classify), time.perf_counter() - started)
+                ready = [d for d in pending if d.cached or id(d) in classified]
+
+                if cache is not None:
+                    _store_results(cache, window, [d for d in ready if not d.cached])
+                if result_callback is not None:
+                    _report_results(result_callback, window, ready)
+                window_analyses = _collect(ready, analysis_date, user, sink)
+                if record:
+                    window_images, window_records = _build_records(
+                        window, ready, window_analyses, analysis_date, user, fingerprint, versions)
+                    images.extend(window_images)
+                    records.extend(window_records)
+                analyses.extend(window_analyses)
+                pending = []
+                window = []
+                if progress_callback is not None:
+                    progress_callback(done, total)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    if cache is not None:
+        stats = cache.describe()
+        delta = {name: stats[name] - cache_before[name] for name in ('hits', 'misses', 'reused_detections')}
+        print(f"Result cache: {delta['hits']} hits, {delta['misses']} misses "
+              f"({delta['reused_detections']} detections reused)")
+
+    # Tüm yüklemenin sonuçları tek transaction'da toplu yazılır
+    save_analyses(analyses, images=images, records=records, crops=_stored_crops(sink, analyses))
+    return analyses
+
+
+def process_directory(input_directory, models, analysis_date=None, user=None,
+                      save_images=None, progress_callback=None, workers=None, mode=None,
+                      batch_size=None, use_cache=True, result_callback=None):
+    image_paths = sorted(
+        os.path.join(input_directory, f)
+        for f in os.listdir(input_directory)
+        if f.lower().endswith(('.png', '.jpg', '.jpeg'))
+    )
+    return process_images(image_paths, models, analysis_date=analysis_date, user=user,
+                          save_images=save_images, progress_callback=progress_callback,
+                          workers=workers, mode=mode, result_callback=result_callback,
+                          batch_size=batch_size, use_cache=use_cache)
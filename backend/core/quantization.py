@@ -0,0 +1,153 @@
+# core/quantization.py
+
+"""
+Sınıflandırıcılar için INT8 (ONNX Runtime) kuantizasyonu.
+
+Kalibrasyon klasörü kategori başına alt dizinlerden oluşur:
+
+    <klasör>/corba/*.jpg, <klasör>/ana-yemek/*.jpg, ...
+
+Her kategorinin kırpımları o kategorinin hem israf hem tür sınıflandırıcısını
+kalibre etmek ve FP32 ile karşılaştırmak için kullanılır.
+"""
+
+import os
+
+from .config import TYPE_MODEL_MAPPING, WASTE_MODEL_MAPPING
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def classifier_categories():
+    """{sınıflandırıcı adı: kategori} eşlemesi."""
+    categories = {}
+    for mapping in (WASTE_MODEL_MAPPING, TYPE_MODEL_MAPPING):
+        for category, model_name in mapping.items():
+            categories[model_name] = category
+    return categories
+
+
+def load_category_crops(calibration_dir, category, limit=None):
+    import cv2
+
+    category_dir = os.path.join(calibration_dir, category)
+    if not os.path.isdir(category_dir):
+        return []
+    paths = sorted(os.path.join(category_dir, f) for f in os.listdir(category_dir)
+                   if f.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+    return [img for img in (cv2.imread(p) for p in paths) if img is not None]
+
+
+def split_crops(crops, holdout=0.25):
+    """
+    Kırpımları (kalibrasyon, ayrılmış) olarak ikiye böler. Ayrılan kırpımlar
+    kalibrasyona girmez; INT8 uyumu yalnızca bunlarda ölçülür, aksi halde
+    aktivasyon aralıkları aynı verilerden ölçüldüğü için uyum olduğundan
+    iyi görünür. Dosya sırasına göre düzenli aralıklarla seçilir, sonuç
+    tekrarlanabilirdir.
+    """
+    calibration, held_out = [], []
+    for i, crop in enumerate(crops):
+        if int((i + 1) * holdout) > int(i * holdout):
+            held_out.append(crop)
+        else:
+            calibration.append(crop)
+    return calibration, held_out
+
+
+def _calibration_reader(input_name, crops, batch_size):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    from .preprocess import preprocess_batch
+
+    class CropCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._batches = iter(range(0, len(crops), batch_size))
+
+        def get_next(self):
+            start = next(self._batches, None)
+            if start is None:
+                return None
+            return {input_name: preprocess_batch(crops[start:start + batch_size]).numpy()}
+
+    return CropCalibrationReader()
+
+
+def quantize_classifier(fp32_path, int8_path, crops=None, mode='static', batch_size=16):
+    """
+    FP32 ONNX sınıflandırıcısından INT8 model üretir. 'static' kalibrasyon
+    kırpımları gerektirir (aktivasyon aralıkları bunlardan ölçülür);
+    'dynamic' yalnızca ağırlıkları kuantize eder.
+    """
+    import shutil
+
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    if mode == 'dynamic':
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    else:
+        if not crops:
+            raise ValueError(f"Static quantization of {fp32_path} needs calibration crops")
+        session = onnxruntime.InferenceSession(str(fp32_path), providers=['CPUExecutionProvider'])
+        input_name = session.get_inputs()[0].name
+        # Kanal başına QDQ, DequantizeLinear'ın axis özniteliğini (opset >= 13)
+        # gerektirir; varsayılan ONNX_OPSET=12 ile export edilen modeller
+        # tensör başına kuantize edilir
+        graph = onnx.load(str(fp32_path), load_external_data=False)
+        opset = max((entry.version for entry in graph.opset_import if entry.domain in ('', 'ai.onnx')), default=0)
+        quantize_static(
+            str(fp32_path), str(int8_path),
+            _calibration_reader(input_name, crops, batch_size),
+            quant_format=QuantFormat.QDQ,
+            per_channel=opset >= 13,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+        )
+
+    # Sınıf isimleri / tür bilgisi FP32 modelinkiyle aynı
+    shutil.copyfile(os.path.splitext(str(fp32_path))[0] + '.json',
+                    str(int8_path)[:-len('.onnx')] + '.json')
+    return int8_path
+
+
+def compare_classifiers(fp32_model, int8_model, crops, batch_size=32):
+    """
+    Aynı kırpımlarda FP32 ve INT8 tahminlerini karşılaştırır: sınıf uyumu,
+    olasılık farkı ve kırpım başına süre.
+    """
+    import time
+
+    import torch
+
+    from .preprocess import preprocess_batch
+
+    agree = 0
+    max_diff = 0.0
+    fp32_seconds = 0.0
+    int8_seconds = 0.0
+    with torch.no_grad():
+        for start in range(0, len(crops), batch_size):
+            batch = preprocess_batch(crops[start:start + batch_size])
+
+            started = time.perf_counter()
+            reference = torch.softmax(fp32_model(batch), dim=1)
+            fp32_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            candidate = torch.softmax(int8_model(batch), dim=1)
+            int8_seconds += time.perf_counter() - started
+
+            agree += (reference.argmax(1) == candidate.argmax(1)).sum().item()
+            max_diff = max(max_diff, (reference - candidate).abs().max().item())
+
+    total = len(crops)
+    return {
+        'crops': total,
+        'agreement': agree / total if total else None,
+        'max_prob_diff': max_diff,
+        'fp32_ms_per_crop': fp32_seconds / total * 1000 if total else None,
+        'int8_ms_per_crop': int8_seconds / total * 1000 if total else None,
+        'speedup': fp32_seconds / int8_seconds if int8_seconds else None,
+    }
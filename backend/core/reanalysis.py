@@ -0,0 +1,195 @@
+# core/reanalysis.py
+
+"""
+Arşivlenmiş görsel kümelerinin toplu (offline) yeniden analizi.
+
+Kaynak bir dizin ağacı veya manifest dosyası olabilir. Manifest her satırda
+bir görsel yolu içeren düz metin ya da 'path' (ve isteğe bağlı 'date')
+sütunlu bir CSV'dir; göreli yollar manifestin bulunduğu dizine göredir.
+
+Görseller analiz tarihine göre ardışık parçalara ayrılır ve her parça tek
+process_images çağrısıyla (paralel tespit, toplu sınıflandırma, tek
+transaction'da bulk yazma) işlenir. Her parçadan sonra checkpoint dosyası
+güncellenir; yarıda kalan çalışma aynı kaynakla yeniden başlatıldığında
+kaldığı yerden devam eder.
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+DATE_DIR_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})$')
+
+
+class CheckpointMismatch(Exception):
+    """Checkpoint başka bir kaynağa ya da değişmiş bir görsel listesine ait."""
+
+
+@dataclass
+class ArchiveImage:
+    path: str
+    analysis_date: date
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def infer_date(path, default=None):
+    """
+    Görselin analiz tarihi: verilen varsayılan, yoksa YYYY-MM-DD isimli en
+    yakın üst dizin, o da yoksa dosyanın değiştirilme tarihi.
+    """
+    if default is not None:
+        return default
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory and directory != os.path.dirname(directory):
+        match = DATE_DIR_PATTERN.match(os.path.basename(directory))
+        if match:
+            try:
+                return _parse_date(match.group(1))
+            except ValueError:
+                pass
+        directory = os.path.dirname(directory)
+    return date.fromtimestamp(os.path.getmtime(path))
+
+
+def scan_directory(root, default_date=None):
+    """Dizin ağacındaki görseller, yola göre sıralı."""
+    paths = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths.extend(os.path.join(directory, f) for f in filenames if f.lower().endswith(IMAGE_EXTENSIONS))
+    return [ArchiveImage(path, infer_date(path, default_date)) for path in sorted(paths)]
+
+
+def read_manifest(manifest_path, default_date=None):
+    """Manifestteki görseller, dosyadaki sırayla."""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding='utf-8', newline='') as f:
+        first_line = f.readline()
+        f.seek(0)
+        if first_line.strip().lower().startswith('path'):
+            rows = [(row['path'], row.get('date')) for row in csv.DictReader(f)]
+        else:
+            rows = [(line.strip(), None) for line in f if line.strip() and not line.startswith('#')]
+
+    images = []
+    for path, date_value in rows:
+        path = path if os.path.isabs(path) else os.path.join(base_dir, path)
+        analysis_date = _parse_date(date_value) if date_value else infer_date(path, default_date)
+        images.append(ArchiveImage(path, analysis_date))
+    return images
+
+
+def iter_chunks(images, chunk_size):
+    """Aynı analiz tarihli ardışık görsellerden en fazla chunk_size'lık parçalar."""
+    chunk = []
+    for image in images:
+        if chunk and (len(chunk) >= chunk_size or image.analysis_date != chunk[0].analysis_date):
+            yield chunk
+            chunk = []
+        chunk.append(image)
+    if chunk:
+        yield chunk
+
+
+class Checkpoint:
+    """
+    İşlenen görsel sayısını ve son görselin yolunu tutan JSON dosyası.
+    Yazma geçici dosya + os.replace ile atomiktir.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.completed = 0
+        self.last_path = None
+        self.analyses = 0
+        self.elapsed = 0.0
+
+    def load(self, images):
+        """Varsa checkpoint'i okur ve görsel listesiyle tutarlılığını doğrular."""
+        if not self.path or not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('source') != self.source:
+            raise CheckpointMismatch(f"Checkpoint {self.path} belongs to {data.get('source')}")
+        completed = data.get('completed', 0)
+        if completed > len(images) or (completed and images[completed - 1].path != data.get('last_path')):
+            raise CheckpointMismatch(
+                f"Image list changed since checkpoint {self.path} was written "
+                f"(expected {data.get('last_path')} at position {completed})")
+        self.completed = completed
+        self.last_path = data.get('last_path')
+        self.analyses = data.get('analyses', 0)
+        self.elapsed = data.get('elapsed', 0.0)
+        return self
+
+    def advance(self, chunk, analyses, elapsed):
+        self.completed += len(chunk)
+        self.last_path = chunk[-1].path
+        self.analyses += analyses
+        self.elapsed += elapsed
+        if self.path:
+            self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'source': self.source,
+                'completed': self.completed,
+                'last_path': self.last_path,
+                'analyses': self.analyses,
+                'elapsed': self.elapsed,
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def reanalyze(images, models, user, checkpoint, chunk_size=256, workers=None, mode=None,
+              save_images=False, progress=None):
+    """
+    checkpoint.completed'dan sonraki görselleri parça parça işler.
+    Sonuç önbelleği kullanılmaz: yeniden analiz güncel modellerle yapılır
+    (parmak izi değişmese de) ve arşiv önbelleği doldurmaz.
+    progress(dict): her parçadan sonra ilerleme ve img/s bilgisiyle çağrılır.
+    Toplam (görsel, analiz) sayısını döner.
+    """
+    from .processor import process_images
+
+    remaining = images[checkpoint.completed:]
+    total = len(images)
+    run_started = time.perf_counter()
+    run_images = 0
+    run_analyses = 0
+    for chunk in iter_chunks(remaining, chunk_size):
+        started = time.perf_counter()
+        analyses = process_images([image.path for image in chunk], models,
+                                  analysis_date=chunk[0].analysis_date, user=user,
+                                  save_images=save_images, workers=workers, mode=mode, use_cache=False)
+        elapsed = time.perf_counter() - started
+        checkpoint.advance(chunk, len(analyses), elapsed)
+
+        run_images += len(chunk)
+        run_analyses += len(analyses)
+        if progress is not None:
+            run_elapsed = time.perf_counter() - run_started
+            rate = run_images / run_elapsed if run_elapsed else 0.0
+            progress({
+                'completed': checkpoint.completed,
+                'total': total,
+                'analysis_date': chunk[0].analysis_date,
+                'chunk_images_per_second': len(chunk) / elapsed if elapsed else 0.0,
+                'images_per_second': rate,
+                'eta_seconds': (total - checkpoint.completed) / rate if rate else None,
+                'analyses': checkpoint.analyses,
+            })
+    return run_images, run_analyses
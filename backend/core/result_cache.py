@@ -0,0 +1,294 @@
+# core/result_cache.py
+
+"""
+İçerik özetli (content-hash) sonuç önbelleği.
+
+Aynı fotoğraf (örneğin zaman aşımından sonra) yeniden yüklendiğinde plaka
+tespiti ve sınıflandırıcılar tekrar çalıştırılmaz. Anahtar görselin byte'larının
+SHA-256 özeti ile kullanılan model dosyalarının sürüm parmak izinden oluşur;
+model dosyası değiştiğinde (hot reload) eski sonuçlar kendiliğinden geçersiz
+kalır. Değer, görseldeki tespitlerin JSON'a çevrilebilir listesidir.
+
+Backend'ler (RESULT_CACHE_BACKEND):
+
+'memory' : süreç içi LRU (OrderedDict), en fazla RESULT_CACHE_MAX_ENTRIES kayıt
+'disk'   : RESULT_CACHE_DIR/<ilk 2 karakter>/<anahtar>.json; süreçler ve
+           yeniden başlatmalar arasında paylaşılır
+'django' : settings.CACHES[RESULT_CACHE_ALIAS] (Redis, Memcached, ...)
+
+Her backend'de kayıtlar RESULT_CACHE_TTL_SECONDS sonra düşer.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from . import config, metrics
+
+# Önbelleğe yazılan kaydın biçimi değişirse artırılır
+CACHE_FORMAT_VERSION = 1
+BACKENDS = ('memory', 'disk', 'django')
+
+
+def content_hash(image_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_fingerprint(versions, models=()):
+    """
+    Model sürümlerinin (ModelRegistry.versions) kısa özeti. Sürümü
+    bilinmeyen modeller yalnızca isimleriyle katılır. Tespit çözünürlüğü /
+    karo ayarları açıksa onlar da katılır.
+    """
+    from .tiling import settings_fingerprint
+
+    parts = [f"v{CACHE_FORMAT_VERSION}"]
+    if settings_fingerprint():
+        parts.append(settings_fingerprint())
+    for name in sorted(set(versions) | set(models)):
+        parts.append(f"{name}:{versions.get(name, 'unversioned')}")
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class MemoryBackend:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """
+    Kayıt başına bir JSON dosyası. Okunan dosyanın mtime değeri yenilenir;
+    sayı sınırı aşıldığında en eski mtime'lı dosyalar silinir (yaklaşık LRU).
+    """
+
+    def __init__(self, root, max_entries, ttl):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._count = None
+        self.evictions = 0
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def _files(self):
+        return list(self.root.glob('*/*.json')) if self.root.is_dir() else []
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink()
+                with self._lock:
+                    self.evictions += 1
+                    if self._count:
+                        self._count -= 1
+                return None
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        existed = path.exists()
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._count is None:
+                self._count = len(self._files())
+            elif not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._prune()
+
+    def _prune(self):
+        # Her seferinde dizini taramamak için sınırın %10 altına inilir
+        files = []
+        for path in self._files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        excess = len(files) - int(self.max_entries * 0.9)
+        for _, path in files[:max(excess, 0)]:
+            try:
+                path.unlink()
+                self.evictions += 1
+            except OSError:
+                pass
+        self._count = len(files) - max(excess, 0)
+
+    def __len__(self):
+        return len(self._files())
+
+
+class DjangoCacheBackend:
+    """Eviction ve TTL Django cache backend'ine bırakılır."""
+
+    KEY_PREFIX = 'wise-result:'
+
+    def __init__(self, alias, ttl):
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.ttl = ttl or None
+        self.evictions = None
+
+    def get(self, key):
+        return self.cache.get(self.KEY_PREFIX + key)
+
+    def set(self, key, value):
+        self.cache.set(self.KEY_PREFIX + key, value, timeout=self.ttl)
+
+    def __len__(self):
+        raise TypeError('Django cache backends do not report their size')
+
+
+class ResultCache:
+    """
+    Görsel bazında tespit sonuçlarını saklar ve isabet (hit) / ıska (miss)
+    sayaçlarını tutar. Önbellek hataları işlemeyi durdurmaz; ıska sayılır.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        # İsabetlerde yeniden çalıştırılmayan tespit sayısı
+        self.reused_detections = 0
+
+    def lookup(self, image_hash, fingerprint):
+        """
+        image_hash: görselin content_hash değeri. (anahtar, kayıtlar) döner;
+        ıskada kayıtlar None'dır.
+        """
+        key = f"{image_hash}-{fingerprint}"
+        try:
+            entries = self.backend.get(key)
+        except Exception as e:
+            print(f"Result cache lookup failed for {key}: {e}")
+            with self._lock:
+                self.errors += 1
+                self.misses += 1
+            metrics.inc(metrics.ERRORS, stage='result_cache')
+            metrics.inc(metrics.RESULT_CACHE_LOOKUPS, result='miss')
+            return None, None
+
+        with self._lock:
+            if entries is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.reused_detections += len(entries)
+        metrics.inc(metrics.RESULT_CACHE_LOOKUPS, result='miss' if entries is None else 'hit')
+        return key, entries
+
+    def store(self, key, entries):
+        try:
+            self.backend.set(key, entries)
+        except Exception as e:
+            print(f"Result cache store failed: {e}")
+            with self._lock:
+                self.errors += 1
+            metrics.inc(metrics.ERRORS, stage='result_cache')
+            return
+        with self._lock:
+            self.stores += 1
+        metrics.inc(metrics.RESULT_CACHE_STORES)
+
+    def describe(self):
+        lookups = self.hits + self.misses
+        try:
+            entries = len(self.backend)
+        except TypeError:
+            entries = None
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'stores': self.stores,
+            'errors': self.errors,
+            'evictions': self.backend.evictions,
+            'reused_detections': self.reused_detections,
+        }
+
+
+def create_result_cache(backend=None):
+    """Ayar boşsa None döner; çağıranlar cache=None ile önbelleği atlar."""
+    backend = config.RESULT_CACHE_BACKEND if backend is None else backend
+    if not backend:
+        return None
+    ttl = config.RESULT_CACHE_TTL_SECONDS
+    if backend == 'memory':
+        return ResultCache(MemoryBackend(config.RESULT_CACHE_MAX_ENTRIES, ttl))
+    if backend == 'disk':
+        return ResultCache(DiskBackend(config.RESULT_CACHE_DIR, config.RESULT_CACHE_MAX_ENTRIES, ttl))
+    if backend == 'django':
+        return ResultCache(DjangoCacheBackend(config.RESULT_CACHE_ALIAS, ttl))
+    raise ValueError(f"Unknown result cache backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+
+_result_cache = None
+_result_cache_created = False
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Süreç başına tek önbellek nesnesi; kapalıysa None."""
+    global _result_cache, _result_cache_created
+    if not _result_cache_created:
+        with _result_cache_lock:
+            if not _result_cache_created:
+                _result_cache = create_result_cache()
+                _result_cache_created = True
+    return _result_cache
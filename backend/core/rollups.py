@@ -0,0 +1,93 @@
+# core/rollups.py
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import DailyWasteStat, FoodAnalysis
+
+
+def _rollup_key(analysis):
+    return (analysis.user_id, analysis.analysis_date, analysis.category, analysis.food_type)
+
+
+def aggregate_analyses(analyses):
+    """FoodAnalysis nesnelerini (user_id, gün, kategori, tür) bazında toplar."""
+    totals = {}
+    for analysis in analyses:
+        # Tarihsiz kayıtlar günlük özete girmez
+        if analysis.analysis_date is None or analysis.user_id is None:
+            continue
+        row = totals.setdefault(_rollup_key(analysis), {
+            'waste_count': 0, 'no_waste_count': 0, 'sample_count': 0, 'confidence_sum': 0.0,
+        })
+        row['waste_count'] += analysis.waste_count
+        row['no_waste_count'] += analysis.no_waste_count
+        row['sample_count'] += 1
+        # bilgi-yok kayıtların güveni yoktur; ortalamaya girmez
+        if analysis.waste_count or analysis.no_waste_count:
+            row['confidence_sum'] += analysis.waste_ratio
+    return totals
+
+
+def apply_rollup_deltas(totals):
+    """
+    Toplanan değerleri DailyWasteStat satırlarına ekler. Satır yoksa oluşturur;
+    eşzamanlı bir işlem aynı satırı önce oluşturduysa UPDATE ile devam eder.
+    Çağıranın transaction'ı içinde çalışmalıdır.
+    """
+    for (user_id, date, category, food_type), row in totals.items():
+        key = dict(user_id=user_id, date=date, category=category, food_type=food_type)
+        updates = {field: F(field) + value for field, value in row.items()}
+        if DailyWasteStat.objects.filter(**key).update(**updates):
+            continue
+        try:
+            with transaction.atomic():
+                DailyWasteStat.objects.create(**key, **row)
+        except IntegrityError:
+            DailyWasteStat.objects.filter(**key).update(**updates)
+
+
+def update_daily_stats(analyses):
+    apply_rollup_deltas(aggregate_analyses(analyses))
+
+
+def backfill_daily_stats(user=None, start=None, end=None, batch_size=1000):
+    """
+    Mevcut FoodAnalysis kayıtlarından günlük özetleri tek bir GROUP BY
+    sorgusuyla yeniden hesaplar ve verilen aralıktaki eski özetlerin yerine yazar.
+    """
+    analyses = FoodAnalysis.objects.filter(analysis_date__isnull=False)
+    stats = DailyWasteStat.objects.all()
+    if user is not None:
+        analyses = analyses.filter(user=user)
+        stats = stats.filter(user=user)
+    if start is not None:
+        analyses = analyses.filter(analysis_date__gte=start)
+        stats = stats.filter(date__gte=start)
+    if end is not None:
+        analyses = analyses.filter(analysis_date__lte=end)
+        stats = stats.filter(date__lte=end)
+
+    grouped = (analyses
+               .values('user_id', 'analysis_date', 'category', 'food_type')
+               .annotate(waste=Sum('waste_count'), no_waste=Sum('no_waste_count'), samples=Count('id'),
+                         confidence=Sum('waste_ratio', filter=Q(waste_count__gt=0) | Q(no_waste_count__gt=0)))
+               .order_by())
+
+    with transaction.atomic():
+        rows = [
+            DailyWasteStat(
+                user_id=row['user_id'],
+                date=row['analysis_date'],
+                category=row['category'],
+                food_type=row['food_type'],
+                waste_count=row['waste'] or 0,
+                no_waste_count=row['no_waste'] or 0,
+                sample_count=row['samples'],
+                confidence_sum=row['confidence'] or 0.0,
+            )
+            for row in grouped.iterator()
+        ]
+        deleted, _ = stats.delete()
+        DailyWasteStat.objects.bulk_create(rows, batch_size=batch_size)
+    return deleted, len(rows)
@@ -0,0 +1,128 @@
+# core/startup.py
+
+"""
+Worker açılışı: ağır kütüphanelerin import'u, model ön yüklemesi ve ısınma.
+
+İlk yükleme isteğinde torch / cv2 / torchvision import'ları, model dosyalarının
+okunması ve her modelin ilk forward pass'i (çekirdek seçimi, bellek ayırma)
+toplanarak isteği saniyelerce geciktirir. prepare_worker() bunları süreç
+açılışında, trafik kabul edilmeden önce yapar ve her adımın süresini içeren
+bir rapor döner. Son rapor last_report() ile (model_status) okunabilir.
+"""
+
+import importlib
+import os
+import time
+
+from . import config, metrics
+
+HEAVY_MODULES = ('numpy', 'cv2', 'PIL.Image', 'torch', 'torchvision')
+CLASSIFIER_INPUT = (1, 3, 224, 224)
+
+_last_report = None
+
+
+def import_heavy_modules(modules=HEAVY_MODULES):
+    """Modülleri sırayla import eder; {modül: saniye (kurulu değilse None)}."""
+    timings = {}
+    for module in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            timings[module] = None
+            continue
+        timings[module] = time.perf_counter() - started
+    return timings
+
+
+def _dummy_input(name):
+    from .backends import DETECTOR_MODELS
+
+    if name in DETECTOR_MODELS:
+        import numpy as np
+
+        # AutoShape ve DetectorRunner BGR numpy görsel bekler
+        return np.full((config.DETECTOR_IMGSZ, config.DETECTOR_IMGSZ, 3), 114, dtype=np.uint8)
+    import torch
+
+    return torch.zeros(CLASSIFIER_INPUT)
+
+
+def warm_up_model(name, model):
+    """Modelle bir kez sahte çıkarım yapar, süresini (saniye) döner."""
+    import torch
+
+    started = time.perf_counter()
+    with torch.no_grad():
+        model(_dummy_input(name))
+    return time.perf_counter() - started
+
+
+def prepare_worker(registry=None, warmup=None, top=None):
+    """
+    Import -> registry.preload(top) -> her yüklü modelle ısınma. Isınmada
+    hata veren model raporlanır, açılışı durdurmaz. Raporu döner.
+    """
+    from .model_registry import get_registry
+
+    registry = registry or get_registry()
+    warmup = config.MODEL_WARMUP if warmup is None else warmup
+    started = time.perf_counter()
+    report = {'pid': os.getpid(), 'backend': registry.backend, 'imports': import_heavy_modules(),
+              'models': {}, 'errors': {}}
+    report['import_seconds'] = sum(seconds or 0 for seconds in report['imports'].values())
+
+    load_started = time.perf_counter()
+    registry.preload(top=top)
+    report['load_seconds'] = time.perf_counter() - load_started
+
+    warmup_started = time.perf_counter()
+    for entry in registry.describe():
+        if not entry['loaded']:
+            continue
+        name = entry['name']
+        model_report = report['models'][name] = {
+            'load_seconds': entry['load_seconds'],
+            'memory_bytes': entry['memory_bytes'],
+            'warmup_seconds': None,
+        }
+        if not warmup:
+            continue
+        model = registry.get(name)
+        if model is None:
+            continue
+        try:
+            model_report['warmup_seconds'] = warm_up_model(name, model)
+        except Exception as e:
+            print(f"Warm-up failed for {name}: {e}")
+            report['errors'][name] = str(e)
+            continue
+        metrics.observe_stage('warmup', model_report['warmup_seconds'], model=name)
+    report['warmup_seconds'] = time.perf_counter() - warmup_started
+    report['total_seconds'] = time.perf_counter() - started
+    metrics.observe_stage('startup', report['total_seconds'])
+
+    global _last_report
+    _last_report = report
+    print(f"Worker ready in {report['total_seconds']:.2f}s "
+          f"(imports {report['import_seconds']:.2f}s, models {report['load_seconds']:.2f}s, "
+          f"warm-up {report['warmup_seconds']:.2f}s, {len(report['models'])} models)")
+    return report
+
+
+def prepare_server():
+    """
+    backend/wsgi.py ve asgi.py'den çağrılır; PRELOAD_MODELS açıksa
+    prepare_worker() çalışır. AppConfig.ready()'de çalışmaz: yönetim
+    komutları modelleri yüklemez ve uygulama kurulurken veritabanı
+    (registry.preload'un kullanım sıralaması) sorgulanmaz. İş kuyruğu
+    worker'ları prepare_worker'ı worker_loop içinde çağırır.
+    """
+    if config.PRELOAD_MODELS:
+        return prepare_worker()
+    return None
+
+
+def last_report():
+    return _last_report
@@ -1,53 +1,77 @@
 # core/stats_utils.py
 
-import os
 from datetime import datetime
 
-def collect_and_print_statistics(output_base_dir, analysis_date=None):
-    """
-    Tüm kategoriler ve türler için israf istatistiklerini toplar ve yazdırır
-    analysis_date parametresi eklendi (opsiyonel).
-    """
-    statistics = {
+
+def _empty_statistics():
+    return {
         'corba': {'total': {'israf-var': 0, 'israf-yok': 0}, 'types': {}},
         'ana-yemek': {'total': {'israf-var': 0, 'israf-yok': 0}, 'types': {}},
         'yan-yemek': {'total': {'israf-var': 0, 'israf-yok': 0}, 'types': {}},
         'ek-yemek': {'total': {'israf-var': 0, 'israf-yok': 0}, 'types': {}}
     }
 
-    # İstatistikleri topla
-    for category in statistics.keys():
-        category_path = os.path.join(output_base_dir, category)
-        if not os.path.exists(category_path):
-            continue
-
-        # Tür klasörlerini kontrol et
-        for type_name in os.listdir(category_path):
-            type_path = os.path.join(category_path, type_name)
-            if not os.path.isdir(type_path):
-                continue
-
-            # Her tür için israf istatistiklerini başlat
-            if type_name not in statistics[category]['types']:
-                statistics[category]['types'][type_name] = {
-                    'israf-var': 0,
-                    'israf-yok': 0
-                }
-
-            # İsraf durumlarını say
-            for waste_status in ['israf-var', 'israf-yok']:
-                waste_path = os.path.join(type_path, waste_status)
-                if os.path.exists(waste_path):
-                    file_count = len([f for f in os.listdir(waste_path)
-                                   if f.lower().endswith(('.jpg', '.jpeg', '.png'))])
-
-                    # Tür bazında sayıları güncelle
-                    statistics[category]['types'][type_name][waste_status] += file_count
-
-                    # Kategori toplamını güncelle
-                    statistics[category]['total'][waste_status] += file_count
-
-    # İstatistikleri yazdır
+
+def _add(statistics, category, type_name, waste_count, no_waste_count):
+    data = statistics.setdefault(category, {'total': {'israf-var': 0, 'israf-yok': 0}, 'types': {}})
+    type_data = data['types'].setdefault(type_name, {'israf-var': 0, 'israf-yok': 0})
+    type_data['israf-var'] += waste_count
+    type_data['israf-yok'] += no_waste_count
+    data['total']['israf-var'] += waste_count
+    data['total']['israf-yok'] += no_waste_count
+
+
+def build_statistics(analyses):
+    """
+    Bu çalıştırmanın FoodAnalysis nesnelerinden (kaydedilmiş olması gerekmez)
+    kategori ve tür bazında israf istatistiklerini hesaplar. Dosya sistemine
+    dokunmaz.
+    """
+    statistics = _empty_statistics()
+    for analysis in analyses:
+        _add(statistics, analysis.category, analysis.food_type,
+             analysis.waste_count, analysis.no_waste_count)
+    return statistics
+
+
+def statistics_from_foods(foods):
+    """Aynı yapıyı akış oturumlarının görsel bazlı sonuç sözlüklerinden hesaplar."""
+    statistics = _empty_statistics()
+    for food in foods:
+        waste_status = food['waste_status']
+        _add(statistics, food['category'], food['food_type'],
+             1 if waste_status == 'israf-var' else 0, 1 if waste_status == 'israf-yok' else 0)
+    return statistics
+
+
+def threshold_sweep(records, thresholds):
+    """
+    DetectionRecord queryset'i üzerinde, her tespit güveni eşiği için
+    kategori bazında kalan tespit ve israf sayılarını tek sorguyla hesaplar.
+    {eşik: {kategori: {'detections', 'israf-var', 'israf-yok'}}} döner.
+    """
+    from django.db.models import Count, Q
+
+    aggregates = {}
+    for i, threshold in enumerate(thresholds):
+        kept = Q(detection_confidence__gte=threshold)
+        aggregates[f"n{i}"] = Count('id', filter=kept)
+        aggregates[f"w{i}"] = Count('id', filter=kept & Q(waste_status='israf-var'))
+        aggregates[f"k{i}"] = Count('id', filter=kept & Q(waste_status='israf-yok'))
+
+    sweep = {threshold: {} for threshold in thresholds}
+    for row in records.values('category').annotate(**aggregates).order_by('category'):
+        for i, threshold in enumerate(thresholds):
+            sweep[threshold][row['category']] = {
+                'detections': row[f"n{i}"],
+                'israf-var': row[f"w{i}"],
+                'israf-yok': row[f"k{i}"],
+            }
+    return sweep
+
+
+def print_statistics(statistics, analysis_date=None):
+    """İstatistik raporunu yazdırır."""
     print("\n" + "="*50)
     print(f"İSTATİSTİK RAPORU")
     print(f"Tarih/Saat (UTC): {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -77,4 +101,4 @@ def collect_and_print_statistics(output_base_dir, analysis_date=None):
                     print(f"  İsraf Yok: {type_data['israf-yok']} "
                           f"({(type_data['israf-yok']/type_total*100):.1f}%)")
 
-    print("\n" + "="*50)
\ No newline at end of file
+    print("\n" + "="*50)
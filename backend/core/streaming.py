@@ -0,0 +1,318 @@
+# core/streaming.py
+
+"""
+Akış (streaming) yükleme oturumları.
+
+Toplu yüklemede (upload_images) tüm multipart gövde alınmadan işleme
+başlamaz. Akış oturumunda istemci görselleri tek tek gönderir ve her görsel
+geldiği anda işlenmeye hazırdır:
+
+    POST upload/sessions/                 -> oturum açar (ProcessingJob, streaming=True)
+    POST upload/sessions/<id>/images/     -> tek görsel ekler (UploadedImage)
+    POST upload/sessions/<id>/close/      -> yeni görsel kabulünü bitirir
+    GET  upload/sessions/<id>/events/     -> görsel bazında sonuçlar (NDJSON veya SSE)
+
+ASYNC_UPLOADS açıkken oturum bekleyen görseli yokken 'idle' durumunda durur
+ve hiçbir worker'ı meşgul etmez. Eklenen her görsel (ya da kapanış) işi
+tekrar kuyruğa alır; işi alan worker bekleyen görselleri STREAM_BATCH_SIZE'lık
+turlarla işler ve görsel kalmayınca oturumu bırakır. Yeni görsel gelmeyen
+oturumlar expire_idle_sessions ile kapatılır. Kapalıyken her görsel kendi
+isteğinde işlenir. Her iki durumda sonuçlar UploadedImage satırlarına yazılır
+ve olay akışı bunları okur.
+"""
+
+import json
+import os
+import time
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from . import config
+from .models import ProcessingJob, UploadedImage
+from .workspace import Workspace, create_workspace
+
+
+class SessionClosed(Exception):
+    """Kapanmış bir oturuma görsel eklenmeye çalışıldığında fırlatılır."""
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_ndjson(data)
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse(data)
+
+
+def format_ndjson(event):
+    return json.dumps(event, ensure_ascii=False, default=str) + '\n'
+
+
+def format_sse(event):
+    if event.get('event') == 'heartbeat':
+        return ': heartbeat\n\n'
+    lines = [f"event: {event['event']}"]
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def food_result(detection):
+    """Sınıflandırılmış Detection'ın UploadedImage.foods içindeki hali."""
+    return {
+        'category': detection.category,
+        'food_type': detection.food_type,
+        'waste_status': detection.waste_status,
+        'waste_confidence': detection.waste_confidence,
+        'type_confidence': detection.type_confidence,
+        'detection_confidence': detection.detection_confidence,
+    }
+
+
+def open_session(user, analysis_date):
+    """
+    Yeni akış oturumu açar. Asenkron modda oturum ilk görsele kadar 'idle'
+    bekler; senkron modda hemen 'running' olur.
+    """
+    job = ProcessingJob(
+        user=user,
+        analysis_date=analysis_date,
+        streaming=True,
+        accepting_images=True,
+        status=ProcessingJob.STATUS_IDLE,
+    )
+    if not config.ASYNC_UPLOADS:
+        # İşleri worker almayacak; görseller istek içinde işlenir
+        job.status = ProcessingJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+    job.workspace = create_workspace(job.id).root
+    job.save()
+    return job
+
+
+def add_image(job, uploaded_file):
+    """
+    Görseli oturumun çalışma alanına yazar ve bekleyen görsel olarak ekler.
+    Oturum kapalıysa (veya ekleme sırasında kapandıysa) SessionClosed fırlar.
+    """
+    if not ProcessingJob.objects.filter(id=job.id, accepting_images=True).exists():
+        raise SessionClosed(f"Upload session {job.id} is closed")
+
+    path = Workspace(job.workspace).save_upload(uploaded_file)
+    image = UploadedImage.objects.create(job=job, name=os.path.basename(path), path=path)
+
+    # Kapanışla yarışan ekleme: worker oturumu bitirdikten sonra eklenen
+    # görsel hiç işlenmez, bu yüzden geri alınır
+    if not ProcessingJob.objects.filter(id=job.id, accepting_images=True).exists():
+        image.delete()
+        os.remove(path)
+        raise SessionClosed(f"Upload session {job.id} is closed")
+
+    ProcessingJob.objects.filter(id=job.id).update(total_images=F('total_images') + 1)
+    wake_session(job)
+    return image
+
+
+def wake_session(job):
+    """Boşta bekleyen oturumu worker'ların alması için tekrar kuyruğa alır."""
+    return bool(ProcessingJob.objects.filter(id=job.id, status=ProcessingJob.STATUS_IDLE)
+                .update(status=ProcessingJob.STATUS_PENDING))
+
+
+def close_session(job):
+    """
+    Yeni görsel kabulünü bitirir; kapatan çağrıysa True döner. Boşta bekleyen
+    oturum, istatistikleri bir worker hesaplasın diye kuyruğa alınır.
+    """
+    closed = bool(ProcessingJob.objects.filter(id=job.id, accepting_images=True)
+                  .update(accepting_images=False))
+    wake_session(job)
+    return closed
+
+
+def expire_idle_sessions(idle_timeout=None):
+    """
+    Son görseli (görsel yoksa açılışı) idle_timeout'tan eski, boşta bekleyen
+    oturumları kapatır; kapatılan oturum sayısını döner.
+    """
+    idle_timeout = config.STREAM_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    cutoff = timezone.now() - timedelta(seconds=idle_timeout)
+    expired = (ProcessingJob.objects
+               .filter(status=ProcessingJob.STATUS_IDLE, accepting_images=True)
+               .annotate(last_activity=Coalesce(Max('images__created_at'), 'created_at'))
+               .filter(last_activity__lt=cutoff))
+    closed = 0
+    for job in expired:
+        if close_session(job):
+            print(f"Session {job.id} idle for {idle_timeout}s, closing.")
+            closed += 1
+    return closed
+
+
+def process_session_images(images, models, job):
+    """
+    Bekleyen UploadedImage'ları tek process_images çağrısıyla işler ve
+    sonuçlarını yazar. Sonuçlar analizler veritabanına yazıldıktan sonra
+    görünür olur; yazma başarısızsa görseller 'failed' işaretlenir.
+    """
+    from .processor import process_images
+
+    by_path = {image.path: image for image in images}
+    foods = {}
+
+    def collect(image_path, detections):
+        foods[image_path] = [food_result(d) for d in detections]
+
+    workspace = Workspace(job.workspace)
+    try:
+        process_images(list(by_path), models,
+                       analysis_date=job.analysis_date, user=job.user, result_callback=collect)
+    except Exception as e:
+        print(f"Session {job.id}: processing {len(images)} image(s) failed: {e}")
+        UploadedImage.objects.filter(id__in=[image.id for image in images]).update(
+            status=UploadedImage.STATUS_FAILED, error=str(e), processed_at=timezone.now())
+        ProcessingJob.objects.filter(id=job.id).update(processed_images=F('processed_images') + len(images))
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        for path, image in by_path.items():
+            image.foods = foods.get(path, [])
+            image.status = UploadedImage.STATUS_DONE
+            image.processed_at = now
+        UploadedImage.objects.bulk_update(list(by_path.values()), ['foods', 'status', 'processed_at'])
+        ProcessingJob.objects.filter(id=job.id).update(processed_images=F('processed_images') + len(images))
+
+    for image in images:
+        try:
+            os.remove(image.path)
+        except OSError:
+            pass
+
+
+def finish_session(job):
+    """Oturumun istatistiklerini görsel sonuçlarından hesaplar ve işi bitirir."""
+    from .stats_utils import statistics_from_foods
+
+    foods = [food
+             for image_foods in job.images.filter(status=UploadedImage.STATUS_DONE).values_list('foods', flat=True)
+             for food in image_foods]
+    statistics = statistics_from_foods(foods)
+    ProcessingJob.objects.filter(id=job.id).update(
+        status=ProcessingJob.STATUS_DONE, statistics=statistics, finished_at=timezone.now(),
+        accepting_images=False)
+    Workspace(job.workspace).remove_images()
+    return statistics
+
+
+def _pending_images(job):
+    return job.images.filter(status=UploadedImage.STATUS_PENDING)
+
+
+def run_streaming_job(job, models):
+    """
+    Worker tarafı: bekleyen görselleri turlar halinde işler. Görsel kalmayınca
+    oturum kapandıysa bitirilir ve istatistikleri döner; açıksa worker'ı
+    bekletmeden 'idle' durumuna bırakılır ve None döner.
+    """
+    while True:
+        pending = list(_pending_images(job).order_by('id')[:config.STREAM_BATCH_SIZE])
+        if pending:
+            process_session_images(pending, models, job)
+            continue
+
+        job.refresh_from_db(fields=['accepting_images'])
+        if not job.accepting_images:
+            # Kapanıştan sonra eklenen görsel olamaz (bkz. add_image)
+            if _pending_images(job).exists():
+                continue
+            return finish_session(job)
+
+        ProcessingJob.objects.filter(id=job.id, status=ProcessingJob.STATUS_RUNNING).update(
+            status=ProcessingJob.STATUS_IDLE, worker='')
+        # Bırakılırken gelen görsel veya kapanış 'running' işi uyandıramadı;
+        # bırakıldıktan sonra bakılır, gerekirse iş yeniden kuyruğa alınır
+        job.refresh_from_db(fields=['accepting_images'])
+        if _pending_images(job).exists() or not job.accepting_images:
+            wake_session(job)
+        return None
+
+
+def image_event(image):
+    return {
+        'event': 'image',
+        'id': image.id,
+        'name': image.name,
+        'status': image.status,
+        'foods': image.foods,
+        'error': image.error or None,
+        'processed_at': image.processed_at,
+    }
+
+
+def iter_session_events(job, after=0, poll_interval=None, timeout=None, heartbeat=None):
+    """
+    Oturumun görsel sonuçlarını eklenme sırasıyla olay olarak üretir; iş
+    bitince 'done' olayıyla kapanır. 'after' verilen id'den sonrası gönderilir,
+    böylece kopan bağlantı kaldığı yerden sürdürülebilir. timeout dolarsa
+    akış 'timeout' olayıyla biter.
+    """
+    poll_interval = config.STREAM_POLL_INTERVAL if poll_interval is None else poll_interval
+    timeout = config.STREAM_EVENTS_TIMEOUT if timeout is None else timeout
+    heartbeat = config.STREAM_HEARTBEAT_INTERVAL if heartbeat is None else heartbeat
+
+    started = last_sent = time.monotonic()
+    last_id = after
+    while True:
+        emitted = False
+        for image in job.images.filter(id__gt=last_id).order_by('id'):
+            # Sıra korunur: bekleyen ilk görselde durulur
+            if image.status == UploadedImage.STATUS_PENDING:
+                break
+            yield image_event(image)
+            last_id = image.id
+            emitted = True
+
+        job.refresh_from_db(fields=['status', 'statistics', 'processed_images', 'total_images', 'error'])
+        if job.status in (ProcessingJob.STATUS_DONE, ProcessingJob.STATUS_FAILED):
+            # İş bittiyse kalan görseller (başarısız iş için bekleyenler dahil)
+            # son haliyle gönderilir
+            for image in job.images.filter(id__gt=last_id).order_by('id'):
+                yield image_event(image)
+            yield {
+                'event': 'done',
+                'status': job.status,
+                'processed_images': job.processed_images,
+                'total_images': job.total_images,
+                'statistics': job.statistics,
+                'error': job.error or None,
+            }
+            return
+
+        now = time.monotonic()
+        if emitted:
+            last_sent = now
+        elif now - last_sent >= heartbeat:
+            yield {'event': 'heartbeat'}
+            last_sent = now
+        if now - started >= timeout:
+            yield {'event': 'timeout', 'after': last_id}
+            return
+        time.sleep(poll_interval)
@@ -1,3 +1,1568 @@
-from django.test import TestCase
+from unittest import skipUnless
+import importlib.util
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+HAS_VISION = all(importlib.util.find_spec(m) for m in ('torch', 'torchvision', 'PIL', 'numpy', 'cv2'))
+
+
+@skipUnless(HAS_VISION, "torch/torchvision/PIL gerekli")
+class PreprocessBatchTests(SimpleTestCase):
+    # PIL uint8 yuvarlaması ile tensör yolu arasında izin verilen en büyük fark
+    # (normalize edilmiş uzayda; 2/255 piksel / en küçük std)
+    ATOL = 2 / 255 / 0.224 + 1e-4
+
+    def _reference(self, bgr):
+        from PIL import Image
+        from .utils_image import _get_transform
+
+        return _get_transform((224, 224))(Image.fromarray(bgr[:, :, ::-1].copy()))
+
+    def test_matches_torchvision_compose(self):
+        import numpy as np
+        import torch
+        from .preprocess import preprocess_batch
+
+        rng = np.random.default_rng(0)
+        crops = [
+            rng.integers(0, 256, size=shape, dtype=np.uint8)
+            for shape in ((300, 400, 3), (120, 90, 3), (224, 224, 3), (500, 260, 3))
+        ]
+        batch = preprocess_batch(crops)
+
+        self.assertEqual(tuple(batch.shape), (len(crops), 3, 224, 224))
+        self.assertEqual(batch.dtype, torch.float32)
+        for i, crop in enumerate(crops):
+            diff = (batch[i] - self._reference(crop)).abs()
+            self.assertLessEqual(diff.max().item(), self.ATOL)
+            self.assertLess(diff.mean().item(), 0.01)
+
+    def test_empty_input(self):
+        from .preprocess import preprocess_batch
+
+        self.assertEqual(tuple(preprocess_batch([]).shape), (0, 3, 224, 224))
+
+
+@skipUnless(HAS_VISION, "torch/torchvision gerekli")
+class ExportBackendParityTests(SimpleTestCase):
+    def _classifier(self):
+        import torch
+
+        torch.manual_seed(0)
+        return torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 3, stride=2), torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(8, 3),
+        ).eval()
+
+    def _check(self, backend, loader):
+        import tempfile
+        import torch
+        from .backends import export_module
+
+        module = self._classifier()
+        batch = torch.randn(5, 3, 224, 224)
+        with torch.no_grad():
+            expected = module(batch)
+        with tempfile.TemporaryDirectory() as export_dir:
+            path, = export_module(module, 'tiny', 'classifier', {0: 'a', 1: 'b', 2: 'c'},
+                                  export_dir, formats=(backend,))
+            runner = loader(path)
+            actual = runner(batch)
+        self.assertEqual(runner.names, {0: 'a', 1: 'b', 2: 'c'})
+        self.assertEqual(tuple(actual.shape), (5, 3))
+        self.assertTrue(torch.allclose(actual, expected, atol=1e-4))
+
+    def test_torchscript_matches_eager(self):
+        from .backends import load_torchscript
+        self._check('torchscript', load_torchscript)
+
+    @skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                "onnxruntime gerekli")
+    def test_onnx_matches_eager(self):
+        from .backends import load_onnx
+        self._check('onnx', load_onnx)
+
+    def test_detector_runner_maps_boxes_back(self):
+        import numpy as np
+        import torch
+        from .backends import DetectorRunner
+
+        def run(tensor):
+            # 640x640 letterbox girişinde merkez (320, 320), 100x50 kutu, sınıf 1
+            return torch.tensor([[[320.0, 320.0, 100.0, 50.0, 0.9, 0.1, 0.8]]])
+
+        result = DetectorRunner(run, {0: 'corba', 1: 'ana-yemek'}, 640)(np.zeros((320, 1280, 3), np.uint8))
+        box = result.xywh[0][0].tolist()
+        # 1280 genişlik 640'a 0.5 oranla sığar; kutu orijinalde 2 kat büyüktür
+        self.assertAlmostEqual(box[0], 640.0, places=3)
+        self.assertAlmostEqual(box[1], 160.0, places=3)
+        self.assertAlmostEqual(box[2], 200.0, places=3)
+        self.assertAlmostEqual(box[3], 100.0, places=3)
+        self.assertEqual(int(box[5]), 1)
+
+    def test_registry_requires_onnxruntime_up_front(self):
+        from pathlib import Path
+        from unittest import mock
+        from .backends import BackendUnavailable
+        from .model_registry import ModelRegistry
+
+        paths = {'wisePlate': Path('wisePlate.onnx'), 'wiseSoup': Path('wiseSoup.pt')}
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            with self.assertRaisesRegex(BackendUnavailable, 'wisePlate'):
+                ModelRegistry(model_paths=paths, hot_reload=False)
+            # Yalnızca .pt dosyaları onnxruntime gerektirmez
+            ModelRegistry(model_paths={'wiseSoup': Path('wiseSoup.pt')}, hot_reload=False)
+
+
+@skipUnless(HAS_VISION, "torch gerekli")
+class MultiHeadTests(SimpleTestCase):
+    def _classifier(self, backbone, classes):
+        import torch
+
+        class Classifier(torch.nn.Module):
+            # YOLOv5 ClassificationModel gibi: omurga katmanları + son katmanda başlık
+            def __init__(self):
+                super().__init__()
+                head = torch.nn.Sequential(
+                    torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(8, classes))
+                self.model = torch.nn.Sequential(*backbone, head)
+
+            def forward(self, x):
+                return self.model(x)
+
+        return Classifier().eval()
+
+    def test_shared_backbone_matches_separate_models(self):
+        import copy
+        import torch
+        from .multihead import build_multihead
+
+        torch.manual_seed(0)
+        backbone = [torch.nn.Conv2d(3, 8, 3, stride=2), torch.nn.SiLU()]
+        waste = self._classifier(backbone, 2)
+        food_type = self._classifier(copy.deepcopy(backbone), 4)
+
+        combined = build_multihead(waste, food_type)
+        self.assertIsNotNone(combined)
+        batch = torch.randn(3, 3, 64, 64)
+        with torch.no_grad():
+            waste_logits, type_logits = combined(batch)
+            self.assertTrue(torch.allclose(waste_logits, waste(batch)))
+            self.assertTrue(torch.allclose(type_logits, food_type(batch)))
+
+    def test_different_backbones_are_not_merged(self):
+        import torch
+        from .multihead import build_multihead
+
+        torch.manual_seed(0)
+        waste = self._classifier([torch.nn.Conv2d(3, 8, 3)], 2)
+        food_type = self._classifier([torch.nn.Conv2d(3, 8, 3)], 4)
+        self.assertIsNone(build_multihead(waste, food_type))
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_memory_backend_evicts_least_recently_used(self):
+        from .result_cache import MemoryBackend
+
+        backend = MemoryBackend(max_entries=2, ttl=0)
+        backend.set('a', [1])
+        backend.set('b', [2])
+        self.assertEqual(backend.get('a'), [1])
+        backend.set('c', [3])
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), [1])
+        self.assertEqual(backend.evictions, 1)
+
+    def test_memory_backend_expires_entries(self):
+        from unittest import mock
+        from .result_cache import MemoryBackend
+
+        backend = MemoryBackend(max_entries=10, ttl=60)
+        with mock.patch('core.result_cache.time.time', return_value=1000.0):
+            backend.set('a', [])
+        with mock.patch('core.result_cache.time.time', return_value=1061.0):
+            self.assertIsNone(backend.get('a'))
+
+    def test_disk_backend_round_trip_and_prune(self):
+        import tempfile
+        from .result_cache import DiskBackend, ResultCache
+
+        with tempfile.TemporaryDirectory() as root:
+            cache = ResultCache(DiskBackend(root, max_entries=10, ttl=0))
+            entry = [{'category': 'corba', 'box': [1, 2, 30, 40]}]
+            for i in range(11):
+                cache.store(f"{i:02d}key", entry)
+            self.assertLessEqual(len(cache.backend), 10)
+            self.assertEqual(cache.backend.get('10key'), entry)
+
+    def test_lookup_counts_hits_and_misses(self):
+        import tempfile
+        from .result_cache import MemoryBackend, ResultCache, content_hash, model_fingerprint
+
+        cache = ResultCache(MemoryBackend(max_entries=10, ttl=0))
+        v1 = model_fingerprint({'wisePlate': 'wisePlate.pt@1000'})
+        v2 = model_fingerprint({'wisePlate': 'wisePlate.pt@2000'})
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as f:
+            f.write(b'plate')
+            f.flush()
+            image_hash = content_hash(f.name)
+        key, entries = cache.lookup(image_hash, v1)
+        self.assertIsNone(entries)
+        cache.store(key, [{'category': 'corba'}])
+        self.assertEqual(cache.lookup(image_hash, v1)[1], [{'category': 'corba'}])
+        # Model sürümü değişince aynı görsel yeniden işlenir
+        self.assertIsNone(cache.lookup(image_hash, v2)[1])
+        stats = cache.describe()
+        self.assertEqual((stats['hits'], stats['misses'], stats['reused_detections']), (1, 2, 1))
+
+    def test_failed_images_are_not_cached(self):
+        from .processor import ImageDetections, _store_results
+        from .result_cache import MemoryBackend, ResultCache
+
+        cache = ResultCache(MemoryBackend(max_entries=10, ttl=0))
+        window = [
+            ImageDetections('ok.jpg', [], {}, cache_key='ok'),
+            ImageDetections('detect.jpg', [], {'error': 'detect'}, cache_key='detect'),
+            ImageDetections('decode.jpg', [], {'error': 'decode'}, cache_key='decode'),
+        ]
+        _store_results(cache, window, [])
+        self.assertEqual(cache.backend.get('ok'), [])
+        self.assertIsNone(cache.backend.get('detect'))
+        self.assertIsNone(cache.backend.get('decode'))
+
+    def test_lookups_and_stores_are_exported_as_metrics(self):
+        from unittest import mock
+        from . import metrics
+        from .result_cache import MemoryBackend, ResultCache
+
+        cache = ResultCache(MemoryBackend(max_entries=10, ttl=0))
+        with mock.patch.object(metrics.config, 'METRICS_ENABLED', True), \
+                mock.patch.object(metrics.config, 'METRICS_DIR', ''), \
+                mock.patch.object(metrics.RESULT_CACHE_LOOKUPS, '_values', {}), \
+                mock.patch.object(metrics.RESULT_CACHE_STORES, '_values', {}):
+            key, _ = cache.lookup('abc', 'v1')
+            cache.store(key, [])
+            cache.lookup('abc', 'v1')
+            cache.lookup('def', 'v1')
+            text = metrics.render()
+        self.assertIn('wise_result_cache_lookups_total{result="hit"} 1\n', text)
+        self.assertIn('wise_result_cache_lookups_total{result="miss"} 2\n', text)
+        self.assertIn('wise_result_cache_stores_total 1\n', text)
+
+
+class StreamingFormatTests(SimpleTestCase):
+    def test_sse_event_carries_id_for_resume(self):
+        import json
+        from .streaming import format_sse
+
+        text = format_sse({'event': 'image', 'id': 7, 'foods': []})
+        lines = text.rstrip('\n').split('\n')
+        self.assertEqual(lines[:2], ['event: image', 'id: 7'])
+        self.assertEqual(json.loads(lines[2][len('data: '):])['id'], 7)
+        self.assertTrue(text.endswith('\n\n'))
+        self.assertEqual(format_sse({'event': 'heartbeat'}), ': heartbeat\n\n')
+
+    def test_statistics_from_foods(self):
+        from .stats_utils import statistics_from_foods
+
+        statistics = statistics_from_foods([
+            {'category': 'corba', 'food_type': 'mercimek-corbasi', 'waste_status': 'israf-var'},
+            {'category': 'corba', 'food_type': 'mercimek-corbasi', 'waste_status': 'israf-yok'},
+            {'category': 'ek-yemek', 'food_type': 'yogurt', 'waste_status': 'bilgi-yok'},
+        ])
+        self.assertEqual(statistics['corba']['types']['mercimek-corbasi'], {'israf-var': 1, 'israf-yok': 1})
+        self.assertEqual(statistics['ek-yemek']['total'], {'israf-var': 0, 'israf-yok': 0})
+
+
+class DetectionRecordTests(SimpleTestCase):
+    def test_records_keep_box_confidences_and_timings(self):
+        from types import SimpleNamespace
+        from .persistence import build_analyzed_image, build_detection_record
+
+        image = build_analyzed_image('/tmp/ws/images/tray-01.jpg', content_hash='ab' * 32,
+                                     model_fingerprint='f' * 16, model_versions={'wisePlate': 'wisePlate.pt@1'},
+                                     timings={'decode': 0.012, 'detect': 0.25, 'width': 4000, 'height': 3000})
+        self.assertEqual(image.name, 'tray-01.jpg')
+        self.assertAlmostEqual(image.decode_ms, 12.0)
+        self.assertAlmostEqual(image.detect_ms, 250.0)
+        self.assertIsNone(image.classify_ms)
+        self.assertEqual((image.width, image.height), (4000, 3000))
+
+        detection = SimpleNamespace(index=2, category='corba', box=(10, 20, 110, 220),
+                                    detection_confidence=0.81, waste_status='israf-var',
+                                    waste_confidence=0.93, food_type='mercimek-corbasi', type_confidence=0.7)
+        record = build_detection_record(detection, image)
+        self.assertIs(record.image, image)
+        self.assertEqual((record.x_min, record.y_min, record.x_max, record.y_max), (10, 20, 110, 220))
+        self.assertEqual((record.detection_confidence, record.waste_confidence, record.type_confidence),
+                         (0.81, 0.93, 0.7))
+
+
+class ReanalysisTests(SimpleTestCase):
+    def _touch(self, path):
+        import os
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+        return path
+
+    def test_scan_uses_date_directories_and_chunks_by_date(self):
+        import os
+        import tempfile
+        from datetime import date
+        from .reanalysis import iter_chunks, scan_directory
+
+        with tempfile.TemporaryDirectory() as root:
+            for day in ('2025-03-14', '2025-03-15'):
+                for i in range(3):
+                    self._touch(os.path.join(root, day, 'lunch', f"{i}.jpg"))
+            self._touch(os.path.join(root, '2025-03-14', 'notes.txt'))
+            images = scan_directory(root)
+
+            self.assertEqual(len(images), 6)
+            self.assertEqual(images[0].analysis_date, date(2025, 3, 14))
+            self.assertEqual(images[-1].analysis_date, date(2025, 3, 15))
+            chunks = list(iter_chunks(images, chunk_size=2))
+            self.assertEqual([len(c) for c in chunks], [2, 1, 2, 1])
+
+    def test_checkpoint_resumes_and_detects_changed_list(self):
+        import os
+        import tempfile
+        from datetime import date
+        from .reanalysis import ArchiveImage, Checkpoint, CheckpointMismatch
+
+        images = [ArchiveImage(f"/archive/{i}.jpg", date(2025, 3, 14)) for i in range(5)]
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'ckpt.json')
+            Checkpoint(path, '/archive').advance(images[:3], analyses=7, elapsed=1.5)
+
+            resumed = Checkpoint(path, '/archive').load(images)
+            self.assertEqual((resumed.completed, resumed.analyses), (3, 7))
+            with self.assertRaises(CheckpointMismatch):
+                Checkpoint(path, '/archive').load(images[1:])
+            with self.assertRaises(CheckpointMismatch):
+                Checkpoint(path, '/other').load(images)
+
+    def test_reanalyze_bypasses_result_cache(self):
+        import os
+        import tempfile
+        from datetime import date
+        from unittest import mock
+        from .reanalysis import ArchiveImage, Checkpoint, reanalyze
+
+        images = [ArchiveImage(f"/archive/{i}.jpg", date(2025, 3, 14)) for i in range(3)]
+        with tempfile.TemporaryDirectory() as root:
+            checkpoint = Checkpoint(os.path.join(root, 'ckpt.json'), '/archive')
+            with mock.patch('core.processor.process_images', return_value=[]) as process_images:
+                self.assertEqual(reanalyze(images, {}, None, checkpoint, chunk_size=2), (3, 0))
+        self.assertEqual(process_images.call_count, 2)
+        self.assertTrue(all(call.kwargs['use_cache'] is False for call in process_images.call_args_list))
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        from .metrics import Histogram
+
+        histogram = Histogram('wise_test_seconds', 'Test.', labelnames=('stage',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage='detect')
+        lines = histogram.render(histogram.snapshot())
+        self.assertEqual(lines, [
+            'wise_test_seconds_bucket{stage="detect",le="0.1"} 2',
+            'wise_test_seconds_bucket{stage="detect",le="1"} 3',
+            'wise_test_seconds_bucket{stage="detect",le="+Inf"} 4',
+            'wise_test_seconds_sum{stage="detect"} 3.65',
+            'wise_test_seconds_count{stage="detect"} 4',
+        ])
+
+    def test_render_merges_other_process_snapshots(self):
+        import json
+        import os
+        import tempfile
+        from unittest import mock
+        from . import metrics
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, '999999.json'), 'w') as f:
+                json.dump({'wise_images_total': [[['model'], 5]]}, f)
+            with mock.patch.object(metrics.config, 'METRICS_DIR', directory), \
+                    mock.patch.object(metrics.IMAGES, '_values', {('model',): 2}):
+                text = metrics.render()
+        self.assertIn('wise_images_total{source="model"} 7\n', text)
+        self.assertIn('# TYPE wise_stage_seconds histogram\n', text)
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class BenchmarkStubTests(SimpleTestCase):
+    def test_synthetic_images_are_reproducible_and_detected(self):
+        import os
+        import tempfile
+        from .benchmark import generate_dataset, make_plate_image, stub_models
+        from .processor import classify_detections, detect_foods
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as root:
+            first = generate_dataset(os.path.join(root, 'a'), 2, width=320, height=240, seed=3)
+            second = generate_dataset(os.path.join(root, 'b'), 2, width=320, height=240, seed=3)
+            for a, b in zip(first, second):
+                with open(a, 'rb') as fa, open(b, 'rb') as fb:
+                    self.assertEqual(fa.read(), fb.read())
+
+            _, present = make_plate_image(np.random.default_rng(3), width=320, height=240)
+            models = stub_models(width=4, imgsz=160)
+            detections = detect_foods(first[0], models)
+            self.assertEqual(sorted(d.category for d in detections), sorted(present))
+            # Kırpımlar çözülen görsele bağlı view değil, kendi kopyaları
+            self.assertTrue(all(d.crop.base is None for d in detections))
+
+            classified = classify_detections(detections, models)
+            self.assertEqual(len(classified), len(detections))
+            self.assertTrue(all(d.food_type != 'bilgi-yok' for d in classified))
+
+    def test_percentiles_interpolate(self):
+        from .benchmark import percentiles
+
+        self.assertEqual(percentiles([1, 2, 3, 4, 5], points=(50, 100)), {'p50': 3, 'p100': 5})
+        self.assertEqual(percentiles([], points=(50,)), {'p50': None})
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class BatchedClassificationTests(SimpleTestCase):
+    def _detections(self, count=10):
+        import numpy as np
+        from .processor import Detection
+
+        rng = np.random.default_rng(11)
+        categories = ('corba', 'ana-yemek', 'yan-yemek', 'ek-yemek')
+        return [Detection(image_path=f"{i}.jpg", base_filename=str(i), index=i,
+                          category=categories[i % len(categories)], detection_confidence=0.9,
+                          crop=rng.integers(0, 256, size=(60 + 7 * i, 90 + 3 * i, 3), dtype=np.uint8))
+                for i in range(count)]
+
+    def _per_crop(self, detections, models):
+        """Eski yol: her kırpım için ayrı ön işleme ve ayrı forward pass."""
+        import torch
+        from .config import FOOD_TYPES, TYPE_MODEL_MAPPING, WASTE_MODEL_MAPPING
+        from .preprocess import preprocess_batch
+
+        results = []
+        for detection in detections:
+            tensor = preprocess_batch([detection.crop])
+            with torch.no_grad():
+                waste = torch.softmax(models[WASTE_MODEL_MAPPING[detection.category]](tensor)[0], dim=0)
+                kind = torch.softmax(models[TYPE_MODEL_MAPPING[detection.category]](tensor)[0], dim=0)
+            waste_confidence, waste_class = torch.max(waste, 0)
+            type_confidence, type_class = torch.max(kind, 0)
+            results.append(("israf-yok" if waste_class.item() == 1 else "israf-var", waste_confidence.item(),
+                            FOOD_TYPES[detection.category][type_class.item()], type_confidence.item()))
+        return results
+
+    @staticmethod
+    def _results(detections):
+        return [(d.waste_status, d.waste_confidence, d.food_type, d.type_confidence) for d in detections]
+
+    def _assert_same(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertEqual((got[0], got[2]), (want[0], want[2]))
+            self.assertAlmostEqual(got[1], want[1], places=5)
+            self.assertAlmostEqual(got[3], want[3], places=5)
+
+    def test_batched_matches_per_crop(self):
+        from .benchmark import stub_models
+        from .processor import classify_detections
+
+        models = stub_models(width=4)
+        models.pop('wisePlate')
+        expected = self._per_crop(self._detections(), models)
+        for batch_size in (1, 3, 64):
+            classified = classify_detections(self._detections(), models, batch_size=batch_size)
+            self._assert_same(self._results(classified), expected)
+
+    def test_failed_batch_falls_back_to_single_crops(self):
+        from .benchmark import stub_models
+        from .processor import classify_detections
+
+        models = stub_models(width=4)
+        models.pop('wisePlate')
+        expected = self._per_crop(self._detections(), models)
+        soup = models['wiseSoup']
+
+        def single_only(batch):
+            if len(batch) > 1:
+                raise RuntimeError('out of memory')
+            return soup(batch)
+
+        models['wiseSoup'] = single_only
+        classified = classify_detections(self._detections(), models, batch_size=64)
+        self._assert_same(self._results(classified), expected)
+
+        def broken(batch):
+            raise RuntimeError('broken model')
+
+        models['wiseSoup'] = broken
+        classified = classify_detections(self._detections(), models, batch_size=64)
+        # Çorba kırpımları düşer, diğerleri etkilenmez
+        self.assertEqual([d.index for d in classified], [i for i in range(10) if i % 4])
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class ParallelDetectionTests(SimpleTestCase):
+    def test_thread_mode_matches_serial_order_and_results(self):
+        import os
+        import tempfile
+        from .benchmark import generate_dataset, stub_models
+        from .parallel import iter_detections
+
+        models = stub_models(width=4, imgsz=160)
+        with tempfile.TemporaryDirectory() as root:
+            image_paths = generate_dataset(os.path.join(root, 'images'), 6, width=320, height=240, seed=9)
+            broken = os.path.join(root, 'images', 'broken.jpg')
+            with open(broken, 'wb') as f:
+                f.write(b'not an image')
+            image_paths.insert(2, broken)
+
+            def run(workers):
+                return [(path, [(d.category, d.index, d.box) for d in detections], 'error' in timings)
+                        for path, detections, timings in iter_detections(image_paths, models, workers=workers,
+                                                                         mode='thread')]
+
+            serial = run(1)
+            self.assertEqual([path for path, _, _ in serial], image_paths)
+            self.assertEqual([failed for _, _, failed in serial], [path == broken for path in image_paths])
+            self.assertTrue(any(found for _, found, _ in serial))
+            self.assertEqual(run(3), serial)
+
+    def test_process_mode_refuses_detectors_outside_the_registry(self):
+        import tempfile
+        from pathlib import Path
+        from unittest import mock
+        from .benchmark import stub_models
+        from .model_registry import ModelRegistry
+        from .parallel import detector_source, iter_detections
+
+        def loader(path):
+            return object()
+
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / 'wisePlate.pt'
+            path.touch()
+            with mock.patch('core.backends.load_model_file', loader):
+                registry = ModelRegistry(model_paths={'wisePlate': path}, loader=loader, hot_reload=False)
+            with mock.patch('core.model_registry.get_registry', return_value=registry), \
+                    mock.patch('core.backends.load_model_file', loader), \
+                    mock.patch('core.parallel.get_process_pool') as get_process_pool:
+                stubs = stub_models(width=4, imgsz=160)
+                self.assertIsNone(detector_source(stubs))
+                with self.assertRaises(ValueError):
+                    list(iter_detections([str(path)], stubs, workers=2, mode='process'))
+                get_process_pool.assert_not_called()
+
+                detector = registry.get('wisePlate')
+                source = detector_source({'wisePlate': detector})
+                self.assertEqual(source[0], str(path))
+                self.assertEqual(source, detector_source(registry.models()))
+                # Hot reload sonrası eski model kabul edilmez
+                registry._entries['wisePlate']['model'] = object()
+                self.assertIsNone(detector_source({'wisePlate': detector}))
+            # Registry'nin loader'ı süreçlerin kullandığı loader değilse
+            self.assertIsNone(detector_source(registry.models()))
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class PipelineEndToEndTests(TestCase):
+    def test_process_directory_runs_end_to_end_with_stub_models(self):
+        import os
+        import tempfile
+        from datetime import date
+        from django.contrib.auth.models import User
+        from .benchmark import generate_dataset, stub_models
+        from .models import AnalyzedImage, DetectionRecord, FoodAnalysis
+        from .processor import process_directory
+
+        user = User.objects.create_user('bench', password='bench-pass')
+        reported = []
+        with tempfile.TemporaryDirectory() as root:
+            image_dir = os.path.join(root, 'images')
+            generate_dataset(image_dir, 3, width=320, height=240, seed=5)
+            analyses = process_directory(
+                image_dir, stub_models(width=4, imgsz=160),
+                analysis_date=date(2026, 1, 2), user=user, save_images=False, workers=2, mode='thread',
+                batch_size=4, use_cache=False, result_callback=lambda path, found: reported.append(path))
+
+        # Sonuçlar paralel tespitte de girdi sırasıyla bildirilir
+        self.assertEqual(reported, sorted(reported))
+        self.assertEqual(len(reported), 3)
+        self.assertTrue(analyses)
+        self.assertEqual(FoodAnalysis.objects.filter(user=user).count(), len(analyses))
+        self.assertEqual(AnalyzedImage.objects.filter(user=user).count(), 3)
+        self.assertEqual(DetectionRecord.objects.filter(image__user=user).count(), len(analyses))
+
+
+class ModelPoolTests(SimpleTestCase):
+    class FakeModel:
+        def __init__(self, path):
+            self.path = path
+
+        def memory_bytes(self):
+            return 100
+
+    def _registry(self, root, **kwargs):
+        from pathlib import Path
+        from .model_registry import ModelRegistry
+
+        paths = {}
+        for name in ('wisePlate', 'wiseSoup', 'wiseMainCls'):
+            paths[name] = Path(root) / f"{name}.pt"
+            paths[name].touch()
+        paths['wiseSideCls'] = Path(root) / 'missing.pt'
+        return ModelRegistry(model_paths=paths, loader=self.FakeModel, hot_reload=False, **kwargs)
+
+    def test_lazy_models_load_on_first_access(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as root:
+            registry = self._registry(root, lazy=True, memory_budget=0)
+            models = registry.models()
+            self.assertIn('wiseSoup', models)
+            self.assertNotIn('wiseSideCls', models)
+            self.assertEqual(registry.stats()['loaded'], 0)
+
+            models['wiseSoup']
+            self.assertEqual((registry.stats()['loaded'], registry.loads), (1, 1))
+            with self.assertRaises(KeyError):
+                models['wiseSideCls']
+
+    def test_budget_evicts_least_recently_used_classifier(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as root:
+            registry = self._registry(root, lazy=True, memory_budget=250)
+            models = registry.models()
+            models['wisePlate']
+            models['wiseSoup']
+            models['wiseMainCls']
+            stats = registry.stats()
+            self.assertEqual((stats['loaded'], stats['evictions']), (2, 1))
+            self.assertEqual({m['name'] for m in registry.describe() if m['loaded']}, {'wisePlate', 'wiseMainCls'})
+
+            # Çıkarılan model tekrar gerektiğinde yeniden yüklenir
+            models['wiseSoup']
+            self.assertEqual(registry.loads, 4)
+            self.assertIn('wisePlate', {m['name'] for m in registry.describe() if m['loaded']})
+
+    def test_changed_model_file_is_reloaded(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as root:
+            registry = self._registry(root, lazy=True, memory_budget=0)
+            registry.hot_reload, registry.check_interval = True, 0
+            first = registry.get('wiseSoup')
+            self.assertIs(registry.get('wiseSoup'), first)
+
+            path = registry.model_paths['wiseSoup']
+            os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+            second = registry.get('wiseSoup')
+            self.assertIsNot(second, first)
+            self.assertEqual(registry.loads, 2)
+            self.assertEqual(registry.reload_changed(), [])
+
+    def test_describe_reports_loaded_and_missing_models(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as root:
+            registry = self._registry(root, lazy=True, memory_budget=0)
+            registry.get('wiseSoup')
+            registry.get('wiseSoup')
+            report = {entry['name']: entry for entry in registry.describe()}
+
+        self.assertEqual(set(report), {'wisePlate', 'wiseSoup', 'wiseMainCls', 'wiseSideCls'})
+        soup = report['wiseSoup']
+        self.assertEqual((soup['loaded'], soup['memory_bytes'], soup['uses'], soup['backend']),
+                         (True, 100, 2, registry.backend))
+        self.assertIsNotNone(soup['load_seconds'])
+        self.assertEqual((report['wiseSideCls']['loaded'], report['wiseSideCls']['memory_bytes']), (False, None))
+
+
+class StartupTests(SimpleTestCase):
+    def test_local_yolov5_dir_requires_hubconf(self):
+        import tempfile
+        from pathlib import Path
+        from unittest import mock
+        from . import config
+        from .model_loader import get_yolov5_dir
+
+        with tempfile.TemporaryDirectory() as root:
+            with mock.patch.object(config, 'YOLOV5_DIR', root):
+                self.assertIsNone(get_yolov5_dir())
+                (Path(root) / 'hubconf.py').touch()
+                self.assertEqual(get_yolov5_dir(), Path(root))
+
+    @skipUnless(HAS_VISION, "torch gerekli")
+    def test_prepare_worker_warms_up_loaded_models(self):
+        import tempfile
+        from pathlib import Path
+        import torch
+        from .model_registry import ModelRegistry
+        from .startup import prepare_worker
+
+        def loader(path):
+            if path.stem == 'wiseSoup':
+                return torch.nn.Sequential(torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 2))
+            # Yanlış giriş boyutu: ısınma hatası raporlanmalı, açılış durmamalı
+            return torch.nn.Linear(5, 2)
+
+        with tempfile.TemporaryDirectory() as root:
+            paths = {name: Path(root) / f"{name}.pt" for name in ('wiseSoup', 'wiseMainCls')}
+            for path in paths.values():
+                path.touch()
+            registry = ModelRegistry(model_paths=paths, loader=loader, hot_reload=False, lazy=True, memory_budget=0)
+            report = prepare_worker(registry=registry, warmup=True, top=0)
+
+        self.assertEqual(set(report['models']), {'wiseSoup', 'wiseMainCls'})
+        self.assertIsNotNone(report['models']['wiseSoup']['warmup_seconds'])
+        self.assertIn('wiseMainCls', report['errors'])
+        self.assertGreaterEqual(report['total_seconds'], report['load_seconds'])
+
+    def test_preload_runs_at_server_start_not_app_setup(self):
+        from unittest import mock
+        from django.apps import apps
+        from . import config
+        from .startup import prepare_server
+
+        with mock.patch.object(config, 'PRELOAD_MODELS', True), \
+                mock.patch('core.startup.prepare_worker', return_value={'models': {}}) as prepare_worker:
+            apps.get_app_config('core').ready()
+            prepare_worker.assert_not_called()
+            self.assertEqual(prepare_server(), {'models': {}})
+            prepare_worker.assert_called_once_with()
+        with mock.patch.object(config, 'PRELOAD_MODELS', False), \
+                mock.patch('core.startup.prepare_worker') as prepare_worker:
+            self.assertIsNone(prepare_server())
+            prepare_worker.assert_not_called()
+
+
+@skipUnless(HAS_VISION, "numpy/cv2 gerekli")
+class TiledDetectionTests(SimpleTestCase):
+    class SquareDetector:
+        """Görseldeki beyaz bölgenin kutusunu döner (sınıf 2)."""
+        names = {0: 'corba', 1: 'ana-yemek', 2: 'yan-yemek', 3: 'ek-yemek'}
+
+        def __init__(self):
+            self.calls = []
+
+        def __call__(self, img):
+            from types import SimpleNamespace
+            import numpy as np
+            import torch
+
+            self.calls.append(img.shape[:2])
+            ys, xs = np.nonzero(img[:, :, 0] > 127)
+            rows = []
+            if len(xs):
+                x0, x1, y0, y1 = xs.min(), xs.max() + 1, ys.min(), ys.max() + 1
+                rows.append([(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0, 0.9, 2])
+            return SimpleNamespace(xywh=[torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)], names=self.names)
+
+    def _image(self):
+        import numpy as np
+
+        img = np.zeros((3000, 4000, 3), dtype=np.uint8)
+        img[2000:2080, 3000:3100] = 255
+        return img
+
+    def test_downscaled_detection_maps_boxes_to_full_resolution(self):
+        from .tiling import detect_boxes
+
+        detector = self.SquareDetector()
+        boxes, names = detect_boxes(self._image(), detector, max_side=1000, tile_threshold=0)
+        self.assertEqual(detector.calls, [(750, 1000)])
+        self.assertEqual(len(boxes), 1)
+        cx, cy, w, h, conf, cls = boxes[0]
+        self.assertAlmostEqual(cx, 3050, delta=4)
+        self.assertAlmostEqual(cy, 2040, delta=4)
+        self.assertAlmostEqual(w, 100, delta=8)
+        self.assertEqual(names[int(cls)], 'yan-yemek')
+
+    def test_tiles_cover_image_and_merge_duplicates(self):
+        from .tiling import detect_boxes, tile_grid
+
+        tiles = tile_grid(3000, 4000, 1500, 0.2)
+        self.assertEqual(max(x1 for _, _, x1, _ in tiles), 4000)
+        self.assertEqual(max(y1 for _, _, _, y1 in tiles), 3000)
+
+        detector = self.SquareDetector()
+        boxes, _ = detect_boxes(self._image(), detector, max_side=1000, tile_threshold=2000,
+                                tile_size=1500, overlap=0.2)
+        self.assertEqual(len(detector.calls), 1 + len(tiles))
+        self.assertEqual(len(boxes), 1)
+
+    def test_merge_drops_boxes_cut_at_tile_edges(self):
+        import numpy as np
+        from .tiling import merge_boxes
+
+        boxes = np.array([
+            [0, 0, 100, 100, 0.9, 1],
+            [50, 0, 100, 100, 0.95, 1],   # kesik kutu, büyük kutunun içinde
+            [0, 0, 100, 100, 0.8, 2],     # başka sınıf
+        ], dtype=np.float64)
+        merged = merge_boxes(boxes, iou_threshold=0.5)
+        self.assertEqual(merged[:, 5].tolist(), [1, 2])
+        # Kesik kutu onu içine alan kutunun sınırlarını, kendi güvenini taşır
+        self.assertEqual(merged[0].tolist(), [0, 0, 100, 100, 0.95, 1])
+
+
+class ImageIOTests(SimpleTestCase):
+    def test_reduction_factor_keeps_long_side_above_target(self):
+        from .image_io import reduction_factor
+
+        self.assertEqual(reduction_factor(4000, 3000, 1600), 2)
+        self.assertEqual(reduction_factor(4000, 3000, 500), 8)
+        self.assertEqual(reduction_factor(1280, 960, 1600), 1)
+        self.assertEqual(reduction_factor(4000, 3000, 0), 1)
+
+    @skipUnless(HAS_VISION, "numpy/cv2 gerekli")
+    def test_reduced_decode_reports_original_geometry(self):
+        import os
+        import tempfile
+        import cv2
+        import numpy as np
+        from .image_io import decode_image, jpeg_size, prefetch, read_file
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'plate.jpg')
+            cv2.imwrite(path, np.full((960, 1280, 3), 128, dtype=np.uint8))
+            broken = os.path.join(root, 'broken.jpg')
+            with open(broken, 'wb') as f:
+                f.write(b'not an image')
+
+            self.assertEqual(jpeg_size(read_file(path)), (1280, 960))
+            decoded = decode_image(path, max_side=600)
+            self.assertEqual(decoded.image.shape[:2], (480, 640))
+            self.assertEqual((decoded.width, decoded.height, decoded.scale), (1280, 960, 0.5))
+            self.assertEqual(decode_image(path, max_side=0).image.shape[:2], (960, 1280))
+
+            results = list(prefetch([path, broken, path], depth=2, max_side=0))
+            self.assertEqual([p for p, _ in results], [path, broken, path])
+            self.assertIsNone(results[1][1])
+            self.assertEqual(results[2][1].image.shape[:2], (960, 1280))
+
+
+@skipUnless(HAS_VISION, "numpy/cv2 gerekli")
+class CropStoreTests(SimpleTestCase):
+    def test_identical_crops_are_stored_once(self):
+        import tempfile
+        import numpy as np
+        from .crop_store import CropStore
+
+        with tempfile.TemporaryDirectory() as root:
+            store = CropStore(root=root, thumbnail_size=32)
+            crop = np.random.default_rng(0).integers(0, 255, (120, 80, 3), dtype=np.uint8)
+            key = store.key(crop)
+            self.assertEqual(key, store.key(crop.copy()))
+            self.assertNotEqual(key, store.key(crop[:, :40]))
+            self.assertEqual(store.path(key).relative_to(root).parts,
+                             ('crops', key[:2], key[2:4], f"{key}.jpg"))
+
+            self.assertTrue(store.write(key, crop))
+            self.assertFalse(store.write(key, crop))
+            self.assertEqual(store.open(key), store.path(key))
+            self.assertIsNotNone(store.open(key, thumbnail=True))
+            self.assertIsNone(store.open('../' + key[3:]))
+
+    def test_sink_batches_and_deduplicates_writes(self):
+        import tempfile
+        import numpy as np
+        from .crop_store import CropStore
+        from .output_sink import ImageSink
+
+        with tempfile.TemporaryDirectory() as root:
+            store = CropStore(root=root, thumbnail_size=0)
+            crops = [np.full((20, 20, 3), value, dtype=np.uint8) for value in (10, 20, 30, 10)]
+            with ImageSink(store=store, max_workers=1, batch_size=2) as sink:
+                keys = [sink.submit(crop) for crop in crops]
+            self.assertEqual(keys[0], keys[3])
+            self.assertEqual((sink.written, sink.deduplicated, sink.failed), (3, 1, 0))
+            self.assertTrue(all(store.exists(key) for key in keys))
+            self.assertEqual(sorted(c.hash for c in sink.stored_crops()), sorted(set(keys)))
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.user = User.objects.create_user('queue', password='queue-pass')
+
+    def _job(self, **fields):
+        import uuid
+        from .models import ProcessingJob
+
+        return ProcessingJob.objects.create(id=uuid.uuid4(), user=self.user, workspace='unused', **fields)
+
+    def test_claim_next_job_takes_oldest_pending_job_once(self):
+        from .jobs import claim_next_job
+        from .models import ProcessingJob
+
+        first = self._job()
+        second = self._job()
+        self._job(status=ProcessingJob.STATUS_DONE)
+
+        claimed = claim_next_job('worker-a')
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.worker), (ProcessingJob.STATUS_RUNNING, 'worker-a'))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(claim_next_job('worker-b').id, second.id)
+        self.assertIsNone(claim_next_job('worker-c'))
+
+    def test_requeue_stale_jobs_only_resets_old_running_jobs(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .jobs import requeue_stale_jobs
+        from .models import ProcessingJob
+
+        now = timezone.now()
+        stale = self._job(status=ProcessingJob.STATUS_RUNNING, worker='dead', processed_images=3,
+                          started_at=now - timedelta(hours=2))
+        fresh = self._job(status=ProcessingJob.STATUS_RUNNING, worker='alive', started_at=now)
+
+        self.assertEqual(requeue_stale_jobs(max_age_seconds=3600), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, stale.worker, stale.processed_images),
+                         (ProcessingJob.STATUS_PENDING, '', 0))
+        self.assertEqual(fresh.status, ProcessingJob.STATUS_RUNNING)
+
+    def test_job_fails_and_removes_images_when_no_models_load(self):
+        import os
+        import tempfile
+        from unittest import mock
+        from .jobs import run_job
+        from .models import ProcessingJob
+        from .workspace import create_workspace
+
+        with tempfile.TemporaryDirectory() as root:
+            workspace = create_workspace(root=root)
+            image_path = os.path.join(workspace.images_dir, 'a.jpg')
+            with open(image_path, 'wb') as f:
+                f.write(b'jpeg')
+            job = self._job(status=ProcessingJob.STATUS_RUNNING, image_paths=[image_path], total_images=1)
+            job.workspace = workspace.root
+            with mock.patch('core.model_registry.get_registry') as get_registry:
+                get_registry.return_value.models.return_value = {}
+                self.assertFalse(run_job(job))
+            self.assertFalse(os.path.exists(image_path))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProcessingJob.STATUS_FAILED)
+        self.assertIn('No models were loaded', job.error)
+        self.assertIsNone(job.statistics)
+
+    def test_sync_upload_reports_missing_models(self):
+        import os
+        import tempfile
+        from unittest import mock
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from rest_framework.test import APIClient
+        from . import config
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with tempfile.TemporaryDirectory() as root, \
+                mock.patch.object(config, 'WORKSPACE_ROOT', root), \
+                mock.patch('core.model_registry.get_registry') as get_registry:
+            get_registry.return_value.models.return_value = {}
+            response = client.post('/api/food/upload/', {'images': [SimpleUploadedFile('a.jpg', b'jpeg')]},
+                                   format='multipart')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual([name for _, _, files in os.walk(root) for name in files], [])
+
+    def test_worker_loop_requeues_stale_jobs_while_running(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from .jobs import worker_loop
+        from .models import ProcessingJob
+
+        stale = self._job(status=ProcessingJob.STATUS_RUNNING, worker='dead',
+                          started_at=timezone.now() - timedelta(hours=2))
+        with mock.patch('core.startup.prepare_worker'), \
+                mock.patch('core.jobs.cleanup_expired_workspaces'), \
+                mock.patch('core.streaming.expire_idle_sessions'), \
+                mock.patch('core.jobs.metrics.flush'), \
+                mock.patch('core.jobs.run_job') as run_job:
+            self.assertEqual(worker_loop(poll_interval=0, stop_after=1), 1)
+        self.assertEqual(run_job.call_args[0][0].id, stale.id)
+
+    def test_async_upload_returns_job_and_status_endpoint_reports_it(self):
+        import os
+        import tempfile
+        from unittest import mock
+        from django.contrib.auth.models import User
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from rest_framework.test import APIClient
+        from . import config
+        from .models import ProcessingJob
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with tempfile.TemporaryDirectory() as root, \
+                mock.patch.object(config, 'ASYNC_UPLOADS', True), \
+                mock.patch.object(config, 'WORKSPACE_ROOT', root):
+            response = client.post('/api/food/upload/', {
+                'images': [SimpleUploadedFile('a.jpg', b'jpeg'), SimpleUploadedFile('b.jpg', b'jpeg')],
+                'date': '2026-03-04',
+            }, format='multipart')
+            self.assertEqual(response.status_code, 202)
+            job = ProcessingJob.objects.get(id=response.data['job_id'])
+            self.assertEqual(job.total_images, 2)
+            self.assertTrue(all(os.path.exists(path) for path in job.image_paths))
+
+        status = client.get(f"/api/food/jobs/{job.id}/")
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual((status.data['status'], status.data['completed'], status.data['progress']),
+                         (ProcessingJob.STATUS_PENDING, False, 0.0))
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other', password='other-pass'))
+        self.assertEqual(other.get(f"/api/food/jobs/{job.id}/").status_code, 404)
+
+
+class WorkspaceCleanupTests(TestCase):
+    def test_expired_workspaces_of_unfinished_jobs_are_kept(self):
+        import os
+        import tempfile
+        import uuid
+        from django.contrib.auth.models import User
+        from .models import ProcessingJob
+        from .workspace import cleanup_expired_workspaces, create_workspace
+
+        user = User.objects.create_user('cleanup', password='cleanup-pass')
+        with tempfile.TemporaryDirectory() as root:
+            workspaces = {}
+            for status in (ProcessingJob.STATUS_PENDING, ProcessingJob.STATUS_RUNNING,
+                           ProcessingJob.STATUS_DONE):
+                job_id = uuid.uuid4()
+                workspaces[status] = create_workspace(job_id, root=root)
+                ProcessingJob.objects.create(id=job_id, user=user, status=status,
+                                             workspace=workspaces[status].root)
+            orphan = create_workspace(root=root)
+            for workspace in (*workspaces.values(), orphan):
+                os.utime(workspace.root, (0, 0))
+
+            self.assertEqual(cleanup_expired_workspaces(ttl_seconds=60, root=root), 2)
+            self.assertTrue(os.path.isdir(workspaces[ProcessingJob.STATUS_PENDING].images_dir))
+            self.assertTrue(os.path.isdir(workspaces[ProcessingJob.STATUS_RUNNING].images_dir))
+            self.assertFalse(os.path.exists(workspaces[ProcessingJob.STATUS_DONE].root))
+            self.assertFalse(os.path.exists(orphan.root))
+
+
+class StreamingSessionTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from unittest import mock
+        from django.contrib.auth.models import User
+        from . import config
+
+        self.user = User.objects.create_user('stream', password='stream-pass')
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        for name, value in (('ASYNC_UPLOADS', True), ('WORKSPACE_ROOT', root.name)):
+            patcher = mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _process(images, models, job):
+        # Modelsiz işleme: her görsel tek sonuçla tamamlanır
+        from django.db.models import F
+        from .models import ProcessingJob, UploadedImage
+
+        UploadedImage.objects.filter(id__in=[image.id for image in images]).update(
+            status=UploadedImage.STATUS_DONE,
+            foods=[{'category': 'corba', 'food_type': 'mercimek-corbasi', 'waste_status': 'israf-yok'}])
+        ProcessingJob.objects.filter(id=job.id).update(processed_images=F('processed_images') + len(images))
+
+    def _upload(self, job, name='plate.jpg'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .streaming import add_image
+
+        return add_image(job, SimpleUploadedFile(name, b'jpeg'))
+
+    def test_idle_session_releases_worker_until_images_arrive(self):
+        from datetime import date
+        from unittest import mock
+        from .jobs import claim_next_job
+        from .models import ProcessingJob
+        from .streaming import close_session, open_session, run_streaming_job
+
+        job = open_session(self.user, date(2026, 5, 6))
+        self.assertEqual(job.status, ProcessingJob.STATUS_IDLE)
+        self.assertIsNone(claim_next_job('worker'))
+
+        with mock.patch('core.streaming.process_session_images', side_effect=self._process):
+            self._upload(job)
+            claimed = claim_next_job('worker')
+            self.assertEqual(claimed.id, job.id)
+            self.assertIsNone(run_streaming_job(claimed, {}))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.worker, job.processed_images), (ProcessingJob.STATUS_IDLE, '', 1))
+            self.assertIsNone(claim_next_job('worker'))
+
+            self._upload(job, 'second.jpg')
+            self.assertTrue(close_session(job))
+            statistics = run_streaming_job(claim_next_job('worker'), {})
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_images, job.total_images), (ProcessingJob.STATUS_DONE, 2, 2))
+        self.assertEqual(statistics['corba']['types']['mercimek-corbasi']['israf-yok'], 2)
+
+    def test_image_added_while_releasing_requeues_the_session(self):
+        from datetime import date
+        from unittest import mock
+        from .jobs import claim_next_job
+        from .models import ProcessingJob
+        from .streaming import open_session, run_streaming_job
+
+        job = open_session(self.user, date(2026, 5, 6))
+        self._upload(job)
+        claimed = claim_next_job('worker')
+        refresh = claimed.refresh_from_db
+        late = []
+
+        def refresh_after_upload(*args, **kwargs):
+            # Bekleyen görsel kalmadığı görüldükten sonra, iş hâlâ 'running'
+            # iken gelen görsel: add_image oturumu uyandıramaz
+            if not late:
+                late.append(self._upload(job, 'late.jpg'))
+            return refresh(*args, **kwargs)
+
+        claimed.refresh_from_db = refresh_after_upload
+        with mock.patch('core.streaming.process_session_images', side_effect=self._process):
+            self.assertIsNone(run_streaming_job(claimed, {}))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_images, job.total_images), (ProcessingJob.STATUS_PENDING, 1, 2))
+        self.assertEqual(claim_next_job('worker').id, job.id)
+
+    def test_expire_idle_sessions_closes_and_queues_old_sessions(self):
+        from datetime import date, timedelta
+        from django.utils import timezone
+        from .models import ProcessingJob
+        from .streaming import expire_idle_sessions, open_session
+
+        old = open_session(self.user, date(2026, 5, 6))
+        fresh = open_session(self.user, date(2026, 5, 6))
+        ProcessingJob.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(expire_idle_sessions(idle_timeout=60), 1)
+        old.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((old.accepting_images, old.status), (False, ProcessingJob.STATUS_PENDING))
+        self.assertEqual((fresh.accepting_images, fresh.status), (True, ProcessingJob.STATUS_IDLE))
+
+    def test_session_events_keep_order_and_resume_after_id(self):
+        from datetime import date
+        from django.utils import timezone
+        from .models import ProcessingJob, UploadedImage
+        from .streaming import iter_session_events, open_session
+
+        job = open_session(self.user, date(2026, 5, 6))
+        first, second, third = (self._upload(job, f"{i}.jpg") for i in range(3))
+        UploadedImage.objects.filter(id__in=[first.id, third.id]).update(status=UploadedImage.STATUS_DONE)
+
+        events = list(iter_session_events(job, poll_interval=0, timeout=0, heartbeat=3600))
+        # Bekleyen ikinci görselden sonrası gönderilmez
+        self.assertEqual([e['event'] for e in events], ['image', 'timeout'])
+        self.assertEqual((events[0]['id'], events[1]['after']), (first.id, first.id))
+
+        UploadedImage.objects.filter(id=second.id).update(status=UploadedImage.STATUS_FAILED, error='boom')
+        ProcessingJob.objects.filter(id=job.id).update(status=ProcessingJob.STATUS_DONE, processed_images=3,
+                                                       finished_at=timezone.now())
+        events = list(iter_session_events(job, after=first.id, poll_interval=0, timeout=0))
+        self.assertEqual([(e['event'], e.get('id')) for e in events],
+                         [('image', second.id), ('image', third.id), ('done', None)])
+        self.assertEqual((events[0]['status'], events[0]['error']), (UploadedImage.STATUS_FAILED, 'boom'))
+        self.assertEqual(events[-1]['processed_images'], 3)
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class ProcessDetectionCropTests(TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        from django.contrib.auth.models import User
+        from .benchmark import generate_dataset, stub_models
+
+        self.user = User.objects.create_user('crops', password='crops-pass')
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        self.images = generate_dataset(os.path.join(self.root, 'images'), 2, width=320, height=240, seed=7)
+        self.models = stub_models(width=4, imgsz=160)
+
+    def _run(self, sink):
+        from .processor import process_detection
+
+        with sink:
+            for image_path in self.images:
+                process_detection(image_path, self.models, user=self.user, sink=sink)
+
+    def test_shared_sink_saves_each_call_crops_after_writing(self):
+        from .crop_store import CropStore
+        from .models import FoodAnalysis, StoredCrop
+        from .output_sink import ImageSink
+
+        store = CropStore(root=self.root, thumbnail_size=0)
+        self._run(ImageSink(store=store, max_workers=1, batch_size=64))
+
+        keys = set(FoodAnalysis.objects.filter(user=self.user).values_list('crop_id', flat=True))
+        self.assertTrue(keys)
+        self.assertNotIn(None, keys)
+        self.assertEqual(set(StoredCrop.objects.values_list('hash', flat=True)), keys)
+        self.assertTrue(all(store.exists(key) for key in keys))
+
+    def test_failed_writes_leave_no_crop_rows(self):
+        from unittest import mock
+        from .crop_store import CropStore
+        from .models import FoodAnalysis, StoredCrop
+        from .output_sink import ImageSink
+
+        store = CropStore(root=self.root, thumbnail_size=0)
+        with mock.patch.object(store, 'write', side_effect=OSError('disk full')):
+            self._run(ImageSink(store=store, max_workers=1))
+
+        self.assertTrue(FoodAnalysis.objects.filter(user=self.user).exists())
+        self.assertFalse(FoodAnalysis.objects.filter(user=self.user, crop__isnull=False).exists())
+        self.assertFalse(StoredCrop.objects.exists())
+
+
+class ResultPaginationTests(TestCase):
+    def setUp(self):
+        from datetime import date
+        from django.contrib.auth.models import User
+        from .models import FoodAnalysis
+
+        self.user = User.objects.create_user('pages', password='pages-pass')
+        other = User.objects.create_user('other-pages', password='other-pass')
+        days = [date(2026, 1, 3), date(2026, 1, 1), None, date(2026, 1, 3), None, date(2026, 1, 2)]
+        self.analyses = [FoodAnalysis.objects.create(
+            user=self.user, category='corba' if i % 2 else 'ana-yemek', food_type='x', analysis_date=day)
+            for i, day in enumerate(days)]
+        FoodAnalysis.objects.create(user=other, category='corba', food_type='x', analysis_date=date(2026, 1, 3))
+
+    def _expected(self, analyses):
+        dated = sorted((a for a in analyses if a.analysis_date), key=lambda a: (a.analysis_date, a.id), reverse=True)
+        undated = sorted((a.id for a in analyses if not a.analysis_date), reverse=True)
+        return [a.id for a in dated] + undated
+
+    def _walk(self, queryset, limit):
+        from .pagination import paginate_analyses
+
+        ids, cursor, pages = [], None, 0
+        while True:
+            rows, cursor = paginate_analyses(queryset, cursor=cursor, limit=limit)
+            ids += [row['id'] for row in rows]
+            pages += 1
+            if cursor is None:
+                return ids, pages
+
+    def test_cursor_round_trip_includes_undated_rows(self):
+        from .models import FoodAnalysis
+        from .pagination import decode_cursor, encode_cursor
+
+        self.assertEqual(decode_cursor(encode_cursor(None, 42)), (None, 42))
+        queryset = FoodAnalysis.objects.filter(user=self.user)
+        for limit in (1, 2, 4, 6, 100):
+            ids, pages = self._walk(queryset, limit)
+            self.assertEqual(ids, self._expected(self.analyses))
+            self.assertEqual(pages, max(1, -(-len(self.analyses) // limit)))
+
+    def test_filters_apply_to_pages(self):
+        from datetime import date
+        from .models import FoodAnalysis
+        from .pagination import filter_analyses
+
+        queryset = filter_analyses(FoodAnalysis.objects.filter(user=self.user), {'category': 'corba'})
+        ids, _ = self._walk(queryset, 2)
+        self.assertEqual(ids, self._expected([a for a in self.analyses if a.category == 'corba']))
+
+        queryset = filter_analyses(FoodAnalysis.objects.filter(user=self.user),
+                                   {'start': '2026-01-02', 'end': '2026-01-03'})
+        ids, _ = self._walk(queryset, 2)
+        self.assertEqual(ids, self._expected([a for a in self.analyses
+                                              if a.analysis_date and a.analysis_date >= date(2026, 1, 2)]))
+
+    def test_results_endpoint_pages_and_bounds_flat_list(self):
+        from unittest import mock
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        first = client.get('/api/food/results/', {'limit': 4, 'fields': 'category,analysis_date'})
+        self.assertEqual(len(first.data['results']), 4)
+        self.assertEqual(set(first.data['results'][0]), {'category', 'analysis_date'})
+        rest = client.get('/api/food/results/', {'cursor': first.data['next_cursor'], 'limit': 4})
+        self.assertEqual([row['analysis_date'] for row in rest.data['results']], [None, None])
+        self.assertIsNone(rest.data['next_cursor'])
+        self.assertEqual(client.get('/api/food/results/', {'cursor': 'bogus'}).status_code, 400)
+
+        self.assertEqual(len(client.get('/api/food/results/').data), 6)
+        with mock.patch('core.views.UNPAGINATED_LIMIT', 5):
+            flat = client.get('/api/food/results/')
+        self.assertEqual(len(flat.data), 5)
+        self.assertIn('X-Next-Cursor', flat)
+
+
+class SaveAnalysesTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.user = User.objects.create_user('writer', password='writer-pass')
+
+    def _analyses(self, count):
+        from datetime import date
+        from .models import FoodAnalysis
+
+        return [FoodAnalysis(user=self.user, category='corba', food_type='mercimek', waste_count=i % 2,
+                             no_waste_count=1 - i % 2, waste_ratio=0.5, analysis_date=date(2026, 2, 1))
+                for i in range(count)]
+
+    def test_writes_all_batches_and_rollups(self):
+        from .models import DailyWasteStat, FoodAnalysis
+        from .persistence import save_analyses
+
+        self.assertEqual(save_analyses(self._analyses(5), batch_size=2), 5)
+        self.assertEqual(FoodAnalysis.objects.count(), 5)
+        stat = DailyWasteStat.objects.get()
+        self.assertEqual((stat.sample_count, stat.waste_count, stat.no_waste_count), (5, 2, 3))
+
+    def test_failed_batch_rolls_back_everything(self):
+        from unittest import mock
+        from .models import DailyWasteStat, FoodAnalysis
+        from .persistence import AnalysisWriteError, save_analyses
+
+        manager = FoodAnalysis.objects
+        original = manager.bulk_create
+        calls = []
+
+        def failing_bulk_create(objects, **kwargs):
+            calls.append(len(objects))
+            if len(calls) == 2:
+                raise ValueError("disk full")
+            return original(objects, **kwargs)
+
+        with mock.patch.object(manager, 'bulk_create', side_effect=failing_bulk_create):
+            with self.assertRaises(AnalysisWriteError) as raised:
+                save_analyses(self._analyses(5), batch_size=2)
+        self.assertEqual((raised.exception.batch_index, raised.exception.batch_size), (1, 2))
+        self.assertIn('FoodAnalysis batch 1', str(raised.exception))
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+        # İlk parça yazılmıştı; transaction ile geri alınır
+        self.assertEqual(FoodAnalysis.objects.count(), 0)
+        self.assertEqual(DailyWasteStat.objects.count(), 0)
+
+    def test_rollup_failure_rolls_back_analyses(self):
+        from unittest import mock
+        from .models import FoodAnalysis
+        from .persistence import AnalysisWriteError, save_analyses
+
+        with mock.patch('core.persistence.update_daily_stats', side_effect=RuntimeError("deadlock")):
+            with self.assertRaises(AnalysisWriteError) as raised:
+                save_analyses(self._analyses(3))
+        self.assertIsNone(raised.exception.batch_index)
+        self.assertEqual(FoodAnalysis.objects.count(), 0)
+
+    def test_existing_crop_gains_thumbnail_flag(self):
+        from .models import StoredCrop
+        from .persistence import save_analyses
+
+        StoredCrop.objects.create(hash='a' * 64, width=10, height=10)
+        analyses = self._analyses(1)
+        save_analyses(analyses, crops=[StoredCrop(hash='a' * 64, width=10, height=10, thumbnail=True)])
+        self.assertTrue(StoredCrop.objects.get().thumbnail)
+        # Küçük kopyası olmayan sonraki bir yazma bayrağı kapatmaz
+        save_analyses(self._analyses(1), crops=[StoredCrop(hash='a' * 64, width=10, height=10)])
+        self.assertTrue(StoredCrop.objects.get().thumbnail)
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.user = User.objects.create_user('rollup', password='rollup-pass')
+
+    def _create(self, day, waste, category='corba', food_type='mercimek', ratio=0.5, user=None):
+        # waste=None: bilgi-yok (israf sınıflandırılamadı)
+        from .models import FoodAnalysis
+
+        return FoodAnalysis.objects.create(
+            user=user or self.user, category=category, food_type=food_type, waste_count=int(waste is True),
+            no_waste_count=int(waste is False), waste_ratio=ratio, analysis_date=day)
+
+    def _stats(self):
+        from .models import DailyWasteStat
+
+        return {(s.date, s.category, s.food_type): (s.waste_count, s.no_waste_count, s.sample_count,
+                                                    round(s.confidence_sum, 6))
+                for s in DailyWasteStat.objects.filter(user=self.user)}
+
+    def test_deltas_create_then_increment(self):
+        from datetime import date
+        from .models import DailyWasteStat
+        from .rollups import aggregate_analyses, apply_rollup_deltas, update_daily_stats
+
+        day = date(2026, 3, 1)
+        first = [self._create(day, True, ratio=0.9), self._create(day, False, ratio=0.2),
+                 self._create(None, True)]
+        totals = aggregate_analyses(first)
+        # Tarihsiz kayıt özete girmez
+        self.assertEqual(list(totals), [(self.user.id, day, 'corba', 'mercimek')])
+        apply_rollup_deltas(totals)
+        self.assertEqual(self._stats(), {(day, 'corba', 'mercimek'): (1, 1, 2, 1.1)})
+
+        update_daily_stats([self._create(day, True, ratio=0.4), self._create(day, False, category='ana-yemek'),
+                            self._create(day, None, ratio=0.0)])
+        self.assertEqual(self._stats(), {
+            (day, 'corba', 'mercimek'): (2, 1, 4, 1.5),
+            (day, 'ana-yemek', 'mercimek'): (0, 1, 1, 0.5),
+        })
+        # bilgi-yok kırpım örnek sayısına girer, güven ortalamasına girmez
+        stat = DailyWasteStat.objects.get(user=self.user, category='corba')
+        self.assertAlmostEqual(stat.mean_confidence, 0.5)
+
+    def test_backfill_matches_incremental_and_respects_range(self):
+        from datetime import date
+        from django.contrib.auth.models import User
+        from .models import DailyWasteStat
+        from .rollups import backfill_daily_stats, update_daily_stats
+
+        other = User.objects.create_user('rollup-other', password='other-pass')
+        analyses = [self._create(date(2026, 3, day), day % 2 == 0, ratio=day / 10) for day in (1, 1, 2, 3)]
+        analyses.append(self._create(date(2026, 3, 1), None, ratio=0.3))
+        analyses.append(self._create(date(2026, 3, 2), True, user=other))
+        update_daily_stats(analyses)
+        incremental = self._stats()
+        self.assertEqual(incremental[(date(2026, 3, 1), 'corba', 'mercimek')], (0, 2, 3, 0.2))
+
+        DailyWasteStat.objects.filter(user=self.user, date=date(2026, 3, 2)).update(waste_count=99)
+        deleted, created = backfill_daily_stats(user=self.user, start=date(2026, 3, 2), end=date(2026, 3, 2))
+        self.assertEqual((deleted, created), (1, 1))
+        self.assertEqual(self._stats(), incremental)
+        # Diğer kullanıcının özeti yerinde kalır
+        self.assertEqual(DailyWasteStat.objects.filter(user=other).count(), 1)
+
+        DailyWasteStat.objects.all().delete()
+        backfill_daily_stats()
+        self.assertEqual(self._stats(), incremental)
+        first_day = DailyWasteStat.objects.get(user=self.user, date=date(2026, 3, 1))
+        self.assertAlmostEqual(first_day.mean_confidence, 0.1)
+
+
+@skipUnless(HAS_VISION, "torch/cv2 gerekli")
+class QuantizationTests(SimpleTestCase):
+    def _classifier(self):
+        import torch
+
+        # Baskın renk kanalını seçen sınıflandırıcı: sınıf sınırları net, INT8
+        # yuvarlaması tahmini değiştirmemeli
+        module = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 3, 1), torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 3),
+        ).eval()
+        with torch.no_grad():
+            module[0].weight.copy_(torch.eye(3).view(3, 3, 1, 1))
+            module[0].bias.fill_(3.0)
+            module[4].weight.copy_(torch.eye(3) * 4)
+            module[4].bias.zero_()
+        return module
+
+    def _crops(self, count=24):
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        crops = []
+        for i in range(count):
+            crop = rng.integers(0, 60, (48 + i, 64, 3), dtype=np.uint8)
+            # BGR kırpım; RGB sınıfı i % 3
+            crop[..., 2 - i % 3] += 180
+            crops.append(crop)
+        return crops
+
+    def test_compare_classifiers_reports_agreement(self):
+        import torch
+        from .quantization import compare_classifiers
+
+        module = self._classifier()
+        crops = self._crops(6)
+        same = compare_classifiers(module, module, crops, batch_size=4)
+        self.assertEqual((same['crops'], same['agreement'], same['max_prob_diff']), (6, 1.0, 0.0))
+
+        flipped = compare_classifiers(module, lambda batch: -module(batch), crops)
+        self.assertEqual(flipped['agreement'], 0.0)
+        self.assertGreater(flipped['max_prob_diff'], 0.5)
+        self.assertIsNone(compare_classifiers(module, module, [])['agreement'])
+        with torch.no_grad():
+            self.assertEqual(module(torch.zeros(2, 3, 224, 224)).shape, (2, 3))
+
+    @skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                "onnxruntime gerekli")
+    def test_int8_matches_fp32(self):
+        import tempfile
+        from .backends import export_module, load_onnx, quantized_path
+        from .preprocess import preprocess_batch
+        from .quantization import compare_classifiers, quantize_classifier, split_crops
+
+        names = {0: 'kirmizi', 1: 'yesil', 2: 'mavi'}
+        calibration, crops = split_crops(self._crops(32))
+        with tempfile.TemporaryDirectory() as export_dir:
+            fp32_path, = export_module(self._classifier(), 'tiny', 'classifier', names,
+                                       export_dir, formats=('onnx',))
+            with self.assertRaises(ValueError):
+                quantize_classifier(fp32_path, quantized_path(export_dir, 'tiny'), crops=[])
+
+            for mode in ('static', 'dynamic'):
+                int8_path = quantize_classifier(fp32_path, quantized_path(export_dir, f'tiny-{mode}'),
+                                                crops=calibration, mode=mode, batch_size=8)
+                fp32, int8 = load_onnx(fp32_path), load_onnx(int8_path)
+                self.assertEqual(int8.names, names)
+                self.assertEqual(tuple(int8(preprocess_batch(crops[:5])).shape), (5, 3))
+
+                report = compare_classifiers(fp32, int8, crops, batch_size=8)
+                self.assertEqual(report['crops'], len(crops))
+                self.assertEqual(report['agreement'], 1.0, mode)
+                self.assertLess(report['max_prob_diff'], 0.1, mode)
+
+    def test_split_keeps_held_out_crops_out_of_calibration(self):
+        from .quantization import split_crops
+
+        calibration, held_out = split_crops(list(range(10)), holdout=0.25)
+        self.assertEqual(held_out, [3, 7])
+        self.assertEqual(sorted(calibration + held_out), list(range(10)))
+        self.assertEqual(split_crops([0], holdout=0.25), ([0], []))
+
+    @skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                "onnxruntime gerekli")
+    def test_command_reports_agreement_on_held_out_crops(self):
+        import io
+        import json
+        import os
+        import tempfile
+        from unittest import mock
+        import cv2
+        from django.core.management import call_command
+        from .backends import export_module
+
+        with tempfile.TemporaryDirectory() as root:
+            export_dir = os.path.join(root, 'export')
+            export_module(self._classifier(), 'wiseSoup', 'classifier', {0: 'a', 1: 'b', 2: 'c'},
+                          export_dir, formats=('onnx',))
+            os.makedirs(os.path.join(root, 'crops', 'corba'))
+            for i, crop in enumerate(self._crops(12)):
+                cv2.imwrite(os.path.join(root, 'crops', 'corba', f'{i:02d}.png'), crop)
+            report_path = os.path.join(root, 'report.json')
+            with mock.patch('core.config.MODEL_EXPORT_DIR', export_dir):
+                call_command('quantize_models', os.path.join(root, 'crops'), '--models', 'wiseSoup',
+                             '--report', report_path, stdout=io.StringIO())
+            with open(report_path, encoding='utf-8') as f:
+                report = json.load(f)['wiseSoup']
+        self.assertEqual((report['calibration_crops'], report['crops']), (9, 3))
+        self.assertEqual(report['agreement'], 1.0)
@@ -0,0 +1,156 @@
+# core/tiling.py
+
+"""
+Yüksek çözünürlüklü tabla fotoğrafları için plaka tespiti.
+
+12MP bir görseli dedektöre olduğu gibi vermek okuma ve letterbox süresini
+artırır; AutoShape görseli zaten ~640 piksele küçültür. Burada:
+
+- DETECTION_MAX_SIDE: tespit görselin küçültülmüş kopyası üzerinde yapılır,
+  kutular orijinal çözünürlüğe geri ölçeklenir. Kırpımlar çözülen görselin
+  tam çözünürlüğünden kesilir (DECODE_MAX_SIDE açıksa görsel zaten
+  küçültülmüş çözülür, bkz. config.DECODE_MAX_SIDE).
+- DETECTION_TILE_THRESHOLD: uzun kenarı bu eşiği aşan görsellerde küçültülmüş
+  tüm görselin yanında örtüşen karolar da ayrı ayrı taranır. Küçük yan
+  yemekler karoda daha çok pikselle görünür; karolar arasında bölünen ya da
+  birden fazla karoda bulunan kutular birleştirilir.
+
+Kutular (N, 6) numpy dizileridir: x_min, y_min, x_max, y_max, güven, sınıf.
+"""
+
+from . import config
+
+
+def downscale(img, max_side):
+    """Uzun kenarı max_side'ı aşıyorsa küçültülmüş kopya ve ölçek (<= 1)."""
+    import cv2
+
+    height, width = img.shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return img, 1.0
+    scale = max_side / max(height, width)
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    # INTER_AREA küçültmede kenar yumuşatma sağlar ve bilinear'dan hızlıdır
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA), scale
+
+
+def tile_grid(height, width, tile_size, overlap):
+    """Görseli örten, overlap oranında örtüşen (x0, y0, x1, y1) karoları."""
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        stride = max(1, int(tile_size * (1 - overlap)))
+        positions = list(range(0, length - tile_size, stride))
+        # Son karo kenara dayanır
+        positions.append(length - tile_size)
+        return positions
+
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def _run_detector(detector, img, offset=(0, 0), scale=1.0):
+    """Dedektörü çalıştırır; kutuları orijinal görsel koordinatlarında döner."""
+    import numpy as np
+
+    result = detector(img)
+    xywh = result.xywh[0].cpu().numpy()
+    boxes = np.empty((len(xywh), 6), dtype=np.float64)
+    boxes[:, 0] = (xywh[:, 0] - xywh[:, 2] / 2) / scale + offset[0]
+    boxes[:, 1] = (xywh[:, 1] - xywh[:, 3] / 2) / scale + offset[1]
+    boxes[:, 2] = (xywh[:, 0] + xywh[:, 2] / 2) / scale + offset[0]
+    boxes[:, 3] = (xywh[:, 1] + xywh[:, 3] / 2) / scale + offset[1]
+    boxes[:, 4:6] = xywh[:, 4:6]
+    return boxes, result.names
+
+
+def merge_boxes(boxes, iou_threshold=None, containment=0.8):
+    """
+    Sınıf bazında birleştirme: güvene göre sırayla, daha güvenilir bir kutuyla
+    IoU'su iou_threshold'u aşan ya da alanının containment kadarı onun içinde
+    kalan (karo kenarında kesilmiş) kutular atılır. Daha güvenilir kutu
+    kesik parçaysa onu içine alan kutunun sınırlarını alır. Güvene göre
+    azalan sırada döner.
+    """
+    import numpy as np
+
+    iou_threshold = config.DETECTION_MERGE_IOU if iou_threshold is None else iou_threshold
+    if not len(boxes):
+        return boxes
+    boxes = boxes[np.argsort(-boxes[:, 4], kind='stable')]
+    areas = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+    keep = []
+    for i in range(len(boxes)):
+        suppressed = False
+        for j in keep:
+            if boxes[j, 5] != boxes[i, 5]:
+                continue
+            w = min(boxes[i, 2], boxes[j, 2]) - max(boxes[i, 0], boxes[j, 0])
+            h = min(boxes[i, 3], boxes[j, 3]) - max(boxes[i, 1], boxes[j, 1])
+            if w <= 0 or h <= 0:
+                continue
+            inter = w * h
+            union = areas[i] + areas[j] - inter
+            if (union and inter / union > iou_threshold) or (areas[i] and inter / areas[i] >= containment):
+                suppressed = True
+                break
+            if areas[j] and inter / areas[j] >= containment:
+                # Tutulan kutu bunun içinde kalan kesik parça: kutu büyütülür,
+                # güven korunur
+                boxes[j, :4] = boxes[i, :4]
+                areas[j] = areas[i]
+                suppressed = True
+                break
+        if not suppressed:
+            keep.append(i)
+    return boxes[keep]
+
+
+def detect_boxes(img, detector, max_side=None, tile_threshold=None, tile_size=None, overlap=None):
+    """
+    Görseldeki kutuları orijinal çözünürlükte ve YOLOv5 xywh biçiminde
+    ((N, 6): merkez x, merkez y, genişlik, yükseklik, güven, sınıf) döner,
+    sınıf isimleriyle birlikte. Ayarların hepsi kapalıysa görsel dedektöre
+    olduğu gibi verilir.
+    """
+    import numpy as np
+
+    max_side = config.DETECTION_MAX_SIDE if max_side is None else max_side
+    tile_threshold = config.DETECTION_TILE_THRESHOLD if tile_threshold is None else tile_threshold
+    tile_size = tile_size or config.DETECTION_TILE_SIZE
+    overlap = config.DETECTION_TILE_OVERLAP if overlap is None else overlap
+
+    height, width = img.shape[:2]
+    if not max_side and not tile_threshold:
+        result = detector(img)
+        return result.xywh[0].cpu().numpy(), result.names
+
+    small, scale = downscale(img, max_side)
+    boxes, names = _run_detector(detector, small, scale=scale)
+    if tile_threshold and max(height, width) > tile_threshold:
+        found = [boxes]
+        for x0, y0, x1, y1 in tile_grid(height, width, tile_size, overlap):
+            tile, tile_scale = downscale(img[y0:y1, x0:x1], max_side)
+            tile_boxes, _ = _run_detector(detector, tile, offset=(x0, y0), scale=tile_scale)
+            found.append(tile_boxes)
+        boxes = merge_boxes(np.concatenate(found))
+
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    xywh = np.empty_like(boxes)
+    xywh[:, 0:2] = (boxes[:, 0:2] + boxes[:, 2:4]) / 2
+    xywh[:, 2:4] = boxes[:, 2:4] - boxes[:, 0:2]
+    xywh[:, 4:6] = boxes[:, 4:6]
+    return xywh, names
+
+
+def settings_fingerprint():
+    """
+    Tespit sonucunu değiştiren ayarlar (okuma ölçeği dahil); hepsi kapalıyken
+    boş (önbellek anahtarı için).
+    """
+    if not config.DETECTION_MAX_SIDE and not config.DETECTION_TILE_THRESHOLD and not config.DECODE_MAX_SIDE:
+        return ''
+    return (f"det:{config.DETECTION_MAX_SIDE}:{config.DETECTION_TILE_THRESHOLD}:"
+            f"{config.DETECTION_TILE_SIZE}:{config.DETECTION_TILE_OVERLAP}:{config.DETECTION_MERGE_IOU}:"
+            f"decode:{config.DECODE_MAX_SIDE}")
@@ -4,7 +4,16 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_images, name='upload_images'),
+    path('upload/sessions/', views.open_upload_session, name='open_upload_session'),
+    path('upload/sessions/<uuid:session_id>/images/', views.upload_session_image, name='upload_session_image'),
+    path('upload/sessions/<uuid:session_id>/close/', views.close_upload_session, name='close_upload_session'),
+    path('upload/sessions/<uuid:session_id>/events/', views.upload_session_events,
+         name='upload_session_events'),
     path('results/', views.get_analysis_results, name='get_analysis_results'),
+    path('results/daily/', views.get_daily_statistics, name='get_daily_statistics'),
+    path('jobs/<uuid:job_id>/', views.job_status, name='job_status'),
+    path('crops/<str:crop_hash>/', views.crop_image, name='crop_image'),
+    path('models/', views.model_status, name='model_status'),
     path('auth/register/', views.register),
     path('auth/login/', views.login),
     path('auth/me/', views.user_profile),
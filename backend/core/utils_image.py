@@ -1,16 +1,38 @@
 #  core/utils_image.py
 
+_transforms = {}
+
+
+def _get_transform(target_size):
+    # Compose her çağrıda yeniden kurulmasın diye boyut başına bir kez oluşturulur
+    transform = _transforms.get(target_size)
+    if transform is None:
+        import torchvision.transforms as transforms
+
+        transform = transforms.Compose([
+            transforms.Resize(target_size),
+            transforms.CenterCrop(target_size),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=[0.485, 0.456, 0.406],
+                                 std=[0.229, 0.224, 0.225])
+        ])
+        _transforms[target_size] = transform
+    return transform
+
+
 def preprocess_image(image_path, target_size=(224, 224)):
     from PIL import Image
-    import torchvision.transforms as transforms
-
-    transform = transforms.Compose([
-        transforms.Resize(target_size),
-        transforms.CenterCrop(target_size),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                             std=[0.229, 0.224, 0.225])
-    ])
+
     image = Image.open(image_path).convert('RGB')
-    image_tensor = transform(image)
+    image_tensor = _get_transform(target_size)(image)
     return image_tensor.unsqueeze(0)
+
+
+def preprocess_array(bgr_image, target_size=(224, 224)):
+    """
+    cv2 ile okunmuş BGR numpy kırpımını diske yazmadan tensöre çevirir.
+    Tek kırpımlık kısayol; toplu kullanım için preprocess.preprocess_batch.
+    """
+    from .preprocess import preprocess_batch
+
+    return preprocess_batch([bgr_image], target_size=target_size)
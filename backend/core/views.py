@@ -1,5 +1,6 @@
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
@@ -7,11 +8,25 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db.models import Count
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 
-import os
+import uuid
 
-from .models import FoodAnalysis
+from . import config
+from .jobs import enqueue_job
+from .models import DailyWasteStat, FoodAnalysis, ProcessingJob, UploadedImage
+from .pagination import (
+    UNPAGINATED_LIMIT, InvalidQuery, filter_analyses, paginate_analyses, parse_fields, parse_limit,
+    serialize_row,
+)
+from .persistence import AnalysisWriteError
+from .streaming import (
+    EventStreamRenderer, NDJSONRenderer, SessionClosed, add_image, close_session, finish_session,
+    format_ndjson, format_sse, image_event, iter_session_events, open_session, process_session_images,
+)
+from .workspace import create_workspace
 
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated])
@@ -72,53 +87,292 @@ def login(request):
         }
     })
 
+def _parse_analysis_date(date_str):
+    if date_str:
+        try:
+            from datetime import datetime
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    return timezone.now().date()
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_images(request):
     if 'images' not in request.FILES:
         return Response({'error': 'No images were uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    date_str = request.POST.get('date')
-    if date_str:
-        try:
-            from datetime import datetime
-            analysis_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            analysis_date = timezone.now().date()
-    else:
-        analysis_date = timezone.now().date()
-
-    image_directory = 'images'
-    if not os.path.exists(image_directory):
-        os.makedirs(image_directory)
+    analysis_date = _parse_analysis_date(request.POST.get('date'))
+    job_id = uuid.uuid4()
+    workspace = create_workspace(job_id)
 
     saved_files = []
     for image_file in request.FILES.getlist('images'):
-        file_path = os.path.join(image_directory, image_file.name)
-        with open(file_path, 'wb+') as destination:
-            for chunk in image_file.chunks():
-                destination.write(chunk)
-        saved_files.append(file_path)
+        saved_files.append(workspace.save_upload(image_file))
+
+    if config.ASYNC_UPLOADS:
+        job = enqueue_job(job_id, request.user, analysis_date, workspace, saved_files)
+        return Response({
+            'message': 'Images uploaded and queued for processing.',
+            'job_id': str(job.id),
+            'status': job.status,
+        }, status=status.HTTP_202_ACCEPTED)
 
     # Büyük ML/vision importu burada fonksiyon içinde:
-    from .main import main as process_images
-    process_images(saved_files, analysis_date, request.user)
+    from .main import ModelsUnavailable, main as process_images
+    try:
+        statistics = process_images(saved_files, analysis_date, request.user, workspace=workspace)
+    except ModelsUnavailable as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except AnalysisWriteError as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'message': 'Images uploaded and processed successfully.',
+        'statistics': statistics,
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def open_upload_session(request):
+    job = open_session(request.user, _parse_analysis_date(request.data.get('date')))
+    return Response({
+        'session_id': str(job.id),
+        'status': job.status,
+    }, status=status.HTTP_201_CREATED)
+
+def _get_session(request, session_id):
+    return ProcessingJob.objects.filter(id=session_id, user=request.user, streaming=True).first()
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_session_image(request, session_id):
+    """
+    Oturuma tek görsel ('image' alanı) ekler. Asenkron modda görsel kuyruğa
+    alınır (202); senkron modda bu istekte işlenir ve sonucu döner.
+    """
+    job = _get_session(request, session_id)
+    if job is None:
+        return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if 'image' not in request.FILES:
+        return Response({'error': 'No image was uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        image = add_image(job, request.FILES['image'])
+    except SessionClosed as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
+    if config.ASYNC_UPLOADS:
+        return Response(image_event(image), status=status.HTTP_202_ACCEPTED)
+
+    from .model_registry import get_registry
+    process_session_images([image], get_registry().models(), job)
+    image.refresh_from_db()
+    return Response(image_event(image), status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def close_upload_session(request, session_id):
+    """Oturuma yeni görsel eklenmesini bitirir. Senkron modda istatistikleri döner."""
+    job = _get_session(request, session_id)
+    if job is None:
+        return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    close_session(job)
+
+    if config.ASYNC_UPLOADS or job.status != ProcessingJob.STATUS_RUNNING:
+        return Response({'session_id': str(job.id), 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
+    statistics = finish_session(job)
+    return Response({
+        'session_id': str(job.id),
+        'status': ProcessingJob.STATUS_DONE,
+        'statistics': statistics,
+    }, status=status.HTTP_200_OK)
 
-    return Response({'message': 'Images uploaded and processed successfully.'}, status=status.HTTP_200_OK)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, NDJSONRenderer, EventStreamRenderer, BrowsableAPIRenderer])
+def upload_session_events(request, session_id):
+    """
+    Görsel bazında sonuçları işlendikçe akıtır. 'Accept: text/event-stream'
+    ile server-sent events, aksi halde NDJSON (satır başına bir JSON) döner.
+    after=<görsel id> (veya SSE Last-Event-ID) ile kaldığı yerden devam eder.
+    """
+    job = _get_session(request, session_id)
+    if job is None:
+        return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        after = int(request.query_params.get('after') or request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        return Response({'error': "'after' must be an image id."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.accepted_renderer.format == 'sse':
+        formatter, content_type = format_sse, EventStreamRenderer.media_type
+    else:
+        formatter, content_type = format_ndjson, NDJSONRenderer.media_type
+    response = StreamingHttpResponse(
+        (formatter(event) for event in iter_session_events(job, after=after)),
+        content_type=content_type,
+    )
+    response['Cache-Control'] = 'no-cache'
+    # nginx gibi ters proxy'lerin yanıtı tamponlamaması için
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    job = ProcessingJob.objects.filter(id=job_id, user=request.user).first()
+    if job is None:
+        return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'job_id': str(job.id),
+        'status': job.status,
+        'total_images': job.total_images,
+        'processed_images': job.processed_images,
+        'progress': job.processed_images / job.total_images if job.total_images else 0.0,
+        'completed': job.status in (ProcessingJob.STATUS_DONE, ProcessingJob.STATUS_FAILED),
+        'error': job.error if job.status == ProcessingJob.STATUS_FAILED else None,
+        'statistics': job.statistics,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_analysis_results(request):
-    results = FoodAnalysis.objects.filter(user=request.user).order_by('-analysis_date')
+    """
+    limit veya cursor verilirse {'results', 'next_cursor'} şeklinde sayfalı,
+    verilmezse eskisi gibi düz liste döner. Düz liste en fazla
+    UNPAGINATED_LIMIT satırdır; daha fazlası varsa X-Next-Cursor başlığındaki
+    cursor ile devam edilir. Filtreler: start, end (YYYY-MM-DD), category,
+    food_type. fields=category,waste_count gibi alan seçimi yapılabilir.
+    """
+    params = request.query_params
+    try:
+        fields = parse_fields(params.get('fields'))
+        results = filter_analyses(FoodAnalysis.objects.filter(user=request.user), params)
+
+        if 'limit' in params or 'cursor' in params:
+            rows, next_cursor = paginate_analyses(
+                results, cursor=params.get('cursor'), limit=parse_limit(params.get('limit')), fields=fields)
+            return Response({
+                'results': [serialize_row(row, fields) for row in rows],
+                'next_cursor': next_cursor,
+            })
+        rows, next_cursor = paginate_analyses(results, limit=UNPAGINATED_LIMIT, fields=fields)
+    except InvalidQuery as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = Response([serialize_row(row, fields) for row in rows])
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def crop_image(request, crop_hash):
+    """
+    Kırpım deposundaki kırpımın JPEG'i (?thumbnail=1 ile küçük kopyası).
+    Yalnızca kırpıma başvuran bir analizin sahibi ya da yöneticiler görebilir.
+    """
+    from .crop_store import get_crop_store
+
+    owned = request.user.is_staff or FoodAnalysis.objects.filter(user=request.user, crop_id=crop_hash).exists()
+    path = get_crop_store().open(crop_hash, thumbnail=request.query_params.get('thumbnail') in ('1', 'true'))
+    if not owned or path is None:
+        return Response({'error': 'Crop not found.'}, status=status.HTTP_404_NOT_FOUND)
+    response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+    # İçerik adresli: aynı anahtarın içeriği hiç değişmez
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def model_status(request):
+    from .model_registry import get_registry
+    from .result_cache import get_result_cache
+    from .startup import last_report
+    registry = get_registry()
+    models = registry.describe()
+    cache = get_result_cache()
+    return Response({
+        'models': models,
+        'total_memory_bytes': sum(m['memory_bytes'] or 0 for m in models),
+        'pool': registry.stats(),
+        'startup': last_report(),
+        'result_cache': cache.describe() if cache is not None else None,
+    })
+
+def _queue_gauges():
+    jobs = dict(ProcessingJob.objects
+                .filter(status__in=[ProcessingJob.STATUS_PENDING, ProcessingJob.STATUS_RUNNING,
+                                    ProcessingJob.STATUS_IDLE])
+                .values_list('status').annotate(count=Count('id')).order_by())
+    from .model_registry import get_registry
+
+    pending_images = UploadedImage.objects.filter(status=UploadedImage.STATUS_PENDING).count()
+    pool = get_registry().stats()
+    return [
+        ('wise_job_queue_depth', 'Processing jobs by status.',
+         [({'status': s}, jobs.get(s, 0))
+          for s in (ProcessingJob.STATUS_PENDING, ProcessingJob.STATUS_RUNNING, ProcessingJob.STATUS_IDLE)]),
+        ('wise_stream_pending_images', 'Streaming session images waiting to be processed.',
+         [({}, pending_images)]),
+        ('wise_models_loaded', 'Models currently loaded in this process.', [({}, pool['loaded'])]),
+        ('wise_model_memory_bytes', 'Memory used by loaded models in this process.',
+         [({}, pool['loaded_bytes'])]),
+    ]
+
+def metrics(request):
+    """
+    Prometheus metin formatında metrikler. DRF dışında düz Django view'dur:
+    Prometheus JWT taşımaz; WISE_METRICS_TOKEN verilirse Bearer token ister.
+    """
+    from .metrics import render
+
+    if not config.METRICS_ENABLED:
+        return HttpResponse(status=404)
+    if config.METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {config.METRICS_TOKEN}":
+        return HttpResponse(status=401)
+    return HttpResponse(render(gauges=_queue_gauges()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _parse_date_param(request, name):
+    from datetime import datetime
+
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_daily_statistics(request):
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    stats = DailyWasteStat.objects.filter(user=request.user)
+    if start:
+        stats = stats.filter(date__gte=start)
+    if end:
+        stats = stats.filter(date__lte=end)
+    if request.query_params.get('category'):
+        stats = stats.filter(category=request.query_params['category'])
+
     data = [
         {
-            'category': res.category,
-            'food_type': res.food_type,
-            'waste_count': res.waste_count,
-            'no_waste_count': res.no_waste_count,
-            'waste_ratio': res.waste_ratio,
-            'analysis_date': res.analysis_date.strftime("%Y-%m-%d"),
+            'date': stat.date.strftime("%Y-%m-%d"),
+            'category': stat.category,
+            'food_type': stat.food_type,
+            'waste_count': stat.waste_count,
+            'no_waste_count': stat.no_waste_count,
+            'total': stat.sample_count,
+            'mean_confidence': stat.mean_confidence,
         }
-        for res in results
+        for stat in stats.order_by('date', 'category', 'food_type')
     ]
     return Response(data)
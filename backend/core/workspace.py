@@ -0,0 +1,106 @@
+# core/workspace.py
+
+import os
+import shutil
+import time
+import uuid
+
+from . import config
+
+
+class Workspace:
+    """
+    Bir isteğe/işe ait izole dizin: yüklenen görseller images/ altına
+    yazılır, kırpımlar paylaşılan kırpım deposuna gider. Eşzamanlı
+    yüklemeler birbirinin dosyalarına dokunmaz; eski alanlar TTL dolunca
+    cleanup_expired_workspaces ile silinir.
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.id = os.path.basename(self.root)
+        self.images_dir = os.path.join(self.root, 'images')
+
+    def create(self):
+        os.makedirs(self.images_dir, exist_ok=True)
+        return self
+
+    def save_upload(self, uploaded_file):
+        """Django UploadedFile'ı images/ altına yazar, dosya yolunu döner."""
+        name = os.path.basename(uploaded_file.name) or uuid.uuid4().hex
+        file_path = os.path.join(self.images_dir, name)
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        # Aynı isimli dosyalar birbirinin üzerine yazılmasın
+        while os.path.exists(file_path):
+            file_path = os.path.join(self.images_dir, f"{stem}-{counter}{ext}")
+            counter += 1
+        with open(file_path, 'wb+') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+        return file_path
+
+    def remove_images(self):
+        shutil.rmtree(self.images_dir, ignore_errors=True)
+
+    def remove(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __repr__(self):
+        return f"Workspace({self.root!r})"
+
+
+def get_workspace(workspace_id, root=None):
+    return Workspace(os.path.join(root or config.WORKSPACE_ROOT, str(workspace_id)))
+
+
+def create_workspace(workspace_id=None, root=None):
+    return get_workspace(workspace_id or uuid.uuid4().hex, root=root).create()
+
+
+def active_workspaces():
+    """
+    Bekleyen / çalışan işlerin (boşta bekleyen akış oturumları dahil) ve işlenmemiş akış
+    görsellerinin çalışma alanları (mutlak yollar).
+    """
+    from .models import ProcessingJob, UploadedImage
+
+    active = ProcessingJob.objects.filter(
+        status__in=(ProcessingJob.STATUS_PENDING, ProcessingJob.STATUS_RUNNING, ProcessingJob.STATUS_IDLE),
+    ).values_list('workspace', flat=True)
+    pending = UploadedImage.objects.filter(status=UploadedImage.STATUS_PENDING).values_list('job__workspace', flat=True)
+    return {os.path.abspath(path) for path in (*active, *pending) if path}
+
+
+def cleanup_expired_workspaces(ttl_seconds=None, root=None):
+    """
+    Son değişikliği TTL'den eski olan çalışma alanlarını siler, silinen sayıyı
+    döner. Kuyrukta bekleyen ya da işlenmekte olan işlerin alanları (worker'lar
+    kapalıyken veya uzun akış oturumlarında TTL'i aşsalar da) silinmez.
+    """
+    root = root or config.WORKSPACE_ROOT
+    ttl_seconds = config.WORKSPACE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    if not os.path.isdir(root):
+        return 0
+
+    cutoff = time.time() - ttl_seconds
+    active = None
+    removed = 0
+    for entry in os.scandir(root):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+        except OSError:
+            continue
+        if active is None:
+            # Yalnızca süresi dolmuş bir alan varsa sorgulanır
+            active = active_workspaces()
+        if os.path.abspath(entry.path) in active:
+            continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed += 1
+    if removed:
+        print(f"Removed {removed} expired workspace(s) from '{root}'.")
+    return removed